@@ -0,0 +1,83 @@
+"""
+Benchmark dos backends de planilha - OceanicDesk
+
+Mede a escrita das quatro células de VENDAS GERAL (M, N, O, P da linha do dia)
+seguida de salvar, em cada backend disponível (XML, openpyxl, xlwings, COM).
+Por padrão usa uma cópia sintética no tamanho da planilha do mês (31 abas
+"Dia NN" + VENDAS GERAL com totais); --arquivo permite medir a planilha real
+(o arquivo é copiado, o original não é alterado).
+
+Uso:
+    python -m benchmarks.bench_backends_planilha [--arquivo copia.xlsx] [--repeticoes 3]
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from utils.backends_planilha import BACKENDS, PRESERVA_VINCULOS, RECALCULA
+
+
+def gerar_copia(caminho: Path, linhas_por_dia: int = 60, colunas: int = 20) -> None:
+    """Gera uma planilha no layout da cópia do mês (valores e fórmulas de soma)."""
+    rnd = random.Random(42)
+    wb = Workbook()
+    geral = wb.active
+    geral.title = "VENDAS GERAL"
+    for dia in range(1, 32):
+        ws = wb.create_sheet(f"Dia {dia:02d}")
+        for linha in range(1, linhas_por_dia + 1):
+            for coluna in range(1, colunas + 1):
+                ws.cell(row=linha, column=coluna, value=round(rnd.random() * 1000, 2))
+        for coluna in "MNOP":
+            geral[f"{coluna}{dia + 1}"] = round(rnd.random() * 1000, 2)
+    for coluna in "MNOP":
+        geral[f"{coluna}35"] = f"=SUM({coluna}2:{coluna}32)"
+    wb.save(caminho)
+
+
+def medir(classe, original: Path, pasta: Path, repeticoes: int) -> float:
+    melhor = float("inf")
+    for i in range(repeticoes):
+        caminho = pasta / f"{classe.nome}_{i}{original.suffix}"
+        shutil.copy2(original, caminho)
+        valores = {f"{c}20": round(random.random() * 1000, 2) for c in "MNOP"}
+
+        inicio = time.perf_counter()
+        with classe(caminho) as planilha:
+            planilha.escrever_celulas("VENDAS GERAL", valores)
+            planilha.salvar()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--arquivo", type=Path)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pasta = Path(tmpdir)
+        original = args.arquivo
+        if original is None:
+            original = pasta / "copia.xlsx"
+            gerar_copia(original)
+
+        print(f"Arquivo: {original.name} ({original.stat().st_size / 1024:.0f} KB)")
+        for nome, classe in BACKENDS.items():
+            seguro = {PRESERVA_VINCULOS, RECALCULA} <= classe.capacidades
+            if not classe.disponivel():
+                print(f"{nome:10s}  indisponível")
+                continue
+            tempo = medir(classe, original, pasta, args.repeticoes)
+            print(f"{nome:10s} {tempo * 1000:9.1f} ms  {'seguro' if seguro else 'perde valores em cache'}")
+
+
+if __name__ == "__main__":
+    main()
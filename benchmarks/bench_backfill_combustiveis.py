@@ -0,0 +1,90 @@
+"""
+Benchmark da leitura do backfill de combustíveis - OceanicDesk
+
+Gera uma planilha de vendas sintética com abas "Dia 01".."Dia NN" e mede a
+leitura dos litros de todos os dias: em série (uma abertura do arquivo), em um
+pool com uma tarefa por dia (como era) e em um pool com blocos de dias. Os
+pools usam "spawn", como no Windows: cada processo reimporta os módulos.
+
+Uso:
+    python -m benchmarks.bench_backfill_combustiveis [--dias 31] [--workers 4] [--repeticoes 3]
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from projecao.combustiveis import DIAS_POR_PROCESSO, _ler_litros_dias
+
+
+def gerar_planilha(caminho: Path, dias: int) -> None:
+    """Abas "Dia NN" com ~60 linhas x 20 colunas, como a planilha diária."""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for dia in range(1, dias + 1):
+        ws = wb.create_sheet(f"Dia {dia:02d}")
+        for linha in range(1, 61):
+            ws.cell(row=linha, column=1, value=f"Item {linha}")
+            for coluna in range(2, 21):
+                ws.cell(row=linha, column=coluna, value=linha * coluna + dia / 10)
+    wb.save(caminho)
+
+
+def em_serie(caminho: str, dias: list, workers: int) -> dict:
+    return _ler_litros_dias(caminho, dias)
+
+
+def pool_por_dia(caminho: str, dias: list, workers: int) -> dict:
+    resultado = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for parcial in executor.map(_ler_litros_dias, [caminho] * len(dias), [[dia] for dia in dias]):
+            resultado.update(parcial)
+    return resultado
+
+
+def pool_em_blocos(caminho: str, dias: list, workers: int) -> dict:
+    blocos = [dias[i:i + DIAS_POR_PROCESSO] for i in range(0, len(dias), DIAS_POR_PROCESSO)]
+    resultado = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(blocos)),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        for parcial in executor.map(_ler_litros_dias, [caminho] * len(blocos), blocos):
+            resultado.update(parcial)
+    return resultado
+
+
+def medir(funcao, caminho: str, dias: list, workers: int, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(caminho, dias, workers)
+        melhor = min(melhor, time.perf_counter() - inicio)
+        assert len(resultado) == len(dias)
+    return melhor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dias", type=int, default=31)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        caminho = Path(tmpdir) / "vendas.xlsx"
+        gerar_planilha(caminho, args.dias)
+        dias = list(range(1, args.dias + 1))
+
+        print(f"{args.dias} aba(s), {caminho.stat().st_size / 1024:.0f} KB, {args.workers} processo(s)")
+        for nome, funcao in (("em série", em_serie), ("pool, 1 dia/tarefa", pool_por_dia),
+                             (f"pool, {DIAS_POR_PROCESSO} dias/tarefa", pool_em_blocos)):
+            tempo = medir(funcao, str(caminho), dias, args.workers, args.repeticoes)
+            print(f"{nome:24s} {tempo * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark de buscar_isqueiro - OceanicDesk
+
+Compara o laço linha a linha original (load_workbook completo + conversão
+por célula) com a versão vetorizada de utils.excel_stream.somar_por_nome
+em um relatório sintético de subcategoria com 50 mil linhas.
+
+Uso:
+    python -m benchmarks.bench_buscar_isqueiro [--linhas 50000] [--repeticoes 3]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from openpyxl import Workbook, load_workbook
+
+from utils.excel_ops import ISQUEIROS_OCEANIC
+from utils.excel_stream import somar_por_nome
+
+
+def gerar_relatorio(caminho: Path, linhas: int) -> None:
+    """Gera um tmp.xlsx no layout do relatório de subcategorias (B = produto, I = quantidade)."""
+    produtos = ISQUEIROS_OCEANIC + [f"PRODUTO GENERICO {i}" for i in range(400)]
+    rnd = random.Random(42)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Relatorio")
+    for i in range(linhas):
+        quantidade = rnd.randint(0, 500) + rnd.randint(0, 99) / 100
+        valor = f"{quantidade:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if i % 3 else quantidade
+        ws.append([i, f"  {rnd.choice(produtos).lower()} ", None, None, None, None, None, None, valor, rnd.random()])
+    wb.save(caminho)
+
+
+def buscar_isqueiro_laco(caminho_tmp, nomes_procurados) -> float:
+    """Implementação original (laço Python por linha), mantida só para comparação."""
+    wb = load_workbook(caminho_tmp, data_only=True)
+    ws = wb.active
+
+    valores = []
+    for row in ws.iter_rows(min_row=1):
+        nome = str(row[1].value).strip().upper() if row[1].value else ""
+        if nome in nomes_procurados:
+            valor_celula = row[8].value
+            if isinstance(valor_celula, str):
+                valor_celula = valor_celula.replace(".", "").replace(",", ".")
+            try:
+                valores.append(float(valor_celula))
+            except (TypeError, ValueError):
+                continue
+
+    return round(sum(valores), 2)
+
+
+def medir(func, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=50_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        caminho = Path(tmpdir) / "tmp.xlsx"
+        gerar_relatorio(caminho, args.linhas)
+
+        esperado = buscar_isqueiro_laco(caminho, ISQUEIROS_OCEANIC)
+        obtido = round(somar_por_nome(caminho, ISQUEIROS_OCEANIC, "B", "I"), 2)
+        assert abs(esperado - obtido) < 0.01, (esperado, obtido)
+
+        t_laco = medir(lambda: buscar_isqueiro_laco(caminho, ISQUEIROS_OCEANIC), args.repeticoes)
+        t_vetor = medir(lambda: somar_por_nome(caminho, ISQUEIROS_OCEANIC, "B", "I"), args.repeticoes)
+
+    print(f"Linhas: {args.linhas} | total: {obtido}")
+    print(f"Laço original (load_workbook): {t_laco * 1000:8.1f} ms")
+    print(f"Vetorizado (colunas B e I):    {t_vetor * 1000:8.1f} ms")
+    print(f"Ganho: {t_laco / t_vetor:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
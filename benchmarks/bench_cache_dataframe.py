@@ -0,0 +1,111 @@
+"""
+Benchmark do cache de DataFrames: pickle x formato colunar - OceanicDesk
+
+Grava um export de subcategoria sintético (200 mil linhas por padrão) nos dois
+formatos e mede, cada um em um processo novo, o tempo de carregar e o aumento
+de RSS: só a carga, e a carga seguida da soma das colunas numéricas (que no
+formato colunar faz o sistema trazer as páginas do arquivo).
+
+Uso:
+    python -m benchmarks.bench_cache_dataframe [--linhas 200000] [--repeticoes 3]
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.dataframe_colunar import carregar_dataframe, gravar_dataframe
+
+
+def gerar_export(linhas: int) -> pd.DataFrame:
+    """Export de vendas por subcategoria no formato do relatório do EMSys."""
+    rnd = np.random.default_rng(42)
+    produtos = np.array([f"PRODUTO {i:05d}" for i in range(2000)], dtype=object)
+    subcategorias = np.array(["CERVEJA", "BOMBONIERE", "CIGARRO", "FOOD", "BEBIDAS"], dtype=object)
+    return pd.DataFrame({
+        "codigo": rnd.integers(1, 99999, linhas),
+        "produto": produtos[rnd.integers(0, len(produtos), linhas)],
+        "subcategoria": subcategorias[rnd.integers(0, len(subcategorias), linhas)],
+        "quantidade": rnd.integers(1, 50, linhas).astype(float),
+        "valor_unitario": rnd.random(linhas) * 100,
+        "desconto": rnd.random(linhas),
+        "total": rnd.random(linhas) * 1000,
+        "data": pd.Timestamp("2025-07-01") + pd.to_timedelta(rnd.integers(0, 31, linhas), unit="D"),
+    })
+
+
+def rss_mb() -> float:
+    """RSS do processo atual (psutil, ou /proc no Linux); NaN se indisponível."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return float("nan")
+
+
+def _carregar(formato: str, caminho: str):
+    if formato == "pickle":
+        with open(caminho, "rb") as f:
+            return pickle.load(f)
+    return carregar_dataframe(caminho)
+
+
+def _medir_no_processo(formato: str, caminho: str, tocar: bool) -> tuple:
+    antes = rss_mb()
+    inicio = time.perf_counter()
+    df = _carregar(formato, caminho)
+    if tocar:
+        df.select_dtypes("number").sum()
+    tempo = time.perf_counter() - inicio
+    return tempo, rss_mb() - antes
+
+
+def medir(formato: str, caminho: Path, repeticoes: int, tocar: bool) -> tuple:
+    """Melhor tempo e menor aumento de RSS, cada repetição em um processo novo."""
+    contexto = multiprocessing.get_context("spawn")
+    resultados = []
+    for _ in range(repeticoes):
+        with contexto.Pool(1) as pool:
+            resultados.append(pool.apply(_medir_no_processo, (formato, str(caminho), tocar)))
+    return min(t for t, _ in resultados), min(r for _, r in resultados)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    df = gerar_export(args.linhas)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pasta = Path(tmpdir)
+        arquivos = {"pickle": pasta / "df_pickle.cache", "colunar": pasta / "df_colunar.cache"}
+        with open(arquivos["pickle"], "wb") as f:
+            pickle.dump(df, f)
+        with open(arquivos["colunar"], "wb") as f:
+            gravar_dataframe(f, df)
+
+        print(f"DataFrame: {len(df):,} linhas x {df.shape[1]} colunas "
+              f"({df.memory_usage(deep=True).sum() / (1024 * 1024):.1f} MB em memória)")
+        print(f"{'formato':8s} {'arquivo':>9s} {'carga':>10s} {'RSS':>9s} {'carga+soma':>11s} {'RSS':>9s}")
+        for formato, caminho in arquivos.items():
+            tempo, rss = medir(formato, caminho, args.repeticoes, tocar=False)
+            tempo_soma, rss_soma = medir(formato, caminho, args.repeticoes, tocar=True)
+            print(f"{formato:8s} {caminho.stat().st_size / (1024 * 1024):7.1f}MB "
+                  f"{tempo * 1000:8.1f}ms {rss:7.1f}MB {tempo_soma * 1000:9.1f}ms {rss_soma:7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
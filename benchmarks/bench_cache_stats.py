@@ -0,0 +1,81 @@
+"""
+Benchmark das estatísticas do cache - OceanicDesk
+
+Cria um cache com N entradas (10 mil por padrão, tipos misturados) e compara
+get_cache_stats(), que lê o manifesto em memória, com a varredura do diretório
+(glob + stat de cada arquivo) feita antes a cada coleta do utils/metrics.py.
+Mede também a abertura do cache (carga do index.json) com todas as entradas.
+
+Uso:
+    python -m benchmarks.bench_cache_stats [--entradas 10000] [--repeticoes 20]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from utils.cache import CacheConfig, ExcelCache, _cache_type
+
+
+def stats_por_varredura(cache_dir: Path) -> dict:
+    """Estatísticas como eram calculadas antes: glob + stat de cada arquivo."""
+    stats = {"total_files": 0, "total_size_mb": 0.0, "by_type": {}}
+    for cache_file in cache_dir.glob("*.cache"):
+        size_mb = cache_file.stat().st_size / (1024 * 1024)
+        stats["total_files"] += 1
+        stats["total_size_mb"] += size_mb
+        por_tipo = stats["by_type"].setdefault(_cache_type(cache_file.name), {"count": 0, "size_mb": 0.0})
+        por_tipo["count"] += 1
+        por_tipo["size_mb"] += size_mb
+    return stats
+
+
+def preencher(cache: ExcelCache, entradas: int) -> None:
+    prefixos = [CacheConfig.WORKBOOK_PREFIX, CacheConfig.DATAFRAME_PREFIX, CacheConfig.VALUE_PREFIX]
+    for i in range(entradas):
+        prefixo = prefixos[i % len(prefixos)]
+        cache._save_to_cache(cache._get_cache_path(prefixo, f"{i:08x}"), {"valor": i},
+                             source=f"planilha_{i % 50}.xlsx")
+    cache.flush_index()
+
+
+def medir(funcao, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entradas", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_dir = Path(tmpdir) / "cache"
+        cache = ExcelCache(cache_dir=cache_dir, max_memory_mb=0, max_size_mb=1024)
+
+        inicio = time.perf_counter()
+        preencher(cache, args.entradas)
+        print(f"{args.entradas:,} entradas gravadas em {time.perf_counter() - inicio:.2f} s")
+
+        manifesto = cache.get_cache_stats()
+        varredura = stats_por_varredura(cache_dir)
+        assert manifesto["total_files"] == varredura["total_files"]
+
+        tempo_varredura = medir(lambda: stats_por_varredura(cache_dir), args.repeticoes)
+        tempo_manifesto = medir(cache.get_cache_stats, args.repeticoes)
+        tempo_abertura = medir(lambda: ExcelCache(cache_dir=cache_dir, max_memory_mb=0), 3)
+
+        print(f"varredura (glob + stat) {tempo_varredura * 1000:10.2f} ms")
+        print(f"get_cache_stats         {tempo_manifesto * 1000:10.3f} ms "
+              f"({tempo_varredura / tempo_manifesto:,.0f}x)")
+        print(f"abrir cache (índice)    {tempo_abertura * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
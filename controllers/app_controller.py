@@ -9,6 +9,7 @@ from utils.etapas import (
     etapa7_fechamento_caixa,
     etapa8_projecao_de_vendas
 )
+from utils.workbook_pool import etapa_workbooks, sessao_workbooks, workbook_pool
 from interfaces.alerta_visual import mostrar_alerta_visual
 import time
 
@@ -24,7 +25,8 @@ class AppController:
         mostrar_alerta_visual("Iniciando Etapa 1", "Backup e Preços...", tipo="info")
         self.log("Executando Etapa 1: Backup e Preços...")
         try:
-            etapa1_backup_e_precos()
+            with etapa_workbooks("Etapa 1"):
+                etapa1_backup_e_precos()
             mostrar_alerta_visual("Etapa 1 concluída", "Backup e Preços finalizados com sucesso!", tipo="success")
             if completo:
                 time.sleep(0.5)  # Delay entre etapas
@@ -37,7 +39,8 @@ class AppController:
         mostrar_alerta_visual("Iniciando Etapa 2", "Mini-Mercado...", tipo="info")
         self.log("Executando Etapa 2: Mini-Mercado...")
         try:
-            etapa2_minimercado()
+            with etapa_workbooks("Etapa 2"):
+                etapa2_minimercado()
             mostrar_alerta_visual("Etapa 2 concluída", "Mini-Mercado finalizado com sucesso!", tipo="success")
             if completo:
                 time.sleep(0.5)  # Delay entre etapas
@@ -50,7 +53,8 @@ class AppController:
         mostrar_alerta_visual("Iniciando Etapa 3", "Litros e Descontos...", tipo="info")
         self.log("Executando Etapa 3: Litros e Descontos...")
         try:
-            etapa3_litros_descontos()
+            with etapa_workbooks("Etapa 3"):
+                etapa3_litros_descontos()
             mostrar_alerta_visual("Etapa 3 concluída", "Litros e Descontos finalizados com sucesso!", tipo="success")
             if completo:
                 time.sleep(0.5)  # Delay entre etapas
@@ -63,7 +67,8 @@ class AppController:
         mostrar_alerta_visual("Iniciando Etapa 4", "Cashback e Pix...", tipo="info")
         self.log("Executando Etapa 4: Cashback e Pix...")
         try:
-            etapa4_cashback_pix()
+            with etapa_workbooks("Etapa 4"):
+                etapa4_cashback_pix()
             mostrar_alerta_visual("Etapa 4 concluída", "Cashback e Pix finalizados com sucesso!", tipo="success")
             if completo:
                 time.sleep(0.5)  # Delay entre etapas
@@ -76,7 +81,8 @@ class AppController:
         mostrar_alerta_visual("Iniciando Etapa 5", "Inserção Manual de Litros...", tipo="info")
         self.log("Executando Etapa 5: Inserção Manual de Litros...")
         try:
-            etapa5_insercao_litros()
+            with etapa_workbooks("Etapa 5"):
+                etapa5_insercao_litros()
             mostrar_alerta_visual("Etapa 5 concluída", "Inserção Manual de Litros finalizada com sucesso!", tipo="success")
             if completo:
                 time.sleep(0.5)  # Delay entre etapas
@@ -121,12 +127,31 @@ class AppController:
             mostrar_alerta_visual("Erro na Etapa 8", str(e), tipo="error")
             self.log(f"Erro na Etapa 8: {e}")
 
+    def sessao_planilhas(self, salvar_em_checkpoint=False):
+        """Sessão que compartilha a planilha diária carregada entre as etapas."""
+        return sessao_workbooks(salvar_em_checkpoint=salvar_em_checkpoint)
+
+    def estatisticas_planilhas(self):
+        """Carregamentos/gravações feitos e evitados pelo pool de planilhas."""
+        return workbook_pool.get_stats()
+
     def executar_todas(self):
-        self.etapa1()
-        self.etapa2()
-        self.etapa3()
-        self.etapa4()
-        self.etapa5()
+        # Etapas 1 a 5 editam a mesma planilha: carregada uma vez e gravada uma vez
+        # ao fim de cada etapa (etapa_workbooks); uma etapa que falha tem as
+        # alterações descartadas
+        try:
+            with self.sessao_planilhas():
+                self.etapa1()
+                self.etapa2()
+                self.etapa3()
+                self.etapa4()
+                self.etapa5()
+        except Exception as e:
+            # Falha ao gravar a sessão não impede o e-mail, o fechamento e a projeção
+            mostrar_alerta_visual("Erro ao salvar planilha", str(e), tipo="error")
+            self.log(f"Erro ao salvar a planilha das etapas 1-5: {e}")
+        stats = self.estatisticas_planilhas()
+        self.log(f"Planilha: {stats['carregamentos']} carregamento(s), {stats['carregamentos_evitados']} evitado(s).")
         self.etapa6()
         self.etapa7()
         self.etapa8()
@@ -1,25 +1,33 @@
+import numpy as np
 import pandas as pd
 import openpyxl
-import xlwings as xw
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.excel_save import carregar_workbook, salvar_atomico
+from utils.backends_planilha import escrever_celulas_planilha
+from projecao.snapshot import obter_snapshot_dia, CELULAS_DIA, COMBUSTIVEIS
+from utils.excel_stream import LeitorStreaming
+from utils.historico import obter_historico, registrar_no_historico
+from projecao.util import atualizar_conexoes_excel
+from utils import relogio
 
 
 def atualizar_combustiveis(caminho_vendas: str, caminho_destino: str) -> None:
     caminho_vendas = Path(caminho_vendas)
     caminho_destino = Path(caminho_destino)
-    data_ontem = datetime.today() - timedelta(days=1)
+    data_ontem = relogio.agora() - timedelta(days=1)
     nome_aba = f"Dia {data_ontem.day:02d}"
     linha_destino = data_ontem.day + 4
 
-    df_vendas = pd.read_excel(caminho_vendas, sheet_name=nome_aba, engine="openpyxl")
+    snapshot = obter_snapshot_dia(caminho_vendas, nome_aba)
+    registrar_no_historico(data_ontem, snapshot.como_dict(), origem=caminho_vendas.name)
 
-    gas_c = round(df_vendas.iloc[19, 3])
-    gas_a = round(df_vendas.iloc[20, 3])
-    etanol_c = round(df_vendas.iloc[23, 3])
-    diesel_s10 = round(df_vendas.iloc[26, 3])
+    gas_c, gas_a, etanol_c, diesel_s10 = _litros_arredondados(snapshot.litros_por_combustivel)
 
-    wb_controle = openpyxl.load_workbook(caminho_destino)
+    wb_controle = carregar_workbook(caminho_destino)
     aba = wb_controle.active
 
     aba[f"D{linha_destino}"] = gas_c
@@ -27,55 +35,171 @@ def atualizar_combustiveis(caminho_vendas: str, caminho_destino: str) -> None:
     aba[f"F{linha_destino}"] = etanol_c
     aba[f"G{linha_destino}"] = diesel_s10
 
-    wb_controle.save(caminho_destino)
+    salvar_atomico(wb_controle, caminho_destino)
     print(f"Arquivo modificado salvo como {caminho_destino}")
 
 
+# Colunas de destino dos litros, na ordem de COMBUSTIVEIS
+COLUNAS_COMBUSTIVEIS = ("D", "E", "F", "G")
+
+
+def _litros_arredondados(litros: dict) -> tuple:
+    return tuple(round(litros[nome]) for nome in COMBUSTIVEIS)
+
+
+# Dias lidos por tarefa do pool (cada tarefa abre o arquivo uma vez). Sem
+# max_workers > 1, ou com até um bloco de dias, a leitura é feita em série:
+# no Windows cada processo reimporta pandas/openpyxl e, para um mês inteiro,
+# o pool é 10x mais lento que uma passada pelo arquivo
+# (benchmarks/bench_backfill_combustiveis.py: ~0,1 s em série x ~1,5 s no pool).
+DIAS_POR_PROCESSO = 16
+
+
+def _ler_litros_dias(caminho_vendas: str, dias: List[int]) -> Dict[int, Optional[dict]]:
+    """
+    Litros por combustível de vários dias, abrindo o arquivo uma única vez.
+    Dia sem aba "Dia NN" vem como None. Também é executado nos processos do
+    pool, por isso é uma função de módulo.
+    """
+    coordenadas = [CELULAS_DIA[nome] for nome in COMBUSTIVEIS]
+    resultado: Dict[int, Optional[dict]] = {}
+    with LeitorStreaming(caminho_vendas) as leitor:
+        abas = set(leitor.nomes_abas)
+        for dia in dias:
+            nome_aba = f"Dia {dia:02d}"
+            if nome_aba not in abas:
+                resultado[dia] = None
+                continue
+            lidos = leitor.ler_celulas(coordenadas, nome_aba)
+            resultado[dia] = {nome: lidos[CELULAS_DIA[nome]] for nome in COMBUSTIVEIS}
+    return resultado
+
+
+def _ler_litros_periodo(caminho_vendas: str, dias: List[int], max_workers: Optional[int] = None) -> Dict[int, Optional[dict]]:
+    """Lê os dias em série ou, com max_workers > 1, em blocos de DIAS_POR_PROCESSO por processo."""
+    if not max_workers or max_workers <= 1 or len(dias) <= DIAS_POR_PROCESSO:
+        return _ler_litros_dias(caminho_vendas, dias)
+
+    blocos = [dias[i:i + DIAS_POR_PROCESSO] for i in range(0, len(dias), DIAS_POR_PROCESSO)]
+    resultado: Dict[int, Optional[dict]] = {}
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(blocos))) as executor:
+        for parcial in executor.map(_ler_litros_dias, [caminho_vendas] * len(blocos), blocos):
+            resultado.update(parcial)
+    return resultado
+
+
+def atualizar_combustiveis_periodo(
+    caminho_vendas: str,
+    caminho_destino: str,
+    data_inicio: date,
+    data_fim: date,
+    max_workers: int = 1,
+    usar_historico: bool = False,
+) -> dict:
+    """
+    Modo backfill de atualizar_combustiveis: preenche as linhas (dia + 4) de todos
+    os dias do período, salvando a planilha de destino uma única vez.
+
+    Por padrão todos os dias são lidos das abas "Dia NN" em uma única abertura
+    do arquivo e registrados no histórico (utils.historico). Com
+    usar_historico=True, os dias registrados no histórico depois da última
+    alteração da planilha de vendas vêm de lá e só os demais são lidos: uma
+    correção feita na planilha depois do registro invalida o histórico.
+    max_workers > 1 divide a leitura em blocos de DIAS_POR_PROCESSO dias por
+    processo (só compensa em arquivos muito grandes; ver o benchmark).
+
+    O período deve estar dentro de um mesmo mês (uma aba "Dia NN" por dia).
+    Retorna {dia: (gas_c, gas_a, etanol, diesel)} dos dias gravados; dias com
+    aba ausente ou valores vazios são avisados e ignorados.
+    """
+    caminho_vendas = Path(caminho_vendas)
+    caminho_destino = Path(caminho_destino)
+
+    if data_fim < data_inicio:
+        raise ValueError("data_fim anterior a data_inicio.")
+    if (data_inicio.year, data_inicio.month) != (data_fim.year, data_fim.month):
+        raise ValueError("O período do backfill deve estar dentro de um único mês.")
+
+    dias = list(range(data_inicio.day, data_fim.day + 1))
+    linhas = {}
+
+    if usar_historico:
+        try:
+            alterada_em = datetime.fromtimestamp(caminho_vendas.stat().st_mtime)
+        except OSError:
+            alterada_em = None  # Sem a planilha, o histórico é a única fonte
+        try:
+            matriz = obter_historico().matriz(list(COMBUSTIVEIS), data_inicio, data_fim,
+                                              atualizado_apos=alterada_em)
+        except Exception as e:
+            print(f"[AVISO] Histórico indisponível, lendo todas as abas: {e}")
+        else:
+            for indice, dia in enumerate(dias):
+                if not np.isnan(matriz[:, indice]).any():
+                    linhas[dia] = _litros_arredondados(dict(zip(COMBUSTIVEIS, matriz[:, indice])))
+    faltantes = [dia for dia in dias if dia not in linhas]
+
+    if faltantes:
+        for dia, litros in _ler_litros_periodo(str(caminho_vendas), faltantes, max_workers).items():
+            if litros is None:
+                print(f"[AVISO] Dia {dia:02d} ignorado no backfill: aba 'Dia {dia:02d}' não encontrada")
+                continue
+            try:
+                linhas[dia] = _litros_arredondados(litros)
+            except TypeError as e:
+                # Célula vazia
+                print(f"[AVISO] Dia {dia:02d} ignorado no backfill: {e}")
+                continue
+            registrar_no_historico(data_inicio.replace(day=dia), litros, origem=caminho_vendas.name)
+
+    wb_controle = carregar_workbook(caminho_destino)
+    aba = wb_controle.active
+
+    for dia, valores in linhas.items():
+        for coluna, valor in zip(COLUNAS_COMBUSTIVEIS, valores):
+            aba[f"{coluna}{dia + 4}"] = valor
+
+    salvar_atomico(wb_controle, caminho_destino)
+    print(f"[Backfill] {len(linhas)} de {len(dias)} dia(s) gravados em {caminho_destino} "
+          f"({len(dias) - len(faltantes)} do histórico)")
+
+    return linhas
+
+
 def atualizar_dados_projecao_combustiveis(
-    caminho_vendas: str, caminho_projecao: str
+    caminho_vendas: str, caminho_projecao: str, atualizar_vinculos: bool = True
 ) -> None:
+    """
+    Grava litros, lucro, minimercado e margem de ontem na aba VENDAS GERAL da cópia.
+
+    atualizar_vinculos=False pula a atualização dos vínculos da planilha de vendas,
+    para quando ela já foi feita antes (passo "vinculos_vendas" da etapa 8): a
+    atualização regrava o arquivo e faria o snapshot do dia ser lido de novo.
+    """
     caminho_vendas = Path(caminho_vendas)
     caminho_projecao = Path(caminho_projecao)
-    from win32com.client import gencache
-
-    excel = gencache.EnsureDispatch("Excel.Application")
-    excel.Visible = False
-    wb = excel.Workbooks.Open(caminho_vendas)
-    wb.RefreshAll()
-    excel.CalculateUntilAsyncQueriesDone()
-    wb.Save()
-    wb.Close()
-    excel.Quit()
-
-    data_ontem = datetime.today() - timedelta(days=1)
+
+    if atualizar_vinculos:
+        atualizar_conexoes_excel(caminho_vendas)
+
+    data_ontem = relogio.agora() - timedelta(days=1)
     nome_aba = f"Dia {data_ontem.day:02d}"
     linha_destino = data_ontem.day + 1
 
-    df_vendas = pd.read_excel(caminho_vendas, sheet_name=nome_aba, engine="openpyxl")
+    snapshot = obter_snapshot_dia(caminho_vendas, nome_aba)
 
-    litros = 0 if pd.isna(df_vendas.iloc[29, 3]) else df_vendas.iloc[29, 3]
-    lucro = 0 if pd.isna(df_vendas.iloc[29, 4]) else df_vendas.iloc[29, 4]
-    minimercado = 0 if pd.isna(df_vendas.iloc[31, 3]) else round(df_vendas.iloc[31, 3])
-    margem = 0 if pd.isna(df_vendas.iloc[15, 6]) else df_vendas.iloc[15, 6]
+    litros = 0 if snapshot.litros is None else snapshot.litros
+    lucro = 0 if snapshot.lucro is None else snapshot.lucro
+    minimercado = 0 if snapshot.minimercado is None else round(snapshot.minimercado)
+    margem = 0 if snapshot.margem is None else snapshot.margem
     
     
     # Adiciona os dados na planilha cópia e exporta os mesmos para a planilha meu controle 
-    with xw.App(visible=True) as app:
-        app.display_alerts = False  # Desativa alertas como o de vínculos
-        app.screen_updating = False
-
-        try:
-            wb_proj = app.books.open(caminho_projecao, update_links=False)
-        except Exception as e:
-            print(f"[ERRO] Não foi possível abrir o arquivo: {e}")
-            raise
-        aba = wb_proj.sheets["VENDAS GERAL"]
-       
-        # Atribuição segura dos valores
-        aba.range(f"M{linha_destino}").value = litros
-        aba.range(f"N{linha_destino}").value = lucro
-        aba.range(f"O{linha_destino}").value = minimercado
-        aba.range(f"P{linha_destino}").value = margem
-        wb_proj.save()
-        wb_proj.close()
-        
+    # (backend headless que preserva vínculos; o Excel só é aberto se sobrar fórmula sem recalcular)
+    resultado = escrever_celulas_planilha(caminho_projecao, "VENDAS GERAL", {
+        f"M{linha_destino}": litros,
+        f"N{linha_destino}": lucro,
+        f"O{linha_destino}": minimercado,
+        f"P{linha_destino}": margem,
+    })
+    print(f"[Planilha] VENDAS GERAL atualizada via {resultado['backend']} em {caminho_projecao}")
@@ -3,39 +3,30 @@ import openpyxl
 from openpyxl import load_workbook
 from pathlib import Path
 
+from utils.excel_save import carregar_workbook, salvar_atomico
+from utils.excel_stream import ler_celulas
+from projecao.util import atualizar_conexoes_excel
+
 
 def atualizar_valores_de_vendas_geral(
     caminho_arquivo_copia: str, caminho_arquivo_meu_controle: str
 ) -> None:
-    from win32com.client import gencache
-
     caminho_arquivo_copia = Path(caminho_arquivo_copia)
     caminho_arquivo_meu_controle = Path(caminho_arquivo_meu_controle)
 
     if not caminho_arquivo_copia.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {caminho_arquivo_copia}")
 
-    excel = gencache.EnsureDispatch("Excel.Application")
-    excel.Visible = False
-
-    try:
-        wb_com = excel.Workbooks.Open(caminho_arquivo_copia)
-        wb_com.RefreshAll()
-        excel.CalculateUntilAsyncQueriesDone()
-        wb_com.Save()
-        wb_com.Close()
-    finally:
-        excel.Quit()
+    atualizar_conexoes_excel(caminho_arquivo_copia)
 
-    wb = load_workbook(caminho_arquivo_copia, data_only=True)
-    ws = wb["VENDAS GERAL"]
-    posto = ws.cell(row=35, column=13).value
-    minimercado = ws.cell(row=35, column=15).value
+    celulas = ler_celulas(caminho_arquivo_copia, {"VENDAS GERAL": ["M35", "O35"]})["VENDAS GERAL"]
+    posto = celulas["M35"]
+    minimercado = celulas["O35"]
 
-    wb_controle = openpyxl.load_workbook(caminho_arquivo_meu_controle)
+    wb_controle = carregar_workbook(caminho_arquivo_meu_controle)
     aba = wb_controle.active
     aba["H27"] = posto
     aba["H31"] = minimercado
-    wb_controle.save(caminho_arquivo_meu_controle)
+    salvar_atomico(wb_controle, caminho_arquivo_meu_controle)
 
     print(f"Arquivo modificado salvo como {caminho_arquivo_meu_controle}")
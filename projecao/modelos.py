@@ -0,0 +1,166 @@
+"""
+Modelos de Projeção Mensal - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com a projeção atual.
+O modelo "linear" é o mesmo =valor/dia_fim*dias_do_mes gravado no Meu Controle.
+
+Este módulo adiciona:
+1. Projeção de todas as categorias de uma vez, sobre arrays NumPy
+2. Modelos linear, ponderado por dia da semana e média dos últimos N dias
+3. Comparação dos modelos sobre o histórico diário (todos os dias de corte de cada mês)
+"""
+
+import calendar
+import warnings
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+
+# ============================================================================
+# MODELOS
+# ============================================================================
+# Cada modelo recebe as vendas diárias (categorias x dias, a partir do dia 1 do
+# mês), os dias de corte (array de 1 a dias_do_mes) e devolve a projeção do
+# total do mês para cada categoria e corte: (categorias x cortes).
+
+def _acumulados(diarios: np.ndarray, cortes: np.ndarray) -> np.ndarray:
+    return np.cumsum(diarios, axis=-1)[:, cortes - 1]
+
+
+def modelo_linear(diarios: np.ndarray, cortes: np.ndarray, dias_do_mes: int, **_) -> np.ndarray:
+    """Acumulado / dias decorridos * dias do mês (projeção atual)."""
+    return _acumulados(diarios, cortes) / cortes * dias_do_mes
+
+
+def modelo_ultimos_n(diarios: np.ndarray, cortes: np.ndarray, dias_do_mes: int,
+                     n: int = 7, **_) -> np.ndarray:
+    """Acumulado + média dos últimos n dias para cada dia que falta."""
+    somas = np.cumsum(diarios, axis=-1)
+    acumulado = somas[:, cortes - 1]
+    janela = np.minimum(n, cortes)
+    inicio = cortes - janela
+    antes_da_janela = np.where(inicio > 0, somas[:, np.maximum(inicio - 1, 0)], 0.0)
+    return acumulado + (acumulado - antes_da_janela) / janela * (dias_do_mes - cortes)
+
+
+def modelo_dia_semana(diarios: np.ndarray, cortes: np.ndarray, dias_do_mes: int,
+                      primeiro_dia_semana: int = 0, **_) -> np.ndarray:
+    """
+    Acumulado + média de cada dia da semana já observado no mês, aplicada aos
+    dias que faltam. Dias da semana ainda sem venda usam a média geral.
+    primeiro_dia_semana: dia da semana do dia 1 (0 = segunda, como date.weekday()).
+    """
+    semana = (primeiro_dia_semana + np.arange(dias_do_mes)) % 7
+    indicador = (semana[:, None] == np.arange(7)).astype(float)  # dias x 7
+    dias = diarios.shape[-1]
+
+    por_semana = np.cumsum(diarios[:, :, None] * indicador[None, :dias], axis=1)[:, cortes - 1]
+    observados = np.cumsum(indicador, axis=0)[cortes - 1]           # cortes x 7
+    restantes = indicador.sum(axis=0) - observados                  # cortes x 7
+
+    acumulado = _acumulados(diarios, cortes)
+    media_geral = acumulado / cortes
+    medias = np.where(observados > 0, por_semana / np.maximum(observados, 1), media_geral[:, :, None])
+    return acumulado + (medias * restantes).sum(axis=-1)
+
+
+MODELOS: Dict[str, Callable[..., np.ndarray]] = {
+    "linear": modelo_linear,
+    "dia_semana": modelo_dia_semana,
+    "ultimos_n": modelo_ultimos_n,
+}
+
+
+def _como_matriz(diarios: Any) -> np.ndarray:
+    """Categorias x dias em float; dias sem dado continuam NaN."""
+    diarios = np.asarray(diarios, dtype=float)
+    return diarios[None, :] if diarios.ndim == 1 else diarios
+
+
+# ============================================================================
+# PROJEÇÃO
+# ============================================================================
+
+def projetar_totais(acumulados: Any, dia_fim: int, dias_do_mes: int) -> np.ndarray:
+    """Modelo linear a partir só dos totais do mês até dia_fim (um por categoria)."""
+    return np.asarray(acumulados, dtype=float) / dia_fim * dias_do_mes
+
+
+def projetar(diarios: Any, dia_fim: int, dias_do_mes: int, modelo: str = "linear",
+             primeiro_dia_semana: int = 0, **parametros) -> np.ndarray:
+    """
+    Projeção do mês para cada categoria, usando as vendas dos dias 1..dia_fim.
+    diarios: categorias x dias (ou um vetor, para uma categoria só).
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconhecido: {modelo}. Disponíveis: {', '.join(MODELOS)}")
+    # Dia sem dado conta como dia sem venda, como na fórmula do Meu Controle
+    matriz = np.nan_to_num(_como_matriz(diarios))
+    if not 1 <= dia_fim <= min(matriz.shape[-1], dias_do_mes):
+        raise ValueError(f"dia_fim={dia_fim} fora do intervalo de dias disponíveis.")
+
+    resultado = MODELOS[modelo](matriz[:, :dia_fim], np.array([dia_fim]), dias_do_mes,
+                                primeiro_dia_semana=primeiro_dia_semana, **parametros)[:, 0]
+    return resultado if np.ndim(diarios) > 1 else resultado[0]
+
+
+def comparar_modelos(diarios: Any, data_inicio: date, modelos: Optional[Iterable[str]] = None,
+                     **parametros) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara os modelos sobre um histórico diário contínuo (categorias x dias,
+    começando em data_inicio). Para cada mês completo do histórico, projeta o
+    total a partir de cada dia de corte (1 a dias_do_mes - 1) e mede o erro
+    contra o total real. Meses com algum dia sem dado (NaN) ficam fora da
+    comparação: um dia faltando não é um dia sem venda.
+
+    Retorna {modelo: {"erro_medio": erro percentual absoluto médio,
+                      "erro_por_categoria": array, "meses": meses avaliados,
+                      "meses_incompletos": [(ano, mês), ...] ignorados}}.
+    """
+    matriz = _como_matriz(diarios)
+    modelos = list(modelos or MODELOS)
+    erros: Dict[str, list] = {m: [] for m in modelos}
+    incompletos = []
+
+    inicio = 0
+    dia = data_inicio
+    while inicio < matriz.shape[-1]:
+        dias_do_mes = calendar.monthrange(dia.year, dia.month)[1]
+        tamanho = dias_do_mes - dia.day + 1
+        mes = matriz[:, inicio:inicio + tamanho]
+
+        if dia.day == 1 and mes.shape[-1] == dias_do_mes and np.isnan(mes).any():
+            incompletos.append((dia.year, dia.month))
+        elif dia.day == 1 and mes.shape[-1] == dias_do_mes:
+            real = mes.sum(axis=-1)[:, None]
+            cortes = np.arange(1, dias_do_mes)
+            primeiro = dia.weekday()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for nome in modelos:
+                    previsto = MODELOS[nome](mes, cortes, dias_do_mes, primeiro_dia_semana=primeiro, **parametros)
+                    erros[nome].append(np.where(real != 0, np.abs(previsto - real) / np.abs(real), np.nan))
+
+        inicio += tamanho
+        dia += timedelta(days=tamanho)
+
+    resultado = {}
+    for nome, por_mes in erros.items():
+        if not por_mes:
+            resultado[nome] = {"erro_medio": float("nan"), "erro_por_categoria": np.array([]), "meses": 0,
+                               "meses_incompletos": list(incompletos)}
+            continue
+        todos = np.concatenate(por_mes, axis=-1)
+        with warnings.catch_warnings():
+            # Categoria sem venda em nenhum mês: erro NaN, sem aviso
+            warnings.simplefilter("ignore", RuntimeWarning)
+            por_categoria = np.nanmean(todos, axis=-1)
+            erro_medio = float(np.nanmean(por_categoria))
+        resultado[nome] = {
+            "erro_medio": erro_medio,
+            "erro_por_categoria": por_categoria,
+            "meses": len(por_mes),
+            "meses_incompletos": list(incompletos),
+        }
+    return resultado
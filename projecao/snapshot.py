@@ -0,0 +1,112 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from utils import relogio
+from utils.excel_stream import ler_celulas
+
+
+# Células da aba "Dia NN" usadas pelas projeções
+# (equivalentes aos iloc do pd.read_excel antigo: iloc[19, 3] -> D21, etc.)
+CELULAS_DIA = {
+    "gasolina_comum": "D21",
+    "gasolina_aditivada": "D22",
+    "etanol": "D25",
+    "diesel_s10": "D28",
+    "litros": "D31",
+    "lucro": "E31",
+    "minimercado": "D33",
+    "margem": "G17",
+}
+
+COMBUSTIVEIS = ("gasolina_comum", "gasolina_aditivada", "etanol", "diesel_s10")
+
+
+class SnapshotDia:
+    """
+    Valores de uma aba "Dia NN" da planilha de vendas, extraídos uma única vez.
+
+    Atributos: gasolina_comum, gasolina_aditivada, etanol, diesel_s10 (litros
+    por combustível), litros (total), lucro, minimercado e margem. Células
+    vazias ficam como None.
+    """
+
+    def __init__(self, nome_aba: str, valores: Dict[str, Any]):
+        self.nome_aba = nome_aba
+        self.gasolina_comum = valores.get("gasolina_comum")
+        self.gasolina_aditivada = valores.get("gasolina_aditivada")
+        self.etanol = valores.get("etanol")
+        self.diesel_s10 = valores.get("diesel_s10")
+        self.litros = valores.get("litros")
+        self.lucro = valores.get("lucro")
+        self.minimercado = valores.get("minimercado")
+        self.margem = valores.get("margem")
+
+    @property
+    def litros_por_combustivel(self) -> Dict[str, Any]:
+        return {nome: getattr(self, nome) for nome in COMBUSTIVEIS}
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {campo: getattr(self, campo) for campo in CELULAS_DIA}
+
+    def __repr__(self) -> str:
+        return f"SnapshotDia({self.nome_aba!r}, {self.como_dict()!r})"
+
+
+# Cache por (arquivo, mtime, aba): uma alteração no arquivo invalida a entrada
+_cache: Dict[Tuple[str, float, str], SnapshotDia] = {}
+_cache_lock = threading.Lock()
+# Uma leitura por (arquivo, aba) de cada vez: passos paralelos esperam a do outro
+_leituras: Dict[Tuple[str, str], threading.Lock] = {}
+_stats = {"leituras": 0, "reaproveitados": 0}
+
+
+def nome_aba_dia(data: Optional[datetime] = None) -> str:
+    """Nome da aba do dia (padrão: ontem), ex.: "Dia 19"."""
+    data = data or relogio.agora() - timedelta(days=1)
+    return f"Dia {data.day:02d}"
+
+
+def obter_snapshot_dia(caminho_vendas: Union[str, Path],
+                       nome_aba: Optional[str] = None) -> SnapshotDia:
+    """
+    Snapshot da aba "Dia NN" (padrão: ontem). Lê o arquivo só se ele mudou
+    desde a última leitura da mesma aba.
+    """
+    nome_aba = nome_aba or nome_aba_dia()
+    caminho = os.path.abspath(str(caminho_vendas))
+    chave = (caminho, os.path.getmtime(caminho), nome_aba)
+
+    with _cache_lock:
+        leitura = _leituras.setdefault((caminho, nome_aba), threading.Lock())
+
+    with leitura:
+        with _cache_lock:
+            snapshot = _cache.get(chave)
+            if snapshot is not None:
+                _stats["reaproveitados"] += 1
+                return snapshot
+
+        celulas = ler_celulas(caminho, {nome_aba: list(CELULAS_DIA.values())})[nome_aba]
+        snapshot = SnapshotDia(nome_aba, {campo: celulas[coord] for campo, coord in CELULAS_DIA.items()})
+
+        with _cache_lock:
+            # Entradas antigas do mesmo arquivo/aba não servem mais
+            for antiga in [c for c in _cache if c[0] == caminho and c[2] == nome_aba]:
+                del _cache[antiga]
+            _cache[chave] = snapshot
+            _stats["leituras"] += 1
+
+    return snapshot
+
+
+def limpar_cache_snapshots() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def estatisticas_snapshots() -> Dict[str, int]:
+    with _cache_lock:
+        return {**_stats, "em_cache": len(_cache)}
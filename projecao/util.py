@@ -1,15 +1,22 @@
-from datetime import datetime, timedelta
-import win32com.client as win32
+from datetime import timedelta
+
+from utils import relogio
+from utils.vinculos_externos import atualizar_vinculos_externos
+
+try:
+    import win32com.client as win32
+except ImportError:
+    win32 = None
 
 
 def obter_data_ontem_formatada():
-    data_ontem = datetime.today() - timedelta(days=1)
+    data_ontem = relogio.agora() - timedelta(days=1)
     dia_str = f"{data_ontem.day:02d}"
     dia_int = data_ontem.day
     return dia_str, dia_int
 
 
-def atualizar_conexoes_excel(caminho_arquivo: str) -> None:
+def atualizar_conexoes_excel_com(caminho_arquivo: str) -> None:
     excel = win32.gencache.EnsureDispatch("Excel.Application")
     excel.Visible = False
     try:
@@ -20,3 +27,22 @@ def atualizar_conexoes_excel(caminho_arquivo: str) -> None:
         wb.Close()
     finally:
         excel.Quit()
+
+
+def atualizar_conexoes_excel(caminho_arquivo: str) -> None:
+    """
+    Atualiza os vínculos externos do arquivo sem abrir o Excel.
+    O Excel (COM) só é usado se sobrar algo que não dá para resolver em Python,
+    como conexões de dados/consultas, e se estiver disponível.
+    """
+    resultado = atualizar_vinculos_externos(caminho_arquivo)
+    print(
+        f"[Vínculos] {resultado['vinculos']} vínculo(s), "
+        f"{resultado['formulas_atualizadas']} fórmula(s) atualizada(s) em {caminho_arquivo}"
+    )
+
+    if resultado["pendentes"]:
+        if win32 is None:
+            print(f"[AVISO] Itens não atualizados (Excel indisponível): {resultado['pendentes']}")
+            return
+        atualizar_conexoes_excel_com(caminho_arquivo)
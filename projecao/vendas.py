@@ -4,6 +4,9 @@ import calendar
 from datetime import datetime
 from pathlib import Path
 
+from utils.excel_save import carregar_workbook, salvar_atomico
+from utils.excel_stream import ler_celulas
+
 LETRA_PLANILHA = "H"
 
 def atualizar_projecao_vendas(
@@ -17,23 +20,24 @@ def atualizar_projecao_vendas(
     caminho_arquivo_vendas = Path(caminho_arquivo_vendas)
     caminho_arquivo_destino = Path(caminho_arquivo_destino)
 
-    df_chacaltaya = pd.read_excel(
-        caminho_arquivo_chacaltaya, sheet_name=nome_aba_chacaltaya, engine="openpyxl"
-    )
-    df_oceanico = pd.read_excel(
-        caminho_arquivo_vendas, sheet_name=None, engine="openpyxl"
-    )
+    # Só as células usadas: iloc[37, 2]/[37, 15] -> C39/P39 e iloc[36, 2]/[36, 15] -> C38/P38
+    celulas_chacaltaya = ler_celulas(
+        caminho_arquivo_chacaltaya, {nome_aba_chacaltaya: ["C39", "P39"]}
+    )[nome_aba_chacaltaya]
+    celulas_oceanico = ler_celulas(
+        caminho_arquivo_vendas, {nome_aba_vendas: ["C38", "P38"]}
+    )[nome_aba_vendas]
 
     # # Descobre o número de dias do mês atual
     # hoje = datetime.today()
     # dias_do_mes = calendar.monthrange(hoje.year, hoje.month)[1]
 
-    proj_loja_chacaltaya = df_chacaltaya.iloc[37, 2]
-    proj_acai_chacaltaya = df_chacaltaya.iloc[37, 15]
-    proj_loja_oceanico = df_oceanico[nome_aba_vendas].iloc[36, 2]
-    proj_acai_oceanico = df_oceanico[nome_aba_vendas].iloc[36, 15]
+    proj_loja_chacaltaya = celulas_chacaltaya["C39"]
+    proj_acai_chacaltaya = celulas_chacaltaya["P39"]
+    proj_loja_oceanico = celulas_oceanico["C38"]
+    proj_acai_oceanico = celulas_oceanico["P38"]
 
-    wb_destino = openpyxl.load_workbook(caminho_arquivo_destino)
+    wb_destino = carregar_workbook(caminho_arquivo_destino)
     aba_destino = wb_destino.active
 
     aba_destino[f"{LETRA_PLANILHA}3"] = proj_loja_chacaltaya
@@ -41,5 +45,5 @@ def atualizar_projecao_vendas(
     aba_destino[f"{LETRA_PLANILHA}26"] = proj_loja_oceanico
     aba_destino[f"{LETRA_PLANILHA}30"] = proj_acai_oceanico
 
-    wb_destino.save(caminho_arquivo_destino)
+    salvar_atomico(wb_destino, caminho_arquivo_destino)
     print(f"Arquivo modificado salvo como: {caminho_arquivo_destino}")
@@ -1,10 +1,26 @@
 import tkinter as tk
 import time
+import sys
+import multiprocessing
 from controllers.app_controller import AppController
 from interfaces.alerta_visual import mostrar_alerta_visual
 from utils.logger import inicializar_logger
 from utils.dynamic_config import auto_update_config
 
+def main_daemon(horario=None):
+    """Mantém o processo aberto e executa o pipeline diário no horário configurado."""
+    from utils.daemon import DaemonDiario
+
+    inicializar_logger()
+    daemon = DaemonDiario(horario=horario)
+    print(f"🕒 OceanicDesk em modo daemon (execução diária às {daemon.horario:%H:%M})")
+    try:
+        daemon.executar()
+    except KeyboardInterrupt:
+        daemon.parar()
+        print("Daemon encerrado.")
+
+
 def main():
     print("Iniciando OceanicDesk...")
     print("=" * 50)
@@ -52,4 +68,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # Necessário para os pools de processos no executável do PyInstaller
+    multiprocessing.freeze_support()
+    # python run.py --daemon [HH:MM]  (padrão: HORARIO_EXECUCAO do .env ou 06:00)
+    if "--daemon" in sys.argv:
+        argumentos = sys.argv[sys.argv.index("--daemon") + 1:]
+        main_daemon(argumentos[0] if argumentos else None)
+    else:
+        main()
@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+
+from utils.agendador import Passo, executar_passos, montar_dependencias
+
+
+class TestAgendador(unittest.TestCase):
+    def test_dependencias_por_arquivo(self):
+        passos = [
+            Passo("vendas", print, le=["chacaltaya.xlsx", "vendas.xlsx"], escreve=["controle.xlsx"]),
+            Passo("combustiveis", print, le=["oceanico.xlsx"], escreve=["combustivel.xlsx"]),
+            Passo("dados", print, escreve=["oceanico.xlsx", "copia.xlsx"]),
+            Passo("geral", print, escreve=["copia.xlsx", "controle.xlsx"]),
+        ]
+        self.assertEqual(montar_dependencias(passos), {
+            "vendas": [],
+            "combustiveis": [],
+            "dados": ["combustiveis"],
+            "geral": ["vendas", "dados"],
+        })
+
+    def test_vinculos_da_planilha_de_vendas_antes_dos_leitores(self):
+        from utils.excel_ops import passos_projecao
+
+        passos = passos_projecao("chacaltaya.xlsx", "vendas.xlsx", "oceanico.xlsx",
+                                 "controle.xlsx", "combustivel.xlsx", "copia.xlsx")
+        dependencias = montar_dependencias(passos)
+
+        self.assertEqual(dependencias["vinculos_vendas"], [])
+        self.assertEqual(dependencias["combustiveis"], ["vinculos_vendas"])
+        self.assertEqual(dependencias["dados_projecao_combustiveis"], ["vinculos_vendas"])
+        self.assertFalse(passos[3].kwargs["atualizar_vinculos"])
+
+    def test_independentes_em_paralelo_e_caminho_critico(self):
+        barreira = threading.Barrier(2, timeout=5)
+        ordem = []
+
+        def independente(nome):
+            barreira.wait()  # só passa se os dois rodarem ao mesmo tempo
+            ordem.append(nome)
+
+        def lento():
+            time.sleep(0.05)
+            ordem.append("lento")
+
+        passos = [
+            Passo("a", independente, escreve=["a.xlsx"], kwargs={"nome": "a"}),
+            Passo("b", independente, escreve=["b.xlsx"], kwargs={"nome": "b"}),
+            Passo("c", lento, le=["b.xlsx"], escreve=["c.xlsx"]),
+        ]
+        resultado = executar_passos(passos)
+
+        self.assertEqual(ordem[-1], "lento")
+        self.assertEqual(resultado["caminho_critico"], ["b", "c"])
+        self.assertTrue(all(p["status"] == "ok" for p in resultado["passos"].values()))
+
+    def test_erro_ignora_dependentes(self):
+        executados = []
+
+        def falha():
+            raise RuntimeError("planilha bloqueada")
+
+        def registrar(valor):
+            executados.append(valor)
+
+        passos = [
+            Passo("falha", falha, escreve=["x.xlsx"]),
+            Passo("dependente", registrar, le=["x.xlsx"], kwargs={"valor": 1}),
+            Passo("independente", registrar, escreve=["y.xlsx"], kwargs={"valor": 2}),
+        ]
+        with self.assertRaises(RuntimeError):
+            executar_passos(passos)
+        self.assertEqual(executados, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,18 +1,21 @@
 import unittest
 import os
+import shutil
+import tempfile
 from utils.arquivos import criar_backup_planilha
 
 
 class TestArquivos(unittest.TestCase):
     def test_criar_backup(self):
-        caminho = "tests/base_teste.xlsx"
-        criar_backup_planilha(caminho)
-        backups = [
-            f
-            for f in os.listdir("backups")
-            if f.startswith("backup_") and f.endswith(".xlsx")
-        ]
-        self.assertTrue(any("base_teste" not in f for f in backups))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            caminho = os.path.join(tmpdir, "base_teste.xlsx")
+            shutil.copy("tests/base_teste.xlsx", caminho)
+            criar_backup_planilha(caminho)
+
+            backup = os.path.join(tmpdir, "base_teste - BACKUP.xlsx")
+            self.assertTrue(os.path.exists(backup))
+            self.assertEqual(os.path.getsize(backup), os.path.getsize(caminho))
+        self.assertFalse(os.path.exists("tests/base_teste - BACKUP.xlsx"))
 
 
 if __name__ == "__main__":
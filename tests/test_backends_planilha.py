@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+import zipfile
+from unittest import mock
+from openpyxl import Workbook, load_workbook
+from openpyxl.packaging.relationship import Relationship
+from openpyxl.workbook.external_link.external import (
+    ExternalBook,
+    ExternalCell,
+    ExternalLink,
+    ExternalRow,
+    ExternalSheetData,
+    ExternalSheetDataSet,
+    ExternalSheetNames,
+)
+
+from utils.backends_planilha import (
+    HEADLESS,
+    BackendCom,
+    BackendXlwings,
+    EscritaNaoSuportada,
+    abrir_planilha,
+    escolher_backend,
+    escrever_celulas_planilha,
+)
+from utils.cache import ExcelCache
+from utils.vinculos_externos import atualizar_vinculos_externos, limpar_cache_origens
+
+
+class TestBackendsPlanilha(unittest.TestCase):
+    def setUp(self):
+        limpar_cache_origens()
+        # Excel "indisponível" nos testes, com ou sem os stubs de ambiente
+        for classe in (BackendXlwings, BackendCom):
+            patcher = mock.patch.object(classe, "disponivel", return_value=False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "copia.xlsx")
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "VENDAS GERAL"
+        ws["A1"] = "Dia"
+        ws["M2"] = 100
+        ws["M3"] = None
+        ws["M35"] = "=SUM(M2:M34)"
+        ws["O35"] = "=M35*2"
+        ws.cell(row=3, column=13).number_format = "0.00"
+        wb.save(self.caminho)
+        # openpyxl grava sem valores em cache; o recálculo em Python preenche
+        with abrir_planilha(self.caminho) as planilha:
+            planilha.escrever_celulas("VENDAS GERAL", {"M2": 100})
+            planilha.salvar()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_escolha_por_capacidade(self):
+        self.assertEqual(escolher_backend().nome, "xml")
+        self.assertEqual(escolher_backend([HEADLESS], excluir=["xml"]).nome, "openpyxl")
+
+    def test_xml_escreve_e_recalcula(self):
+        resultado = escrever_celulas_planilha(self.caminho, "VENDAS GERAL", {"M3": 20, "N3": 1.5, "P20": "ok"})
+
+        self.assertEqual(resultado["backend"], "xml")
+        self.assertEqual(resultado["pendentes"], [])
+        ws = load_workbook(self.caminho, data_only=True)["VENDAS GERAL"]
+        self.assertEqual((ws["M3"].value, ws["N3"].value, ws["P20"].value), (20, 1.5, "ok"))
+        self.assertEqual((ws["M35"].value, ws["O35"].value), (120, 240))
+        self.assertEqual(ws["M3"].number_format, "0.00")
+        self.assertEqual(load_workbook(self.caminho)["VENDAS GERAL"]["M35"].value, "=SUM(M2:M34)")
+
+    def test_pendentes_so_das_formulas_dependentes(self):
+        wb = load_workbook(self.caminho)
+        wb["VENDAS GERAL"]["Z1"] = "=IF(1>0,2,3)"        # não depende das células escritas
+        wb["VENDAS GERAL"]["P35"] = "=IF(O35>0,O35,0)"   # depende de M3 via M35 e O35
+        wb.save(self.caminho)
+
+        self.assertEqual(escrever_celulas_planilha(self.caminho, "VENDAS GERAL", {"A1": "Data"})["pendentes"], [])
+        resultado = escrever_celulas_planilha(self.caminho, "VENDAS GERAL", {"M3": 20})
+
+        self.assertEqual([p.split(":")[0] for p in resultado["pendentes"]], ["VENDAS GERAL!P35"])
+        self.assertEqual(load_workbook(self.caminho, data_only=True)["VENDAS GERAL"]["O35"].value, 240)
+
+    def test_gravacoes_invalidam_o_cache_do_arquivo(self):
+        cache = ExcelCache(cache_dir=Path(self.tmpdir.name) / "cache")
+        excel = BackendXlwings.__new__(BackendXlwings)
+        excel.caminho, excel._book = self.caminho, mock.Mock()
+
+        with mock.patch("utils.cache.excel_cache", cache):
+            for gravar in (lambda: escrever_celulas_planilha(self.caminho, "VENDAS GERAL", {"M3": 20}),
+                           excel.salvar):
+                cache.set_dataframe_cache(self.caminho, {"df": 1}, sheet_name="VENDAS GERAL")
+                gravar()
+                self.assertEqual(cache.get_cache_stats()["total_files"], 0)
+
+    def test_nao_sobrescreve_formula_sem_excel(self):
+        with self.assertRaises(EscritaNaoSuportada):
+            escrever_celulas_planilha(self.caminho, "VENDAS GERAL", {"M35": 1})
+        self.assertEqual(load_workbook(self.caminho)["VENDAS GERAL"]["M35"].value, "=SUM(M2:M34)")
+
+    def test_preserva_vinculos(self):
+        origem = os.path.join(self.tmpdir.name, "vendas.xlsx")
+        wb = Workbook()
+        wb.active.title = "Dia 19"
+        wb.active["D31"] = 500
+        wb.save(origem)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "VENDAS GERAL"
+        ws["M2"] = "='[1]Dia 19'!D31"
+        ws["M35"] = "=SUM(M2:M34)"
+        livro = ExternalBook(
+            sheetNames=ExternalSheetNames(sheetName=["Dia 19"]),
+            sheetDataSet=ExternalSheetDataSet(sheetData=[ExternalSheetData(sheetId=0, row=[
+                ExternalRow(r=31, cell=[ExternalCell(r="D31", v="100")])
+            ])]),
+            id="rId1",
+        )
+        vinculo = ExternalLink(externalBook=livro)
+        vinculo.file_link = Relationship(Id="rId1", Target="vendas.xlsx",
+                                         TargetMode="External", type="externalLinkPath")
+        wb._external_links.append(vinculo)
+        wb.save(self.caminho)
+        atualizar_vinculos_externos(self.caminho)
+
+        resultado = escrever_celulas_planilha(self.caminho, "VENDAS GERAL", {"M3": 25})
+
+        self.assertEqual(resultado["pendentes"], [])
+        ws = load_workbook(self.caminho, data_only=True)["VENDAS GERAL"]
+        self.assertEqual((ws["M2"].value, ws["M35"].value), (500, 525))
+        self.assertEqual(load_workbook(self.caminho)["VENDAS GERAL"]["M2"].value, "='[1]Dia 19'!D31")
+        with zipfile.ZipFile(self.caminho) as zf:
+            self.assertIn("xl/externalLinks/externalLink1.xml", zf.namelist())
+
+
+if __name__ == "__main__":
+    unittest.main()
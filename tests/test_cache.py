@@ -0,0 +1,271 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import utils.cache as cache
+from utils.cache import CacheConfig, ExcelCache, MemoryLRUCache
+
+
+class PickleLento:
+    """Objeto cuja serialização espera um evento (simula um pickle demorado)."""
+
+    def __init__(self, liberar):
+        self.liberar = liberar
+
+    def __reduce__(self):
+        self.liberar.wait(timeout=5)
+        return (int, (0,))
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.pasta = Path(self.tmpdir.name)
+        self.cache = ExcelCache(cache_dir=self.pasta / "cache")
+
+    def test_lru_por_bytes(self):
+        memoria = MemoryLRUCache(max_bytes=100)
+        memoria.put("a", 1, 40)
+        memoria.put("b", 2, 40)
+        self.assertEqual(memoria.get("a", ttl=60), 1)
+        memoria.put("c", 3, 40)
+
+        self.assertIsNone(memoria.get("b", ttl=60))
+        self.assertEqual((memoria.get("a", ttl=60), memoria.get("c", ttl=60)), (1, 3))
+        self.assertFalse(memoria.put("grande", 4, 101))
+        self.assertEqual(memoria.get_stats()["evictions"], 1)
+        self.assertEqual(memoria.size_bytes, 80)
+
+    def test_disco_promovido_para_memoria(self):
+        self.cache.set_value_cache("total", {"valor": 10})
+        novo = ExcelCache(cache_dir=self.pasta / "cache")  # memória vazia, disco com a entrada
+
+        self.assertEqual(novo.get_value_cache("total"), {"valor": 10})
+        self.assertEqual(novo.get_value_cache("total"), {"valor": 10})
+        memoria = novo.get_cache_stats()["memory"]
+        self.assertEqual((memoria["hits"], memoria["misses"], memoria["entries"]), (1, 1, 1))
+
+    def test_leituras_repetidas_na_memoria(self):
+        planilha = self.pasta / "subcategoria.xlsx"
+        pd.DataFrame({"produto": ["A", "B"], "total": [1.5, 2.5]}).to_excel(planilha, index=False)
+
+        with mock.patch.object(cache, "excel_cache", self.cache), \
+                mock.patch("pandas.read_excel", wraps=pd.read_excel) as leitura:
+            df = cache.cached_read_excel(planilha, sheet_name="Sheet1")
+            df.loc[0, "total"] = 99.0  # alteração do chamador não vaza para o cache
+            again = cache.cached_read_excel(planilha, sheet_name="Sheet1")
+
+        self.assertEqual(leitura.call_count, 1)
+        self.assertEqual(again["total"].tolist(), [1.5, 2.5])
+        self.assertEqual(self.cache.get_cache_stats()["memory"]["hits"], 1)
+
+        self.cache.invalidate_file_cache(planilha)
+        self.assertEqual(len(self.cache._memory_cache), 0)
+
+    def test_isolamento_de_dataframes_com_e_sem_copy_on_write(self):
+        df = pd.DataFrame({"total": [1.5, 2.5]})
+        for copy_on_write, compartilha in ((True, True), (False, False)):
+            with self.subTest(copy_on_write=copy_on_write), \
+                    mock.patch.object(cache, "_copy_on_write_ativo", return_value=copy_on_write):
+                copia = cache._isolar(df)
+                # Cópia rasa só quando o pandas isola as alterações; senão, profunda
+                self.assertEqual(np.shares_memory(copia["total"].to_numpy(), df["total"].to_numpy()), compartilha)
+                if not copy_on_write:
+                    copia.loc[0, "total"] = 99.0
+                    self.assertEqual(df["total"].tolist(), [1.5, 2.5])
+        self.assertEqual(cache._isolar({"a": 1}), {"a": 1})
+
+    def test_limite_do_disco_remove_os_menos_usados(self):
+        pasta = self.pasta / "limitado"
+        disco = ExcelCache(cache_dir=pasta, max_memory_mb=0, max_size_mb=0.01)  # ~10 KB
+        for nome in ("a", "b", "c"):
+            disco.set_value_cache(nome, b"x" * 3000)
+        disco.get_value_cache("a")  # "b" passa a ser o menos usado
+        disco.flush_index()
+
+        reiniciado = ExcelCache(cache_dir=pasta, max_memory_mb=0, max_size_mb=0.01)
+        reiniciado.set_value_cache("d", b"x" * 3000)
+
+        self.assertIsNone(reiniciado.get_value_cache("b"))
+        self.assertEqual([reiniciado.get_value_cache(n) is not None for n in "acd"], [True, True, True])
+        self.assertLessEqual(reiniciado.disk_size_bytes, reiniciado.max_size_bytes)
+        self.assertEqual(len(list(pasta.glob("*.cache"))), 3)
+        self.assertFalse(reiniciado.set_value_cache("grande", b"x" * 20000))
+
+    def test_dataframe_colunar_no_disco(self):
+        planilha = self.pasta / "subcategoria.xlsx"
+        planilha.write_bytes(b"conteudo")
+        df = pd.DataFrame({"produto": ["A", "B"], "total": [1.5, 2.5]})
+        self.cache.set_dataframe_cache(planilha, df, sheet_name="Sheet1")
+
+        novo = ExcelCache(cache_dir=self.pasta / "cache")
+        carregado = novo.get_dataframe_cache(planilha, sheet_name="Sheet1")
+
+        pd.testing.assert_frame_equal(carregado, df)
+        self.assertFalse(carregado["total"].to_numpy().flags.owndata)
+
+    def test_remocao_adiada_com_dataframe_mapeado(self):
+        pasta = self.pasta / "mapeado"
+        planilha = self.pasta / "vendas.xlsx"
+        planilha.write_bytes(b"v1")
+        df = pd.DataFrame({"total": [float(i) for i in range(1000)]})
+        ExcelCache(cache_dir=pasta).set_dataframe_cache(planilha, df, sheet_name="Dia 01")
+
+        disco = ExcelCache(cache_dir=pasta, max_memory_mb=0, max_size_mb=0.012)
+        mapeado = disco.get_dataframe_cache(planilha, sheet_name="Dia 01")
+        self.assertFalse(mapeado["total"].to_numpy().flags.owndata)
+        (arquivo,) = pasta.glob("df_*.cache")
+        unlink = Path.unlink
+
+        def unlink_como_no_windows(caminho, *args, **kwargs):
+            # No Windows, o arquivo de um DataFrame mapeado não pode ser apagado
+            if caminho == arquivo and mapeado is not None:
+                raise PermissionError(13, "arquivo em uso", str(caminho))
+            return unlink(caminho, *args, **kwargs)
+
+        with mock.patch.object(Path, "unlink", unlink_como_no_windows):
+            self.assertTrue(disco.set_value_cache("novo", b"x" * 6000))  # remove o DataFrame por LRU
+
+            self.assertTrue(arquivo.exists())
+            self.assertIsNone(disco.get_dataframe_cache(planilha, sheet_name="Dia 01"))
+            self.assertEqual(disco.get_cache_stats()["total_files"], 2)
+            self.assertEqual(disco.invalidate_file_cache(planilha), 1)  # continua indexado pela origem
+            self.assertEqual(mapeado["total"].sum(), df["total"].sum())
+
+            with mock.patch("os.replace", side_effect=PermissionError(13, "arquivo em uso")):
+                self.assertFalse(disco.set_dataframe_cache(planilha, df * 2, sheet_name="Dia 01"))
+
+            mapeado = None
+            disco.set_value_cache("outro", 1)  # nova gravação tenta de novo
+
+        self.assertFalse(arquivo.exists())
+        self.assertEqual(disco.get_cache_stats()["total_files"], 2)
+        self.assertEqual(disco.disk_size_bytes, sum(p.stat().st_size for p in pasta.glob("*.cache")))
+
+    def test_invalidacao_pela_origem_depois_de_modificar(self):
+        planilha = self.pasta / "vendas.xlsx"
+        planilha.write_bytes(b"v1")
+        self.cache.set_workbook_cache(planilha, {"wb": 1})
+        self.cache.set_dataframe_cache(planilha, {"df": 1}, sheet_name="Dia 01")
+        self.cache.set_value_cache("outro", 1)
+        self.cache.flush_index()
+
+        planilha.write_bytes(b"versao 2")  # mtime e tamanho mudam: o hash atual não acha nada
+        reiniciado = ExcelCache(cache_dir=self.pasta / "cache")
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("não deve varrer o diretório")):
+            self.assertEqual(reiniciado.invalidate_file_cache(planilha), 2)
+
+        self.assertEqual([p.name.split("_")[0] for p in (self.pasta / "cache").glob("*.cache")], ["val"])
+        self.assertEqual(reiniciado.invalidate_file_cache(self.pasta / "inexistente.xlsx"), 0)
+
+    def test_origem_gravada_sem_esperar_o_flush(self):
+        planilha = self.pasta / "vendas.xlsx"
+        planilha.write_bytes(b"v1")
+        self.cache.set_dataframe_cache(planilha, {"df": 1}, sheet_name="Dia 01")
+        self.cache.set_value_cache("outro", 1)
+
+        # Processo encerrado sem o flush periódico nem o atexit
+        planilha.write_bytes(b"versao 2")
+        reiniciado = ExcelCache(cache_dir=self.pasta / "cache")
+        self.assertEqual(reiniciado.invalidate_file_cache(planilha), 1)
+
+    def test_estatisticas_pelo_manifesto(self):
+        planilha = self.pasta / "vendas.xlsx"
+        planilha.write_bytes(b"v1")
+        self.cache.set_workbook_cache(planilha, {"wb": 1})
+        self.cache.set_value_cache("a", b"x" * 100)
+        self.cache.set_value_cache("b", b"x" * 200)
+        self.cache.invalidate_file_cache(planilha)
+        self.cache.flush_index()
+
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("não deve varrer o diretório")):
+            stats = self.cache.get_cache_stats()
+        reiniciado = ExcelCache(cache_dir=self.pasta / "cache").get_cache_stats()
+
+        tamanho = sum(p.stat().st_size for p in (self.pasta / "cache").glob("*.cache"))
+        self.assertEqual(stats["total_files"], 2)
+        self.assertEqual(list(stats["by_type"]), ["values"])
+        self.assertAlmostEqual(stats["total_size_mb"], tamanho / (1024 * 1024))
+        self.assertEqual((reiniciado["total_files"], reiniciado["by_type"]), (2, stats["by_type"]))
+
+    def test_pickle_lento_nao_bloqueia_outras_chaves(self):
+        liberar = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            lento = pool.submit(self.cache.set_value_cache, "lento", PickleLento(liberar))
+            # Enquanto "lento" serializa, outras chaves gravam e leem normalmente
+            self.assertTrue(self.cache.set_value_cache("rapido", 1))
+            self.assertEqual(ExcelCache(cache_dir=self.pasta / "cache").get_value_cache("rapido"), 1)
+            self.assertFalse(lento.done())
+            liberar.set()
+            self.assertTrue(lento.result(timeout=5))
+
+        self.assertEqual(list((self.pasta / "cache").glob(".*.tmp")), [])
+
+    def test_temporarios_orfaos_removidos(self):
+        self.cache.set_value_cache("total", 1)
+        self.cache.flush_index()
+        pasta = self.pasta / "cache"
+        self.assertEqual(list(pasta.glob("*.tmp")) + list(pasta.glob(".*.tmp")), [])
+
+        # Temporários de processos encerrados durante a gravação do índice
+        antigo = time.time() - CacheConfig.STALE_TEMP_SECONDS - 60
+        orfaos = [pasta / ".index.abc123.tmp", pasta / "index.4242.tmp"]
+        recente = pasta / ".index.def456.tmp"
+        for tmp_file in orfaos + [recente]:
+            tmp_file.write_text("{}", encoding="utf-8")
+        for tmp_file in orfaos:
+            os.utime(tmp_file, (antigo, antigo))
+
+        ExcelCache(cache_dir=pasta)
+        self.assertEqual([p.exists() for p in orfaos + [recente]], [False, False, True])
+
+    def test_leitura_antiga_nao_sobrescreve_gravacao_concorrente(self):
+        self.cache.set_value_cache("total", "velho")
+        self.cache._memory_cache.pop("val_total.cache")
+        load = pickle.load
+
+        def load_e_gravacao_concorrente(f):
+            data = load(f)
+            self.cache.set_value_cache("total", "novo")  # entre a leitura e a promoção
+            return data
+
+        with mock.patch.object(cache.pickle, "load", side_effect=load_e_gravacao_concorrente):
+            self.assertEqual(self.cache.get_value_cache("total"), "velho")
+        self.assertEqual(self.cache.get_value_cache("total"), "novo")
+        self.assertEqual(self.cache.get_cache_stats()["memory"]["hits"], 1)
+
+    def test_remocao_lru_nao_apaga_chave_regravada(self):
+        self.cache.set_value_cache("a", 1)
+        escolhida = self.cache._forget("val_a.cache")  # escolhida para sair por LRU...
+        self.cache.set_value_cache("a", 2)              # ...e regravada antes do unlink
+        self.cache._remove_evicted({"val_a.cache": escolhida})
+
+        self.assertTrue((self.pasta / "cache" / "val_a.cache").exists())
+        self.assertEqual(ExcelCache(cache_dir=self.pasta / "cache").get_value_cache("a"), 2)
+
+    def test_gravacoes_e_leituras_concorrentes(self):
+        leitor = ExcelCache(cache_dir=self.pasta / "cache", max_memory_mb=0)
+
+        def trabalho(i):
+            chave = f"k{i % 8}"
+            self.cache.set_value_cache(chave, list(range(i % 8, 2000)))
+            valor = leitor.get_value_cache(chave)
+            return valor is None or valor == list(range(i % 8, 2000))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            self.assertTrue(all(pool.map(trabalho, range(200))))
+        self.assertEqual(self.cache.get_cache_stats()["total_files"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
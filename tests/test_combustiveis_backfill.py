@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+from openpyxl import Workbook, load_workbook
+
+from projecao import combustiveis
+from projecao.combustiveis import atualizar_combustiveis_periodo
+from utils.historico import redefinir_historico
+
+
+class TestBackfillCombustiveis(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.vendas = os.path.join(self.tmpdir.name, "vendas.xlsx")
+        self.destino = os.path.join(self.tmpdir.name, "combustivel.xlsx")
+
+        wb = Workbook()
+        wb.remove(wb.active)
+        for dia in range(1, 6):
+            ws = wb.create_sheet(f"Dia {dia:02d}")
+            ws["D21"] = 1000 + dia + 0.4
+            ws["D22"] = 500 + dia
+            ws["D25"] = 300 + dia + 0.6
+            ws["D28"] = 800 + dia
+        wb["Dia 04"]["D25"] = None
+        wb.save(self.vendas)
+        Workbook().save(self.destino)
+        self.historico = redefinir_historico(os.path.join(self.tmpdir.name, "historico.sqlite3"))
+
+    def tearDown(self):
+        self.historico.fechar()
+        self.tmpdir.cleanup()
+
+    def test_preenche_periodo_em_uma_gravacao(self):
+        linhas = atualizar_combustiveis_periodo(
+            self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 6), max_workers=2
+        )
+
+        # Dia 04 tem célula vazia e Dia 06 não existe
+        self.assertEqual(sorted(linhas), [1, 2, 3, 5])
+        ws = load_workbook(self.destino).active
+        self.assertEqual([ws[f"{c}5"].value for c in "DEFG"], [1001, 501, 302, 801])
+        self.assertEqual(ws["D9"].value, 1005)
+        self.assertIsNone(ws["D8"].value)
+
+    def _alterar_mtime_vendas(self, segundos):
+        mtime = os.path.getmtime(self.vendas) + segundos
+        os.utime(self.vendas, (mtime, mtime))
+
+    def test_dias_do_historico_nao_releem_a_planilha(self):
+        atualizar_combustiveis_periodo(self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 3), max_workers=2)
+        os.remove(self.vendas)
+        Workbook().save(self.destino)
+
+        linhas = atualizar_combustiveis_periodo(self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 3),
+                                                usar_historico=True)
+
+        self.assertEqual(sorted(linhas), [1, 2, 3])
+        self.assertEqual(load_workbook(self.destino).active["D5"].value, 1001)
+
+    def test_historico_anterior_a_correcao_da_planilha_e_ignorado(self):
+        self._alterar_mtime_vendas(-60)
+        atualizar_combustiveis_periodo(self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 2))
+        with mock.patch.object(combustiveis, "LeitorStreaming") as leitor:
+            atualizar_combustiveis_periodo(self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 2),
+                                           usar_historico=True)
+        leitor.assert_not_called()
+
+        # Correção na planilha depois do registro no histórico
+        wb = load_workbook(self.vendas)
+        wb["Dia 01"]["D21"] = 1200
+        wb.save(self.vendas)
+        self._alterar_mtime_vendas(60)
+
+        for usar_historico in (False, True):
+            with self.subTest(usar_historico=usar_historico):
+                linhas = atualizar_combustiveis_periodo(self.vendas, self.destino, date(2025, 7, 1),
+                                                        date(2025, 7, 2), usar_historico=usar_historico)
+                self.assertEqual(linhas[1][0], 1200)
+                self.assertEqual(load_workbook(self.destino).active["D5"].value, 1200)
+
+    def test_periodo_curto_le_em_serie_com_uma_abertura(self):
+        with mock.patch.object(combustiveis, "ProcessPoolExecutor") as pool, \
+                mock.patch.object(combustiveis, "LeitorStreaming", wraps=combustiveis.LeitorStreaming) as leitor:
+            linhas = atualizar_combustiveis_periodo(
+                self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 6), max_workers=4, usar_historico=False
+            )
+
+        pool.assert_not_called()
+        self.assertEqual(leitor.call_count, 1)
+        self.assertEqual(sorted(linhas), [1, 2, 3, 5])
+
+    def test_blocos_de_dias_no_pool(self):
+        with mock.patch.object(combustiveis, "DIAS_POR_PROCESSO", 2):
+            linhas = atualizar_combustiveis_periodo(
+                self.vendas, self.destino, date(2025, 7, 1), date(2025, 7, 6), max_workers=2, usar_historico=False
+            )
+        self.assertEqual(sorted(linhas), [1, 2, 3, 5])
+
+    def test_periodo_em_meses_diferentes(self):
+        with self.assertRaises(ValueError):
+            atualizar_combustiveis_periodo(self.vendas, self.destino, date(2025, 6, 30), date(2025, 7, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import logging
+import sys
+import tempfile
+import types
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from utils import relogio
+from utils.daemon import DaemonDiario, _religar_nomes_config, executar_pipeline_diario
+from utils.logger import ArquivoDiarioHandler
+
+
+class RelogioSimulado:
+    """Relógio que só anda quando o daemon "dorme"."""
+
+    def __init__(self, inicio):
+        self.momento = inicio
+
+    def __call__(self):
+        return self.momento
+
+    def dormir(self, segundos):
+        self.momento += timedelta(seconds=segundos)
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.relogio = RelogioSimulado(datetime(2025, 2, 27, 22, 0))
+        anterior = relogio.definir_relogio(self.relogio)
+        self.addCleanup(relogio.definir_relogio, anterior)
+
+    def test_valores_derivados_seguem_o_relogio(self):
+        self.assertEqual((relogio.ontem(), relogio.dias_do_mes()), (date(2025, 2, 26), 28))
+        with relogio.relogio_fixo(date(2024, 3, 1)):
+            self.assertEqual(relogio.data_ontem_formatada(), "29/02/2024")
+            self.assertEqual(relogio.dias_do_mes(), 31)
+        self.assertEqual(relogio.hoje(), date(2025, 2, 27))
+
+    def test_executa_no_horario_com_datas_de_cada_dia(self):
+        datas = []
+
+        def preparar():
+            return {"ontem": relogio.ontem(), "dias_do_mes": relogio.dias_do_mes()}
+
+        daemon = DaemonDiario(tarefa=lambda: datas.append(relogio.agora()), horario="06:30",
+                              preparar=preparar, dormir=self.relogio.dormir, espera_maxima_s=600)
+        execucoes = daemon.executar(max_execucoes=3)
+
+        self.assertEqual(datas, [datetime(2025, 2, 28, 6, 30), datetime(2025, 3, 1, 6, 30),
+                                 datetime(2025, 3, 2, 6, 30)])
+        self.assertEqual([e["datas"]["dias_do_mes"] for e in execucoes], [28, 31, 31])
+        self.assertEqual(execucoes[1]["datas"]["ontem"], date(2025, 2, 28))
+
+    def test_erro_nao_derruba_o_daemon(self):
+        def falha():
+            raise RuntimeError("planilha bloqueada")
+
+        daemon = DaemonDiario(tarefa=falha, horario="23:00", preparar=None, dormir=self.relogio.dormir)
+        execucoes = daemon.executar(max_execucoes=2)
+
+        self.assertEqual([e["status"] for e in execucoes], ["erro", "erro"])
+        self.assertEqual(execucoes[0]["erro"], "planilha bloqueada")
+        self.assertEqual(daemon.proxima_execucao(), datetime(2025, 3, 1, 23, 0))
+
+    def test_pipeline_do_daemon_nao_para_em_caixas_de_mensagem(self):
+        from tkinter import messagebox
+
+        class AppController:
+            def __init__(self, root):
+                pass
+
+            def executar_todas(self):
+                # Como utils.etapas: from tkinter import messagebox; messagebox.showinfo(...)
+                messagebox.showinfo("Etapa 1", "Backup e preços atualizados com sucesso!")
+                messagebox.showerror("Erro", "Insira apenas números válidos.")
+                self.resposta = messagebox.askquestion("Confirmar", "Executar de novo?")
+                executadas.append(self.resposta)
+
+        executadas = []
+        controller = types.ModuleType("controllers.app_controller")
+        controller.AppController = AppController
+        modal = mock.Mock(side_effect=AssertionError("caixa modal aberta no daemon"))
+        with mock.patch.dict(sys.modules, {"controllers.app_controller": controller}), \
+                mock.patch("tkinter.Tk"), mock.patch("tkinter.messagebox._show", modal):
+            daemon = DaemonDiario(tarefa=executar_pipeline_diario, horario="06:30",
+                                  preparar=None, dormir=self.relogio.dormir)
+            execucoes = daemon.executar(max_execucoes=2)
+
+        self.assertEqual([e["status"] for e in execucoes], ["ok", "ok"])
+        self.assertEqual(executadas, ["no", "no"])
+        modal.assert_not_called()
+        self.assertNotEqual(messagebox.showinfo.__module__, "utils.daemon")  # restaurado
+
+    def test_config_recarregada_em_todos_os_modulos(self):
+        antigos = {"EMAIL_REMETENTE": "antigo@posto", "SENHA_EMAIL": "velha", "MODO_DEV": False}
+        novos = {"EMAIL_REMETENTE": "novo@posto", "SENHA_EMAIL": "nova", "MODO_DEV": False}
+        email = types.ModuleType("email_simulado")
+        email.EMAIL_REMETENTE, email.SENHA_EMAIL = antigos["EMAIL_REMETENTE"], antigos["SENHA_EMAIL"]
+        outro = types.ModuleType("outro_simulado")
+        outro.EMAIL_REMETENTE = "proprio@posto"  # mesmo nome, valor que não veio de config
+
+        with mock.patch.dict(sys.modules, {"email_simulado": email, "outro_simulado": outro}):
+            religados = _religar_nomes_config(antigos, novos)
+
+        self.assertEqual((email.EMAIL_REMETENTE, email.SENHA_EMAIL), ("novo@posto", "nova"))
+        self.assertEqual(outro.EMAIL_REMETENTE, "proprio@posto")
+        self.assertIn("email_simulado.SENHA_EMAIL", religados)
+
+    def test_log_troca_de_arquivo_quando_o_dia_muda(self):
+        class Hoje(datetime):
+            atual = datetime(2025, 2, 27, 23, 59)
+
+            @classmethod
+            def today(cls):
+                return cls.atual
+
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch("utils.logger.datetime", Hoje):
+            handler = ArquivoDiarioHandler(Path(tmpdir), "log")
+            registro = logging.getLogger("teste_diario")
+            registro.propagate = False
+            registro.addHandler(handler)
+            try:
+                registro.warning("antes")
+                Hoje.atual = datetime(2025, 2, 28, 0, 1)
+                registro.warning("depois")
+            finally:
+                registro.removeHandler(handler)
+                handler.close()
+
+            self.assertEqual((Path(tmpdir) / "log_2025-02-27.log").read_text(encoding="utf-8"), "antes\n")
+            self.assertEqual((Path(tmpdir) / "log_2025-02-28.log").read_text(encoding="utf-8"), "depois\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.dataframe_colunar import carregar_dataframe, gravar_dataframe, pode_gravar_colunar
+
+
+class TestDataframeColunar(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.caminho = Path(self.tmpdir.name) / "df.cache"
+        self.df = pd.DataFrame({
+            "codigo": np.arange(5, dtype="int64"),
+            "produto": ["A", "B", None, "D", "E"],
+            "total": [1.5, 2.5, np.nan, 4.0, 5.25],
+            "ativo": [True, False, True, True, False],
+            "data": pd.date_range("2025-07-01", periods=5),
+        }, index=pd.Index(list("vwxyz"), name="linha"))
+        self.df.attrs["origem"] = "subcategoria.xlsx"
+
+    def test_ida_e_volta(self):
+        self.assertTrue(pode_gravar_colunar(self.df))
+        self.assertFalse(pode_gravar_colunar(self.df[["produto"]]))
+        with open(self.caminho, "wb") as f:
+            gravar_dataframe(f, self.df)
+
+        carregado = carregar_dataframe(self.caminho)
+
+        pd.testing.assert_frame_equal(carregado, self.df)
+        self.assertEqual(carregado.attrs, {"origem": "subcategoria.xlsx"})
+
+    def test_colunas_numericas_sem_copia(self):
+        with open(self.caminho, "wb") as f:
+            gravar_dataframe(f, self.df)
+        conteudo = self.caminho.read_bytes()
+
+        carregado = carregar_dataframe(self.caminho)
+        total = carregado["total"].to_numpy()
+        self.assertFalse(total.flags.owndata)
+        self.assertIsInstance(total.base, (np.ndarray, np.memmap))
+
+        carregado.loc["v", "total"] = 99.0  # copy-on-write: o arquivo não muda
+        self.assertEqual(self.caminho.read_bytes(), conteudo)
+        self.assertEqual(carregar_dataframe(self.caminho).loc["v", "total"], 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
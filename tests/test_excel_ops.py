@@ -1,6 +1,47 @@
+import os
+import tempfile
 import unittest
-from openpyxl import load_workbook
-from utils.excel_ops import copiar_intervalo_k5_r14, formatar_coluna_o_em_vermelho
+from datetime import date
+from pathlib import Path
+from unittest import mock
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+from utils import relogio
+from utils.excel_ops import (
+    copiar_intervalo,
+    copiar_intervalo_k5_r14,
+    copiar_intervalo_para_dias,
+    executar_relatorios_meu_controle,
+    formatar_coluna_o_em_vermelho,
+    montar_formulas_projecao,
+    montar_projecoes,
+    relatorio_cerveja_tmp,
+    _data_do_dia,
+    _perfil_padrao,
+    dias_do_mes,
+)
+
+
+# Fórmulas gravadas pelas antigas funções relatorio_*_tmp / extrair_valores_*,
+# uma por categoria, para (oceanic, chacal): dia_fim=19 em um mês de 30 dias
+FORMULAS_ANTIGAS = {
+    "combustiveis": ({"H32": "=1500.5/19*30", "H33": "=800/19*30", "H34": "=250.25/19*30", "H36": "=3000.0/19*30"},
+                     {"H10": "=1500.5/19*30", "H11": "=800/19*30", "H12": "=250.25/19*30", "H13": "=3000.0/19*30"}),
+    "bebidas_nao_alcoolicas": ({"H39": "=9991.68/19*30"}, {"H17": "=9991.68/19*30"}),
+    "bomboniere": ({"H40": "=9991.68/19*30"}, {"H18": "=9991.68/19*30"}),
+    "cerveja": ({"H41": "=9991.68/19*30"}, {"H19": "=9991.68/19*30"}),
+    "isqueiros": ({"H43": "=12.0/19*30"}, {"H21": "=12.0/19*30"}),
+    "cigarro": ({"H44": "=9991.68/19*30"}, {"H22": "=9991.68/19*30"}),
+}
+VALORES_EXTRAIDOS = {
+    "combustiveis": {"gasolina_comum": 1500.5, "gasolina_aditivada": 800,
+                     "etanol_comum": 250.25, "diesel_s10": 3000.0},
+    "bebidas_nao_alcoolicas": {"total": 9991.678},
+    "bomboniere": {"total": 9991.68},
+    "cerveja": {"total": 9991.68},
+    "isqueiros": {"total": 12.0},
+    "cigarro": {"total": 9991.68},
+}
 
 
 class TestExcelOps(unittest.TestCase):
@@ -25,6 +66,138 @@ class TestExcelOps(unittest.TestCase):
         )
         self.assertTrue(cor is None or "FF0000" in cor)
 
+    def test_copiar_intervalo_ignora_mescladas(self):
+        wb = Workbook()
+        origem = wb.active
+        origem.title = "Dia 01"
+        destino = wb.create_sheet("Dia 02")
+        for row in range(5, 15):
+            for col in range(11, 19):
+                origem.cell(row=row, column=col, value=row * 100 + col)
+        origem["K5"].font = Font(bold=True)
+        destino.merge_cells("L6:M7")
+
+        copiadas = copiar_intervalo(origem, [destino], "K5:R14", estilos=True)
+
+        self.assertEqual(copiadas, 80 - 3)
+        self.assertEqual(destino["L6"].value, 612)
+        self.assertEqual(destino["R14"].value, 1418)
+        self.assertTrue(destino["K5"].font.bold)
+
+    def test_copiar_intervalo_entre_workbooks(self):
+        origem = Workbook().active
+        for cor in ("FF0000", "00FF00", "0000FF"):  # índices que o destino não tem
+            origem["A1"].fill = PatternFill("solid", fgColor=cor)
+        origem["K5"] = 1.5
+        origem["K5"].font = Font(bold=True, color="FF0000")
+        origem["K5"].fill = PatternFill("solid", fgColor="FFFF00")
+        origem["K5"].number_format = "0.00%"
+        outro = Workbook()
+
+        copiar_intervalo(origem, outro.active, "K5:K5", estilos=True)
+
+        celula = outro.active["K5"]
+        self.assertTrue(celula.font.bold)
+        self.assertEqual(celula.fill.fgColor.rgb, "00FFFF00")
+        self.assertEqual(celula.number_format, "0.00%")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outro.save(os.path.join(tmpdir, "destino.xlsx"))
+            salvo = load_workbook(os.path.join(tmpdir, "destino.xlsx")).active["K5"]
+        self.assertEqual((salvo.value, salvo.font.color.rgb), (1.5, "00FF0000"))
+
+    def test_copiar_intervalo_para_dias(self):
+        wb = Workbook()
+        wb.active.title = "Dia 01"
+        wb.active["K5"] = "base"
+        for dia in range(2, 31):
+            wb.create_sheet(f"Dia {dia:02d}")
+
+        copiadas = copiar_intervalo_para_dias(wb, "Dia 01", range(1, 31))
+
+        self.assertEqual(copiadas, 29 * 80)
+        self.assertEqual(wb["Dia 30"]["K5"].value, "base")
+        with self.assertRaises(ValueError):
+            copiar_intervalo_para_dias(wb, "Dia 01", [31])
+
+    def test_montar_projecoes_formula_ou_valor(self):
+        valores = {"cerveja": {"total": 300.0}, "isqueiros": {"total": 12}}
+        perfil = _perfil_padrao()
+
+        formulas, projecoes = montar_projecoes(valores, 10, perfil)
+        self.assertEqual(formulas["H41"], montar_formulas_projecao("cerveja", valores["cerveja"], 10)["H41"])
+        self.assertTrue(formulas["H43"].startswith("=12/10*"))
+
+        gravados, _ = montar_projecoes(valores, 10, perfil, modo="valor")
+        self.assertEqual(gravados, projecoes)
+        self.assertAlmostEqual(gravados["H41"], 300.0 / 10 * dias_do_mes)
+
+    def test_projecao_usa_o_mes_do_relogio(self):
+        perfil = _perfil_padrao()
+        with relogio.relogio_fixo(date(2025, 2, 20)):
+            formulas, _ = montar_projecoes({"cerveja": {"total": 300.0}}, 19, perfil)
+        self.assertTrue(formulas["H41"].endswith("/19*28"))
+
+    def test_tabela_gera_as_mesmas_formulas_das_funcoes_antigas(self):
+        with relogio.relogio_fixo(date(2025, 6, 20)):
+            for categoria, (oceanic, chacal) in FORMULAS_ANTIGAS.items():
+                with self.subTest(categoria=categoria):
+                    valores = VALORES_EXTRAIDOS[categoria]
+                    self.assertEqual(montar_formulas_projecao(categoria, valores, 19), oceanic)
+                    self.assertEqual(montar_formulas_projecao(categoria, valores, 19, chacal=True), chacal)
+
+    def test_data_do_dia(self):
+        with relogio.relogio_fixo(date(2025, 3, 5)):
+            self.assertEqual(_data_do_dia(5), date(2025, 3, 5))
+            self.assertEqual(_data_do_dia(4), date(2025, 3, 4))
+            self.assertEqual(_data_do_dia(28), date(2025, 2, 28))
+            self.assertEqual(_data_do_dia(30), date(2025, 1, 30))  # fevereiro não tem dia 30
+            for invalido in (0, 32, -1, "19", None):
+                with self.subTest(dia=invalido), self.assertRaises(ValueError):
+                    _data_do_dia(invalido)
+
+    def test_total_nao_numerico_interrompe_o_relatorio(self):
+        with self.assertRaises(ValueError):
+            montar_formulas_projecao("cerveja", {"total": None}, 19)
+        # Combustíveis mantêm a célula, como o antigo fluxo fazia
+        formulas = montar_formulas_projecao("combustiveis", {**VALORES_EXTRAIDOS["combustiveis"], "etanol_comum": None}, 19)
+        self.assertEqual(set(formulas), {"H32", "H33", "H36"})
+
+    def test_relatorio_tmp_grava_a_formula_antiga(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "Desktop").mkdir()
+            wb = Workbook()
+            wb.active["A5"] = "Total Geral (Todos os Departamentos)"
+            wb.active["R5"] = "9.991,68"
+            wb.save(Path(tmpdir) / "Desktop" / "tmp.xlsx")
+            meu_controle = os.path.join(tmpdir, "meu_controle.xlsx")
+            Workbook().save(meu_controle)
+
+            with mock.patch.object(Path, "home", return_value=Path(tmpdir)), \
+                    mock.patch.dict(os.environ, {"CAMINHO_MEU_CONTROLE": meu_controle}), \
+                    mock.patch("utils.excel_ops.registrar_acumulados_no_historico"), \
+                    relogio.relogio_fixo(date(2025, 6, 20)):
+                relatorio_cerveja_tmp(19)
+
+            self.assertEqual(load_workbook(meu_controle).active["H41"].value, FORMULAS_ANTIGAS["cerveja"][0]["H41"])
+            self.assertFalse((Path(tmpdir) / "Desktop" / "tmp.xlsx").exists())
+
+    def test_relatorios_meu_controle_em_modo_valor(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            relatorio = os.path.join(tmpdir, "cerveja.xlsx")
+            wb = Workbook()
+            wb.active["A5"] = "Total Geral (Todos os Departamentos)"
+            wb.active["R5"] = "9.991,68"
+            wb.save(relatorio)
+            meu_controle = os.path.join(tmpdir, "meu_controle.xlsx")
+            Workbook().save(meu_controle)
+
+            with mock.patch("utils.excel_ops.registrar_acumulados_no_historico"), \
+                    relogio.relogio_fixo(date(2025, 6, 20)):
+                executar_relatorios_meu_controle({"cerveja": relatorio}, 19, caminho_meu_controle=meu_controle,
+                                                 modo="valor")
+
+            self.assertAlmostEqual(load_workbook(meu_controle).active["H41"].value, 9991.68 / 19 * 30)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from utils.excel_save import carregar_workbook, contar_alteracoes, get_save_stats, salvar_atomico
+
+
+class TestExcelSave(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "controle.xlsx")
+        wb = Workbook()
+        wb.active["H3"] = 100
+        wb.save(self.caminho)
+        os.utime(self.caminho, (0, 1000))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sem_alteracao_nao_grava(self):
+        antes = get_save_stats()
+        wb = carregar_workbook(self.caminho)
+        wb.active["H3"] = 100
+
+        self.assertEqual(contar_alteracoes(wb), 0)
+        self.assertFalse(salvar_atomico(wb, self.caminho))
+        self.assertEqual(os.path.getmtime(self.caminho), 1000)
+        self.assertEqual(get_save_stats()["gravacoes_evitadas"], antes["gravacoes_evitadas"] + 1)
+
+    def test_alteracao_grava_atomicamente(self):
+        antes = get_save_stats()
+        wb = carregar_workbook(self.caminho)
+        wb.active["H7"] = 50
+        wb.active["H3"].font = Font(color="FF0000")
+
+        self.assertEqual(contar_alteracoes(wb), 2)
+        self.assertTrue(salvar_atomico(wb, self.caminho))
+        self.assertEqual(load_workbook(self.caminho).active["H7"].value, 50)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["controle.xlsx"])
+        self.assertGreater(get_save_stats()["bytes_gravados"], antes["bytes_gravados"])
+        # Estado atualizado após gravar
+        self.assertEqual(contar_alteracoes(wb), 0)
+
+    def test_alteracoes_fora_das_celulas_gravam(self):
+        wb = carregar_workbook(self.caminho)
+        wb.active.column_dimensions["H"].width = 42
+        self.assertEqual(contar_alteracoes(wb), 1)
+        self.assertTrue(salvar_atomico(wb, self.caminho))
+        self.assertEqual(load_workbook(self.caminho).active.column_dimensions["H"].width, 42)
+
+        wb = carregar_workbook(self.caminho)
+        wb.active.row_dimensions[3].height = 30
+        validacao = DataValidation(type="list", formula1='"sim,não"')
+        validacao.add("H4")
+        wb.active.add_data_validation(validacao)
+        wb.active.sheet_properties.tabColor = "FF0000"
+        wb.defined_names["TOTAL"] = DefinedName("TOTAL", attr_text="Sheet!$H$3")
+        self.assertEqual(contar_alteracoes(wb), 4)
+        self.assertTrue(salvar_atomico(wb, self.caminho))
+
+        salvo = load_workbook(self.caminho)
+        self.assertEqual(salvo.active.row_dimensions[3].height, 30)
+        self.assertEqual(len(salvo.active.data_validations.dataValidation), 1)
+        self.assertIn("TOTAL", salvo.defined_names)
+        self.assertEqual(contar_alteracoes(carregar_workbook(self.caminho)), 0)
+
+    def test_falha_na_gravacao_preserva_original(self):
+        wb = carregar_workbook(self.caminho)
+        wb.active["H7"] = 50
+
+        def gravacao_interrompida(destino):
+            with open(destino, "wb") as arquivo:
+                arquivo.write(b"PK parcial")
+            raise OSError("disco cheio")
+
+        with mock.patch.object(wb, "save", side_effect=gravacao_interrompida):
+            with self.assertRaises(OSError):
+                salvar_atomico(wb, self.caminho)
+        self.assertEqual(load_workbook(self.caminho).active["H3"].value, 100)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["controle.xlsx"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from openpyxl import Workbook
+
+from utils.excel_stream import (
+    LeitorStreaming,
+    coordenada_do_iloc,
+    indexar_rotulos,
+    ler_celulas,
+    localizar_valor_por_rotulo,
+    somar_por_nome,
+)
+
+
+class TestExcelStream(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "tmp.xlsx")
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Relatorio"
+        for linha in range(1, 200):
+            ws[f"A{linha}"] = f"Produto {linha}"
+            ws[f"K{linha}"] = linha
+            ws[f"R{linha}"] = linha * 1.5
+        ws["A150"] = "Total Geral (Todos os Departamentos)"
+        ws["K150"] = 1234
+        ws["R150"] = 9991.68
+        ws["B10"] = "Rotulo B"
+        ws["A180"] = "Total Geral (Todos os Departamentos)"
+        wb.create_sheet("Outra")["B2"] = "texto"
+        wb.save(self.caminho)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_localiza_primeira_ocorrencia(self):
+        self.assertEqual(
+            localizar_valor_por_rotulo(self.caminho, "Total Geral (Todos os Departamentos)", "R"),
+            (150, 9991.68),
+        )
+        self.assertEqual(
+            localizar_valor_por_rotulo(self.caminho, "Total Geral (Todos os Departamentos)", "K"),
+            (150, 1234),
+        )
+
+    def test_rotulo_ausente(self):
+        self.assertIsNone(localizar_valor_por_rotulo(self.caminho, "Inexistente", "R"))
+
+    def test_valor_antes_do_rotulo(self):
+        self.assertEqual(
+            localizar_valor_por_rotulo(self.caminho, "Rotulo B", "A", coluna_rotulo="B"),
+            (10, "Produto 10"),
+        )
+
+    def test_ler_celula_outra_aba(self):
+        with LeitorStreaming(self.caminho) as leitor:
+            self.assertEqual(leitor.nomes_abas, ["Relatorio", "Outra"])
+            self.assertEqual(leitor.ler_celula(2, "B", "Outra"), "texto")
+            self.assertIsNone(leitor.ler_celula(3, "B", "Outra"))
+
+    def test_indexar_rotulos(self):
+        rotulos = ["PRODUTO 3", "produto 120", "Total Geral (Todos os Departamentos)", "Ausente"]
+        valores = indexar_rotulos(self.caminho, rotulos, "K", colunas_rotulo=["A", "B"])
+        self.assertEqual(valores, {
+            "PRODUTO 3": 3,
+            "produto 120": 120,
+            "Total Geral (Todos os Departamentos)": 1234,
+            "Ausente": None,
+        })
+
+    def test_indexar_rotulos_para_cedo(self):
+        valores = indexar_rotulos(self.caminho, [" produto 1 ", "PRODUTO 2"], "R")
+        self.assertEqual(valores, {" produto 1 ": 1.5, "PRODUTO 2": 3.0})
+
+    def test_somar_por_nome(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["", "Produto", None, None, None, None, None, None, "Qtd"])
+        ws.append([1, " isqueiro bic mini ", None, None, None, None, None, None, "1.234,50"])
+        ws.append([2, "ISQUEIRO BIC MAXXI", None, None, None, None, None, None, 10])
+        ws.append([3, "ISQUEIRO BIC MAXXI", None, None, None, None, None, None, "inválido"])
+        ws.append([4, "OUTRO PRODUTO", None, None, None, None, None, None, 99])
+        ws.append([5, "ISQUEIRO BIC MINI"])
+        caminho = os.path.join(self.tmpdir.name, "isqueiros.xlsx")
+        wb.save(caminho)
+
+        total = somar_por_nome(caminho, ["ISQUEIRO BIC MINI", "ISQUEIRO BIC MAXXI"], "B", "I")
+        self.assertAlmostEqual(total, 1244.5)
+
+    def test_ler_celulas_equivale_ao_iloc(self):
+        import pandas as pd
+
+        wb = Workbook()
+        wb.active.title = "Abril"
+        for nome in ["Abril", "Dia 19"]:
+            ws = wb[nome] if nome in wb.sheetnames else wb.create_sheet(nome)
+            ws["A1"] = "Cabeçalho"
+            for linha in range(2, 45):
+                ws[f"C{linha}"] = linha * 2
+                ws[f"P{linha}"] = linha / 4
+        wb["Dia 19"]["D33"] = None
+        caminho = os.path.join(self.tmpdir.name, "vendas.xlsx")
+        wb.save(caminho)
+
+        celulas = ler_celulas(caminho, {
+            "Abril": [coordenada_do_iloc(36, 2), coordenada_do_iloc(36, 15)],
+            "Dia 19": ["C21", "D33"],
+        })
+        df = pd.read_excel(caminho, sheet_name="Abril", engine="openpyxl")
+        self.assertEqual(coordenada_do_iloc(36, 2), "C38")
+        self.assertEqual(celulas["Abril"], {"C38": df.iloc[36, 2], "P38": df.iloc[36, 15]})
+        self.assertEqual(celulas["Dia 19"], {"C21": 42, "D33": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
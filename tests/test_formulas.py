@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from openpyxl import Workbook, load_workbook
+
+from unittest import mock
+
+from utils.cache import ExcelCache
+from utils.formulas import AvaliadorFormulas, FormulaNaoSuportada, preencher_valores_em_cache
+
+
+class TestFormulas(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "tmp.xlsx")
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Relatorio"
+        for linha in range(1, 11):
+            ws[f"A{linha}"] = f"Produto {linha}"
+            ws[f"P{linha}"] = linha * 10.5
+        ws["A11"] = "PIX - CIELO"
+        ws["P11"] = "=SUM(P1:P10)"
+        ws["P12"] = "=P11/2+$P$1*(3-1)"
+        ws["P13"] = "=ROUND(AVERAGE(P1:P4),1)-MAX(P1,P2)+MIN(P1:P3)"
+        ws["P14"] = "=SUBTOTAL(9,P1:P3)"
+        ws["P15"] = "='Outra Aba'!B2*-2"
+        ws["P16"] = "=VLOOKUP(A1,A1:P10,16,FALSE)"
+        wb.create_sheet("Outra Aba")["B2"] = 4
+        wb.save(self.caminho)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_avaliacao(self):
+        wb = load_workbook(self.caminho)
+        avaliador = AvaliadorFormulas(wb, load_workbook(self.caminho, data_only=True))
+        self.assertAlmostEqual(avaliador.valor("Relatorio", "P11"), 577.5)
+        self.assertAlmostEqual(avaliador.valor("Relatorio", "P12"), 577.5 / 2 + 21)
+        self.assertAlmostEqual(avaliador.valor("Relatorio", "P13"), 26.3 - 21 + 10.5)
+        self.assertAlmostEqual(avaliador.valor("Relatorio", "P14"), 63)
+        self.assertEqual(avaliador.valor("Relatorio", "P15"), -8)
+        with self.assertRaises(FormulaNaoSuportada):
+            avaliador.valor("Relatorio", "P16")
+
+    def test_dependentes(self):
+        wb = load_workbook(self.caminho)
+        avaliador = AvaliadorFormulas(wb, load_workbook(self.caminho, data_only=True))
+
+        # P3 entra em P11 e P13 (intervalos) e em P14; P12 depende de P11
+        self.assertEqual(avaliador.dependentes([("Relatorio", "P3")]),
+                         {("Relatorio", c) for c in ("P11", "P12", "P13", "P14", "P16")})
+        self.assertEqual(avaliador.dependentes([("Outra Aba", "$B$2")]), {("Relatorio", "P15")})
+        self.assertEqual(avaliador.dependentes(vinculos_externos=True), set())
+
+    def test_referencia_circular(self):
+        wb = load_workbook(self.caminho)
+        wb.active["B1"] = "=B2+1"
+        wb.active["B2"] = "=B1"
+        avaliador = AvaliadorFormulas(wb, load_workbook(self.caminho, data_only=True))
+        with self.assertRaises(FormulaNaoSuportada):
+            avaliador.valor("Relatorio", "B1")
+
+    def test_preencher_valores_em_cache(self):
+        resultado = preencher_valores_em_cache(self.caminho)
+        self.assertEqual(resultado, {"formulas": 6, "calculadas": 5, "pendentes": 1})
+
+        ws = load_workbook(self.caminho, data_only=True)["Relatorio"]
+        self.assertAlmostEqual(ws["P11"].value, 577.5)
+        self.assertEqual(ws["P15"].value, -8)
+        # Fórmula não suportada fica como estava para o Excel resolver
+        self.assertEqual(load_workbook(self.caminho)["Relatorio"]["P16"].value,
+                         "=VLOOKUP(A1,A1:P10,16,FALSE)")
+
+    def test_preencher_valores_invalida_o_cache(self):
+        cache = ExcelCache(cache_dir=Path(self.tmpdir.name) / "cache")
+        cache.set_dataframe_cache(self.caminho, {"df": 1}, sheet_name="Relatorio")
+        with mock.patch("utils.cache.excel_cache", cache):
+            preencher_valores_em_cache(self.caminho)
+        self.assertEqual(cache.get_cache_stats()["total_files"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+from openpyxl import Workbook
+
+from utils.historico import HistoricoVendas, importar_planilha_mes
+
+
+class TestHistorico(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.historico = HistoricoVendas(os.path.join(self.tmpdir.name, "historico.sqlite3"))
+
+    def tearDown(self):
+        self.historico.fechar()
+        self.tmpdir.cleanup()
+
+    def test_registrar_e_consultar(self):
+        self.historico.registrar(date(2025, 7, 1), {"litros": 1000, "pix": "1.234,50", "obs": "texto"})
+        self.historico.registrar(date(2025, 7, 3), {"litros": 1200})
+        self.historico.registrar(date(2025, 7, 3), {"litros": 1300})  # reprocessamento substitui
+        self.historico.registrar(date(2025, 7, 3), {"litros": 50}, posto="chacaltaya")
+
+        self.assertEqual(self.historico.valores_do_dia(date(2025, 7, 1)), {"litros": 1000.0, "pix": 1234.5})
+        self.assertEqual(self.historico.serie("litros", "2025-07-01", "2025-07-31"),
+                         {date(2025, 7, 1): 1000.0, date(2025, 7, 3): 1300.0})
+        self.assertEqual(self.historico.totais_mes(2025, 7)["litros"], 2300.0)
+
+        matriz = self.historico.matriz(["litros", "pix"], date(2025, 7, 1), date(2025, 7, 3))
+        self.assertEqual(matriz.shape, (2, 3))
+        np.testing.assert_array_equal(matriz[0], [1000.0, np.nan, 1300.0])
+
+    def test_importar_planilha_mes(self):
+        caminho = os.path.join(self.tmpdir.name, "Vendas Julho.xlsx")
+        wb = Workbook()
+        wb.remove(wb.active)
+        for dia in (1, 2, 3):
+            ws = wb.create_sheet(f"Dia {dia:02d}")
+            ws["D21"] = 1000 + dia
+            ws["D31"] = 3000 + dia
+            ws["H21"] = 10.5
+        wb.save(caminho)
+
+        resultado = importar_planilha_mes(caminho, 2025, 7, historico=self.historico)
+
+        self.assertEqual(resultado["dias"], 3)
+        self.assertEqual(len(resultado["abas_ausentes"]), 28)
+        self.assertEqual(self.historico.valores_do_dia(date(2025, 7, 2)),
+                         {"gasolina_comum": 1002.0, "litros": 3002.0, "cashback": 10.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from openpyxl import Workbook, load_workbook
+
+from utils.meu_controle import (
+    MeuControleSession,
+    sessao_meu_controle,
+    gravar_no_meu_controle,
+    get_sessao_ativa,
+)
+
+
+class TestMeuControleSession(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "meu_controle.xlsx")
+        wb = Workbook()
+        wb.active["A1"] = "Meu Controle"
+        wb.save(self.caminho)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_flush_unico(self):
+        with sessao_meu_controle(self.caminho) as sessao:
+            gravar_no_meu_controle({"H39": "=100/10*30"}, self.caminho)
+            gravar_no_meu_controle({"H40": "=50/10*30", "h41": 7}, self.caminho)
+            self.assertEqual(len(sessao.pendentes), 3)
+            self.assertIsNone(load_workbook(self.caminho).active["H39"].value)
+
+        self.assertIsNone(get_sessao_ativa())
+        self.assertEqual(sessao.flushes, 1)
+        ws = load_workbook(self.caminho).active
+        self.assertEqual(ws["H39"].value, "=100/10*30")
+        self.assertEqual(ws["H41"].value, 7)
+        self.assertEqual(ws["A1"].value, "Meu Controle")
+
+    def test_rollback(self):
+        sessao = MeuControleSession(self.caminho)
+        sessao.registrar("H39", 1)
+        self.assertEqual(sessao.rollback(), 1)
+        self.assertEqual(sessao.flush(), 0)
+        self.assertIsNone(load_workbook(self.caminho).active["H39"].value)
+
+    def test_erro_sem_flush(self):
+        with self.assertRaises(RuntimeError):
+            with sessao_meu_controle(self.caminho, flush_on_error=False):
+                gravar_no_meu_controle({"H39": 1}, self.caminho)
+                raise RuntimeError("falha no relatório")
+        self.assertIsNone(load_workbook(self.caminho).active["H39"].value)
+
+    def test_sem_sessao_grava_na_hora(self):
+        gravar_no_meu_controle({"H42": "=1/1*30"}, self.caminho)
+        self.assertEqual(load_workbook(self.caminho).active["H42"].value, "=1/1*30")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from datetime import date
+
+import numpy as np
+
+from projecao.modelos import comparar_modelos, projetar, projetar_totais
+
+
+class TestModelosProjecao(unittest.TestCase):
+    def setUp(self):
+        # Vendas com padrão semanal: fim de semana vende o dobro
+        self.inicio = date(2024, 1, 1)
+        dias = np.arange(366)
+        semana = np.array([(self.inicio.weekday() + d) % 7 for d in dias])
+        base = np.where(semana >= 5, 200.0, 100.0)
+        self.historico = np.vstack([base, base * 3, np.full(366, 50.0)])
+
+    def test_linear_igual_a_formula_atual(self):
+        acumulados = [1500.0, 42.5]
+        np.testing.assert_allclose(projetar_totais(acumulados, 10, 30), [1500.0 / 10 * 30, 42.5 / 10 * 30])
+        janeiro = self.historico[:, :31]
+        np.testing.assert_allclose(projetar(janeiro, 10, 31), janeiro[:, :10].sum(axis=1) / 10 * 31)
+
+    def test_modelos_exatos_nos_casos_base(self):
+        janeiro = self.historico[:, :31]
+        real = janeiro.sum(axis=1)
+        # Dia 14: todos os dias da semana já observados
+        np.testing.assert_allclose(projetar(janeiro, 14, 31, "dia_semana", self.inicio.weekday()), real)
+        self.assertAlmostEqual(projetar(janeiro[2], 5, 31, "ultimos_n", n=3), 50.0 * 31)
+        with self.assertRaises(ValueError):
+            projetar(janeiro, 10, 31, "inexistente")
+
+    def test_comparar_modelos_no_historico(self):
+        resultado = comparar_modelos(self.historico, self.inicio, n=7)
+
+        self.assertEqual({r["meses"] for r in resultado.values()}, {12})
+        self.assertLess(resultado["dia_semana"]["erro_medio"], resultado["linear"]["erro_medio"])
+        self.assertAlmostEqual(resultado["linear"]["erro_por_categoria"][2], 0.0)
+
+    def test_mes_com_dia_faltando_fica_fora_da_comparacao(self):
+        historico = self.historico.copy()
+        historico[:, 40] = np.nan  # 10/02 sem dado
+        resultado = comparar_modelos(historico, self.inicio, n=7)
+
+        self.assertEqual({r["meses"] for r in resultado.values()}, {11})
+        self.assertEqual(resultado["linear"]["meses_incompletos"], [(2024, 2)])
+        self.assertAlmostEqual(resultado["linear"]["erro_por_categoria"][2], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from openpyxl import Workbook, load_workbook
+
+from utils import postos
+from utils.excel_ops import (
+    ISQUEIROS_CHACALTAYA,
+    ISQUEIROS_OCEANIC,
+    executar_relatorios_meu_controle,
+    relatorio_cerveja_tmp,
+    relatorio_isqueiro_tmp,
+)
+from utils.historico import redefinir_historico
+from utils.meu_controle import sessao_meu_controle
+from utils.postos import coleta_relatorios_postos, executar_perfis_postos, perfis_padrao
+
+
+class TestPostos(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.meu_controle = os.path.join(self.tmpdir.name, "meu_controle.xlsx")
+        self.historico = redefinir_historico(os.path.join(self.tmpdir.name, "historico.sqlite3"))
+        Workbook().save(self.meu_controle)
+
+        self.relatorios = {}
+        for posto, coluna, isqueiros in (("oceanic", "R", ISQUEIROS_OCEANIC), ("chacal", "K", ISQUEIROS_CHACALTAYA)):
+            wb = Workbook()
+            ws = wb.active
+            ws["A5"] = "Total Geral (Todos os Departamentos)"
+            ws[f"{coluna}5"] = 300.0
+            ws["B6"] = isqueiros[0]
+            ws["I6"] = 12
+            caminho = os.path.join(self.tmpdir.name, f"{posto}.xlsx")
+            wb.save(caminho)
+            self.relatorios[posto] = {"cerveja": caminho, "isqueiros": caminho}
+
+    def tearDown(self):
+        self.historico.fechar()
+        self.tmpdir.cleanup()
+
+    def test_postos_em_paralelo(self):
+        perfis = perfis_padrao(self.relatorios["oceanic"], self.relatorios["chacal"], self.meu_controle)
+        resultado = executar_perfis_postos(perfis, dia_fim=10, max_workers=2)
+
+        self.assertEqual(set(resultado["postos"]), {"oceanic", "chacaltaya"})
+        for posto in resultado["postos"].values():
+            self.assertIsNone(posto["erro"])
+            self.assertEqual(posto["resultados"]["cerveja"], {"total": 300.0})
+            self.assertEqual(posto["resultados"]["isqueiros"], {"total": 12})
+            self.assertGreaterEqual(posto["duracao_ms"], 0)
+
+        ws = load_workbook(self.meu_controle).active
+        self.assertTrue(ws["H41"].value.startswith("=300.00/10*"))
+        self.assertTrue(ws["H19"].value.startswith("=300.00/10*"))
+        self.assertTrue(ws["H43"].value.startswith("=12.0/10*"))
+        self.assertTrue(ws["H21"].value.startswith("=12.0/10*"))
+        self.assertEqual(set(self.historico.metricas("chacaltaya")), {"acumulado.cerveja.total", "acumulado.isqueiros.total"})
+
+    def test_equivale_ao_fluxo_chacal(self):
+        perfis = perfis_padrao(self.relatorios["oceanic"], self.relatorios["chacal"], self.meu_controle)
+        paralelo = executar_perfis_postos(perfis, dia_fim=10, max_workers=1, gravar=False)
+
+        executar_relatorios_meu_controle(self.relatorios["chacal"], 10, chacal=True,
+                                         caminho_meu_controle=self.meu_controle)
+        ws = load_workbook(self.meu_controle).active
+        for celula, formula in paralelo["postos"]["chacaltaya"]["formulas"].items():
+            self.assertEqual(ws[celula].value, formula)
+
+    def test_erro_em_um_posto(self):
+        self.relatorios["chacal"]["cerveja"] = os.path.join(self.tmpdir.name, "inexistente.xlsx")
+        perfis = perfis_padrao(self.relatorios["oceanic"], self.relatorios["chacal"], self.meu_controle)
+        resultado = executar_perfis_postos(perfis, dia_fim=10, max_workers=2)
+
+        self.assertIsNotNone(resultado["postos"]["chacaltaya"]["erro"])
+        self.assertIsNone(resultado["postos"]["oceanic"]["erro"])
+        self.assertTrue(load_workbook(self.meu_controle).active["H41"].value.startswith("=300.00/10*"))
+
+    def test_coleta_da_etapa_8(self):
+        os.makedirs(os.path.join(self.tmpdir.name, "Desktop"))
+        caminho_tmp = os.path.join(self.tmpdir.name, "Desktop", "tmp.xlsx")
+        exportacoes = [(relatorio_cerveja_tmp, False), (relatorio_isqueiro_tmp, False),
+                       (relatorio_cerveja_tmp, True), (relatorio_isqueiro_tmp, True)]
+
+        with mock.patch.object(Path, "home", return_value=Path(self.tmpdir.name)), \
+                mock.patch.dict(os.environ, {"CAMINHO_MEU_CONTROLE": self.meu_controle}), \
+                mock.patch.object(postos, "executar_perfis_postos", wraps=executar_perfis_postos) as executar:
+            with sessao_meu_controle(self.meu_controle), coleta_relatorios_postos(self.meu_controle, max_workers=2):
+                for relatorio, chacal in exportacoes:
+                    shutil.copy(self.relatorios["chacal" if chacal else "oceanic"]["cerveja"], caminho_tmp)
+                    relatorio(10, chacal=chacal)
+                    self.assertFalse(os.path.exists(caminho_tmp))
+                executar.assert_not_called()
+
+        executar.assert_called_once()
+        self.assertEqual([p["nome"] for p in executar.call_args.args[0]], ["oceanic", "chacaltaya"])
+        ws = load_workbook(self.meu_controle).active
+        for celula in ("H41", "H19"):
+            self.assertTrue(ws[celula].value.startswith("=300.00/10*"))
+        for celula in ("H43", "H21"):
+            self.assertTrue(ws[celula].value.startswith("=12.0/10*"))
+
+    def test_coleta_com_erro_de_leitura(self):
+        with self.assertRaises(RuntimeError):
+            with coleta_relatorios_postos(self.meu_controle, max_workers=1) as coleta:
+                caminho_tmp = os.path.join(self.tmpdir.name, "tmp.xlsx")
+                shutil.copy(self.relatorios["oceanic"]["cerveja"], caminho_tmp)
+                postos.adiar_relatorio_tmp("cerveja", caminho_tmp, 10)
+                with open(caminho_tmp, "wb") as arquivo:
+                    arquivo.write(b"corrompido")
+                postos.adiar_relatorio_tmp("cerveja", caminho_tmp, 10, chacal=True)
+
+        self.assertIsNone(postos.get_coleta_ativa())
+        self.assertFalse(coleta["pasta"].exists())
+        # O posto sem erro é gravado mesmo assim
+        self.assertTrue(load_workbook(self.meu_controle).active["H41"].value.startswith("=300.00/10*"))
+
+
+if __name__ == "__main__":
+    unittest.main()
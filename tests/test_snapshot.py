@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from openpyxl import Workbook
+
+from projecao import snapshot as snapshot_mod
+from projecao.snapshot import obter_snapshot_dia, limpar_cache_snapshots
+
+
+class TestSnapshotDia(unittest.TestCase):
+    def setUp(self):
+        limpar_cache_snapshots()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "vendas.xlsx")
+        self._salvar(gasolina=1500.4)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _salvar(self, gasolina):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Dia 19"
+        ws["D21"] = gasolina
+        ws["D22"] = 800
+        ws["D25"] = 300.6
+        ws["D28"] = 950
+        ws["D31"] = 3551
+        ws["E31"] = 4200.5
+        ws["D33"] = 1234.7
+        ws["G17"] = 0.18
+        wb.save(self.caminho)
+
+    def test_extrai_campos(self):
+        snapshot = obter_snapshot_dia(self.caminho, "Dia 19")
+        self.assertEqual(snapshot.litros_por_combustivel, {
+            "gasolina_comum": 1500.4,
+            "gasolina_aditivada": 800,
+            "etanol": 300.6,
+            "diesel_s10": 950,
+        })
+        self.assertEqual((snapshot.litros, snapshot.lucro, snapshot.minimercado, snapshot.margem),
+                         (3551, 4200.5, 1234.7, 0.18))
+
+    def test_cache_por_mtime(self):
+        with mock.patch.object(snapshot_mod, "ler_celulas", wraps=snapshot_mod.ler_celulas) as leitura:
+            primeiro = obter_snapshot_dia(self.caminho, "Dia 19")
+            self.assertIs(obter_snapshot_dia(self.caminho, "Dia 19"), primeiro)
+            self.assertEqual(leitura.call_count, 1)
+
+            self._salvar(gasolina=10)
+            os.utime(self.caminho, (0, os.path.getmtime(self.caminho) + 5))
+            self.assertEqual(obter_snapshot_dia(self.caminho, "Dia 19").gasolina_comum, 10)
+            self.assertEqual(leitura.call_count, 2)
+
+    def test_leituras_simultaneas_da_mesma_aba(self):
+        # Os passos "combustiveis" e "dados_projecao_combustiveis" rodam em paralelo
+        with mock.patch.object(snapshot_mod, "ler_celulas", wraps=snapshot_mod.ler_celulas) as leitura:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                snapshots = list(pool.map(lambda _: obter_snapshot_dia(self.caminho, "Dia 19"), range(4)))
+
+        self.assertEqual(leitura.call_count, 1)
+        self.assertTrue(all(s is snapshots[0] for s in snapshots))
+
+
+if __name__ == "__main__":
+    unittest.main()
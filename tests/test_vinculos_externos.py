@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from openpyxl import Workbook, load_workbook
+from openpyxl.packaging.relationship import Relationship
+from openpyxl.workbook.external_link.external import (
+    ExternalBook,
+    ExternalCell,
+    ExternalLink,
+    ExternalRow,
+    ExternalSheetData,
+    ExternalSheetDataSet,
+    ExternalSheetNames,
+)
+
+from utils.vinculos_externos import (
+    atualizar_vinculos_externos,
+    limpar_cache_origens,
+    resolver_caminho_origem,
+)
+
+
+class TestVinculosExternos(unittest.TestCase):
+    def setUp(self):
+        limpar_cache_origens()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.origem = os.path.join(self.tmpdir.name, "vendas.xlsx")
+        self.copia = os.path.join(self.tmpdir.name, "copia.xlsx")
+
+        wb = Workbook()
+        wb.active.title = "Dia 19"
+        wb.active["D31"] = 500
+        wb.active["E31"] = 7.5
+        wb.save(self.origem)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "VENDAS GERAL"
+        ws["M2"] = "='[1]Dia 19'!D31"
+        ws["N2"] = "='[1]Dia 19'!E31*2"
+        ws["M35"] = "=SUM(M2:M34)"
+        livro = ExternalBook(
+            sheetNames=ExternalSheetNames(sheetName=["Dia 19"]),
+            sheetDataSet=ExternalSheetDataSet(sheetData=[ExternalSheetData(sheetId=0, row=[
+                ExternalRow(r=31, cell=[ExternalCell(r="D31", v="100"), ExternalCell(r="E31", v="1")])
+            ])]),
+            id="rId1",
+        )
+        vinculo = ExternalLink(externalBook=livro)
+        vinculo.file_link = Relationship(Id="rId1", Target=r"C:\Postos\Oceanico\vendas.xlsx",
+                                         TargetMode="External", type="externalLinkPath")
+        wb._external_links.append(vinculo)
+        wb.save(self.copia)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_resolve_origem_movida(self):
+        self.assertEqual(
+            str(resolver_caminho_origem(r"file:///C:\Postos\Oceanico\vendas.xlsx", self.tmpdir.name)),
+            self.origem,
+        )
+        self.assertIsNone(resolver_caminho_origem("inexistente.xlsx", self.tmpdir.name))
+
+    def test_atualiza_vinculos_e_formulas(self):
+        resultado = atualizar_vinculos_externos(self.copia)
+
+        self.assertEqual(resultado["pendentes"], [])
+        self.assertEqual(resultado["celulas_vinculo_atualizadas"], 2)
+        ws = load_workbook(self.copia, data_only=True)["VENDAS GERAL"]
+        self.assertEqual((ws["M2"].value, ws["N2"].value, ws["M35"].value), (500, 15.0, 500))
+        # Fórmulas e vínculo continuam no arquivo
+        self.assertEqual(load_workbook(self.copia)["VENDAS GERAL"]["M2"].value, "='[1]Dia 19'!D31")
+
+    def test_formula_nao_suportada_que_depende_do_vinculo(self):
+        wb = load_workbook(self.copia)
+        ws = wb["VENDAS GERAL"]
+        ws["P2"] = "=IF(M2>0,M2,0)"   # depende do vínculo através de M2
+        ws["Q2"] = "=P2*2"            # e Q2 através de P2
+        ws["Z1"] = "=IF(1>0,2,3)"     # não depende de vínculo: não é pendência
+        wb.save(self.copia)
+
+        resultado = atualizar_vinculos_externos(self.copia)
+
+        self.assertEqual(sorted(p.split(":")[0] for p in resultado["pendentes"]),
+                         ["VENDAS GERAL!P2", "VENDAS GERAL!Q2"])
+        self.assertEqual(load_workbook(self.copia, data_only=True)["VENDAS GERAL"]["M2"].value, 500)
+
+    def test_sem_mudanca_nao_grava(self):
+        atualizar_vinculos_externos(self.copia)
+        os.utime(self.copia, (0, 1000))
+
+        resultado = atualizar_vinculos_externos(self.copia)
+
+        self.assertFalse(resultado["gravado"])
+        self.assertEqual(os.path.getmtime(self.copia), 1000)
+
+    def test_origem_ausente_fica_pendente(self):
+        os.remove(self.origem)
+        resultado = atualizar_vinculos_externos(self.copia)
+        self.assertEqual(len(resultado["pendentes"]), 1)
+        self.assertFalse(resultado["gravado"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from openpyxl import Workbook, load_workbook
+
+from utils.workbook_pool import (
+    WorkbookPool,
+    abrir_workbook,
+    etapa_workbooks,
+    salvar_workbook,
+    sessao_workbooks,
+    workbook_pool,
+)
+
+
+class TestWorkbookPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.tmpdir.name, "planilha.xlsx")
+        wb = Workbook()
+        wb.active.title = "Dia 19"
+        wb.save(self.caminho)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sessao_carrega_e_salva_uma_vez(self):
+        antes = dict(workbook_pool.stats)
+        with sessao_workbooks():
+            for etapa, celula in enumerate(["D33", "D21", "H21", "E45"], start=1):
+                wb = abrir_workbook(self.caminho)
+                wb["Dia 19"][celula] = etapa
+                salvar_workbook(wb, self.caminho)
+            # Nada gravado ainda
+            self.assertIsNone(load_workbook(self.caminho)["Dia 19"]["D33"].value)
+
+        self.assertEqual(workbook_pool.stats["carregamentos"] - antes["carregamentos"], 1)
+        self.assertEqual(workbook_pool.stats["carregamentos_evitados"] - antes["carregamentos_evitados"], 3)
+        self.assertEqual(workbook_pool.stats["salvamentos"] - antes["salvamentos"], 1)
+        ws = load_workbook(self.caminho)["Dia 19"]
+        self.assertEqual([ws[c].value for c in ["D33", "D21", "H21", "E45"]], [1, 2, 3, 4])
+
+    def test_etapa_que_falha_nao_grava_nem_contamina_a_seguinte(self):
+        with sessao_workbooks(salvar_em_checkpoint=True):
+            with etapa_workbooks("Etapa 1"):
+                wb = abrir_workbook(self.caminho)
+                wb["Dia 19"]["D33"] = 1
+                salvar_workbook(wb, self.caminho)
+            # Gravado antes de a etapa terminar (alertas de sucesso não mentem)
+            self.assertEqual(load_workbook(self.caminho)["Dia 19"]["D33"].value, 1)
+
+            with self.assertRaises(RuntimeError), etapa_workbooks("Etapa 2"):
+                wb = abrir_workbook(self.caminho)
+                wb["Dia 19"]["D21"] = "parcial"  # alterado em memória, sem salvar
+                raise RuntimeError("falha no meio da etapa")
+
+            with etapa_workbooks("Etapa 3"):
+                wb = abrir_workbook(self.caminho)
+                self.assertIsNone(wb["Dia 19"]["D21"].value)
+                wb["Dia 19"]["H21"] = 3
+                salvar_workbook(wb, self.caminho)
+
+        ws = load_workbook(self.caminho)["Dia 19"]
+        self.assertEqual([ws[c].value for c in ["D33", "D21", "H21"]], [1, None, 3])
+
+    def test_uma_gravacao_por_etapa(self):
+        salvamentos = workbook_pool.stats["salvamentos"]
+        with sessao_workbooks():
+            with etapa_workbooks("Etapa 1"):
+                for celula in ("D33", "H21", "H22"):
+                    wb = abrir_workbook(self.caminho)
+                    wb["Dia 19"][celula] = 1
+                    salvar_workbook(wb, self.caminho)
+                self.assertIsNone(load_workbook(self.caminho)["Dia 19"]["D33"].value)
+            self.assertEqual(load_workbook(self.caminho)["Dia 19"]["H22"].value, 1)
+            self.assertEqual(workbook_pool.stats["salvamentos"] - salvamentos, 1)
+
+            with etapa_workbooks("Etapa 2"):
+                abrir_workbook(self.caminho)  # só leitura: nada a gravar
+
+        self.assertEqual(workbook_pool.stats["salvamentos"] - salvamentos, 1)
+
+    def test_sessao_com_erro_descarta_pendentes(self):
+        with self.assertRaises(RuntimeError), sessao_workbooks():
+            wb = abrir_workbook(self.caminho)
+            wb["Dia 19"]["D33"] = 1
+            salvar_workbook(wb, self.caminho)
+            raise RuntimeError("falha antes do fim da sessão")
+
+        self.assertIsNone(load_workbook(self.caminho)["Dia 19"]["D33"].value)
+        self.assertEqual(workbook_pool.get_stats()["workbooks_abertos"], 0)
+
+    def test_sem_sessao_salva_na_hora(self):
+        wb = abrir_workbook(self.caminho)
+        wb["Dia 19"]["D33"] = 10
+        salvar_workbook(wb, self.caminho)
+        self.assertEqual(load_workbook(self.caminho)["Dia 19"]["D33"].value, 10)
+
+    def test_recarrega_se_arquivo_mudou(self):
+        pool = WorkbookPool()
+        primeiro = pool.obter(self.caminho)
+        self.assertIs(pool.obter(self.caminho), primeiro)
+
+        wb = load_workbook(self.caminho)
+        wb["Dia 19"]["A1"] = "externo"
+        wb.save(self.caminho)
+        os.utime(self.caminho, (0, 12345))
+
+        recarregado = pool.obter(self.caminho)
+        self.assertIsNot(recarregado, primeiro)
+        self.assertEqual(recarregado["Dia 19"]["A1"].value, "externo")
+        self.assertEqual(pool.salvar(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+"""
+Agendador de Passos por Dependência de Arquivos - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com a execução sequencial.
+Passos que tocam os mesmos arquivos continuam rodando na ordem em que foram
+declarados, e o erro de um passo é propagado como antes.
+
+Este módulo adiciona:
+1. Declaração dos arquivos lidos e gravados por cada passo
+2. Grafo de dependências derivado dos conflitos de arquivo (leitura/gravação)
+3. Execução concorrente dos passos independentes, gravadores do mesmo arquivo em série
+4. Relatório de tempos e do caminho crítico, com integração a logging e métricas
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+# Passos que usam xlwings/COM precisam do COM inicializado na thread (Windows)
+try:
+    import pythoncom
+    COM_AVAILABLE = True
+except ImportError:
+    COM_AVAILABLE = False
+
+
+# ============================================================================
+# PASSOS
+# ============================================================================
+
+def _normalizar(caminho: Union[str, Path]) -> str:
+    return os.path.normcase(os.path.abspath(str(caminho)))
+
+
+class Passo:
+    """
+    Um passo do agendador: função, argumentos e os arquivos que ela lê e grava.
+
+    Um arquivo atualizado no lugar (ex.: vínculos externos recalculados) deve
+    aparecer em `escreve`; não é preciso repeti-lo em `le`.
+    """
+
+    def __init__(self, nome: str, funcao: Callable[..., Any],
+                 le: Iterable[Union[str, Path]] = (),
+                 escreve: Iterable[Union[str, Path]] = (),
+                 kwargs: Optional[Dict[str, Any]] = None):
+        self.nome = nome
+        self.funcao = funcao
+        self.kwargs = kwargs or {}
+        self.escreve = {_normalizar(c) for c in escreve}
+        self.le = {_normalizar(c) for c in le} - self.escreve
+
+    def conflita_com(self, outro: "Passo") -> bool:
+        """Dois passos conflitam se um grava um arquivo que o outro lê ou grava."""
+        return bool(self.escreve & (outro.le | outro.escreve) or outro.escreve & self.le)
+
+    def __repr__(self) -> str:
+        return f"Passo({self.nome!r})"
+
+
+def montar_dependencias(passos: List[Passo]) -> Dict[str, List[str]]:
+    """
+    {passo: [passos que precisam terminar antes]}. Entre dois passos em conflito
+    vale a ordem de declaração, a mesma da execução sequencial.
+    """
+    nomes = [p.nome for p in passos]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"Nomes de passo repetidos: {nomes}")
+
+    dependencias = {}
+    for i, passo in enumerate(passos):
+        dependencias[passo.nome] = [anterior.nome for anterior in passos[:i] if passo.conflita_com(anterior)]
+    return dependencias
+
+
+def caminho_critico(dependencias: Dict[str, List[str]], duracoes: Dict[str, float]) -> List[str]:
+    """Sequência de passos dependentes com a maior soma de durações."""
+    acumulado: Dict[str, float] = {}
+    anterior: Dict[str, Optional[str]] = {}
+    for nome, deps in dependencias.items():  # ordem de declaração já é topológica
+        melhor = max(deps, key=lambda d: acumulado[d], default=None)
+        acumulado[nome] = duracoes.get(nome, 0.0) + (acumulado[melhor] if melhor else 0.0)
+        anterior[nome] = melhor
+
+    if not acumulado:
+        return []
+    nome = max(acumulado, key=acumulado.get)
+    caminho = []
+    while nome is not None:
+        caminho.append(nome)
+        nome = anterior[nome]
+    return caminho[::-1]
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def _executar_passo(passo: Passo) -> None:
+    if COM_AVAILABLE and threading.current_thread() is not threading.main_thread():
+        pythoncom.CoInitialize()
+        try:
+            passo.funcao(**passo.kwargs)
+        finally:
+            pythoncom.CoUninitialize()
+    else:
+        passo.funcao(**passo.kwargs)
+
+
+def executar_passos(passos: List[Passo], max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Executa os passos respeitando as dependências de arquivo; passos sem
+    conflito rodam ao mesmo tempo em threads.
+
+    Se um passo falhar, os que dependem dele não são executados, os
+    independentes terminam normalmente e o primeiro erro é propagado no fim.
+
+    Retorna {"passos": {nome: {inicio_ms, fim_ms, duracao_ms, status}},
+             "dependencias", "caminho_critico", "duracao_critica_ms", "duracao_total_ms"}.
+    """
+    dependencias = montar_dependencias(passos)
+    por_nome = {p.nome: p for p in passos}
+    relatorio: Dict[str, Dict[str, Any]] = {}
+    erros: List[BaseException] = []
+    concluidos: set = set()
+    pendentes = list(dependencias)
+    em_execucao: Dict[Any, str] = {}
+
+    start_time = time.time()
+
+    def _rodar(nome: str) -> None:
+        inicio = time.time()
+        try:
+            _executar_passo(por_nome[nome])
+        finally:
+            fim = time.time()
+            relatorio[nome] = {
+                "inicio_ms": (inicio - start_time) * 1000,
+                "fim_ms": (fim - start_time) * 1000,
+                "duracao_ms": (fim - inicio) * 1000,
+            }
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(passos) or 1) as executor:
+        while pendentes or em_execucao:
+            for nome in list(pendentes):
+                deps = dependencias[nome]
+                if any(relatorio.get(d, {}).get("status") in ("erro", "ignorado") for d in deps):
+                    pendentes.remove(nome)
+                    relatorio[nome] = {"inicio_ms": None, "fim_ms": None, "duracao_ms": 0.0, "status": "ignorado"}
+                elif all(d in concluidos for d in deps):
+                    pendentes.remove(nome)
+                    em_execucao[executor.submit(_rodar, nome)] = nome
+
+            if not em_execucao:
+                continue
+
+            prontos, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+            for future in prontos:
+                nome = em_execucao.pop(future)
+                erro = future.exception()
+                if erro is None:
+                    relatorio[nome]["status"] = "ok"
+                    concluidos.add(nome)
+                else:
+                    relatorio[nome]["status"] = "erro"
+                    erros.append(erro)
+                    if LOGGING_AVAILABLE:
+                        logger.error(f"[Agendador] Passo {nome} falhou: {erro}")
+
+    duracao_total_ms = (time.time() - start_time) * 1000
+    duracoes = {nome: dados["duracao_ms"] for nome, dados in relatorio.items()}
+    critico = caminho_critico(dependencias, duracoes)
+    duracao_critica_ms = sum(duracoes[nome] for nome in critico)
+
+    for nome in dependencias:
+        dados = relatorio[nome]
+        print(f"[Agendador] {nome}: {dados['status']} ({dados['duracao_ms']:.0f} ms)")
+    print(f"[Agendador] Total {duracao_total_ms:.0f} ms; caminho crítico: "
+          f"{' -> '.join(critico)} ({duracao_critica_ms:.0f} ms)")
+
+    resultado = {
+        "passos": {nome: relatorio[nome] for nome in dependencias},
+        "dependencias": dependencias,
+        "caminho_critico": critico,
+        "duracao_critica_ms": duracao_critica_ms,
+        "duracao_total_ms": duracao_total_ms,
+    }
+
+    if LOGGING_AVAILABLE:
+        log_operacao("executar_passos", "ERRO" if erros else "SUCESSO", {
+            "passos": {nome: {"status": d["status"], "duracao_ms": d["duracao_ms"]} for nome, d in resultado["passos"].items()},
+            "caminho_critico": critico,
+            "duration_ms": duracao_total_ms
+        })
+    if METRICS_AVAILABLE:
+        record_operation_metric("agendador_passos", duracao_total_ms, {
+            "passos": len(passos),
+            "caminho_critico": " -> ".join(critico),
+            "duracao_critica_ms": duracao_critica_ms
+        })
+
+    if erros:
+        raise erros[0]
+    return resultado
@@ -0,0 +1,449 @@
+"""
+Backends de Planilha (XML / openpyxl / xlwings / COM) - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as rotinas existentes.
+O arquivo gravado tem o mesmo conteúdo que o Excel gravaria para as células
+alteradas; vínculos externos e valores em cache das demais células são mantidos
+pelos backends marcados com PRESERVA_VINCULOS.
+
+Este módulo adiciona:
+1. Interface única para abrir, ler células, escrever células e salvar
+2. Backends XML (direto no pacote .xlsx), openpyxl, xlwings e COM
+3. Escolha do backend pelas capacidades exigidas, do mais rápido para o mais lento
+4. Recurso ao Excel só quando o recálculo em Python não resolve todas as fórmulas
+"""
+
+import io
+import os
+import re
+import time
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+from xml.sax.saxutils import escape
+
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+from openpyxl.utils.datetime import to_excel
+
+from utils.excel_save import carregar_workbook, salvar_atomico
+from utils.excel_stream import LeitorStreaming, ler_celulas
+from utils.vinculos_externos import (
+    celulas_do_xml, gravar_pacote, gravar_valores_em_cache,
+    listar_vinculos, recalcular_formulas, sem_atributo_tipo,
+)
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+# Import do sistema de cache (se disponível)
+try:
+    from utils.cache import invalidate_cache_on_save
+    CACHE_AVAILABLE = True
+except ImportError:
+    CACHE_AVAILABLE = False
+
+try:
+    import xlwings as xw
+    XLWINGS_AVAILABLE = True
+except ImportError:
+    XLWINGS_AVAILABLE = False
+
+try:
+    import win32com.client as win32
+    COM_AVAILABLE = True
+except ImportError:
+    COM_AVAILABLE = False
+
+
+# Capacidades
+HEADLESS = "headless"                      # não abre o Excel
+PRESERVA_VINCULOS = "preserva_vinculos"    # vínculos externos e valores em cache intactos
+RECALCULA = "recalcula"                    # fórmulas dependentes recalculadas ao salvar
+
+# Padrão: o mais rápido que não perde vínculos nem deixa fórmulas desatualizadas
+REQUISITOS_PADRAO = (PRESERVA_VINCULOS, RECALCULA)
+
+
+class EscritaNaoSuportada(ValueError):
+    """A alteração pedida não pode ser feita com segurança por este backend."""
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+class BackendPlanilha:
+    """
+    Planilha aberta para leitura e escrita de células.
+
+    As escritas só chegam ao arquivo em salvar(), que retorna
+    {"gravado": bool, "pendentes": [...]} - pendentes lista fórmulas que não
+    puderam ser recalculadas pelo backend.
+    """
+
+    nome = ""
+    capacidades: frozenset = frozenset()
+
+    def __init__(self, caminho: Union[str, Path]):
+        self.caminho = Path(caminho)
+        self._escritas: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return True
+
+    def ler_celulas(self, aba: str, coordenadas: Iterable[str]) -> Dict[str, Any]:
+        coordenadas = [c.upper() for c in coordenadas]
+        escritas = self._escritas.get(aba, {})
+        faltantes = [c for c in coordenadas if c not in escritas]
+        lidas = ler_celulas(self.caminho, {aba: faltantes})[aba] if faltantes else {}
+        return {c: escritas[c] if c in escritas else lidas[c] for c in coordenadas}
+
+    def escrever_celulas(self, aba: str, valores: Dict[str, Any]) -> None:
+        destino = self._escritas.setdefault(aba, {})
+        for coord, valor in valores.items():
+            destino[coord.upper()] = valor
+
+    def salvar(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def fechar(self) -> None:
+        self._escritas.clear()
+
+    def __enter__(self) -> "BackendPlanilha":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+# ============================================================================
+# BACKEND XML
+# ============================================================================
+
+_RE_SHEET_DATA = re.compile(r"<sheetData\b[^>]*?(?:/>|>(.*?)</sheetData>)", re.S)
+_RE_LINHA = re.compile(r"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_RE_ATRIBUTO_R_LINHA = re.compile(r"\br=\"(\d+)\"")
+_RE_ATRIBUTO_SPANS = re.compile(r"\s+spans=\"[^\"]*\"")
+_RE_ATRIBUTO_R = re.compile(r"\br=\"([A-Z]+\d+)\"")
+
+
+def _xml_celula(coord: str, atributos: str, valor: Any) -> str:
+    """XML de uma célula com valor literal (ou fórmula, se começar com "=")."""
+    atributos = sem_atributo_tipo(atributos) if atributos else f' r="{coord}"'
+    if valor is None:
+        return f"<c{atributos}/>"
+    if isinstance(valor, bool):
+        return f'<c{atributos} t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (datetime, date)):
+        valor = to_excel(valor)
+    if isinstance(valor, (int, float)):
+        return f"<c{atributos}><v>{repr(valor) if isinstance(valor, float) else valor}</v></c>"
+    if isinstance(valor, str) and valor.startswith("="):
+        return f"<c{atributos}><f>{escape(valor[1:])}</f></c>"
+    if isinstance(valor, str):
+        return f'<c{atributos} t="inlineStr"><is><t xml:space="preserve">{escape(valor)}</t></is></c>'
+    raise EscritaNaoSuportada(f"Tipo não suportado em {coord}: {type(valor).__name__}")
+
+
+def _coluna(coord: str) -> int:
+    return column_index_from_string(coordinate_from_string(coord)[0])
+
+
+def _escrever_no_xml(xml: str, valores: Dict[str, Any]) -> str:
+    """Aplica as escritas no XML de uma aba, criando células e linhas que faltarem."""
+    m = _RE_SHEET_DATA.search(xml)
+    if m is None:
+        raise EscritaNaoSuportada("Aba sem <sheetData>.")
+
+    por_linha: Dict[int, Dict[str, Any]] = {}
+    for coord, valor in valores.items():
+        por_linha.setdefault(coordinate_from_string(coord)[1], {})[coord] = valor
+
+    linhas: List[Tuple[int, str]] = []
+    for ml in _RE_LINHA.finditer(m.group(1) or ""):
+        numero = int(_RE_ATRIBUTO_R_LINHA.search(ml.group(1)).group(1))
+        escritas = por_linha.pop(numero, None)
+        if not escritas:
+            linhas.append((numero, ml.group(0)))
+            continue
+
+        celulas: Dict[str, str] = {}
+        for atributos_celula, conteudo, trecho in celulas_do_xml(ml.group(2) or ""):
+            coord = _RE_ATRIBUTO_R.search(atributos_celula).group(1)
+            if coord in escritas:
+                if "<f" in conteudo:
+                    # Trocar fórmula por valor deixaria o calcChain.xml inconsistente
+                    raise EscritaNaoSuportada(f"{coord} contém fórmula.")
+                celulas[coord] = _xml_celula(coord, atributos_celula, escritas.pop(coord))
+            else:
+                celulas[coord] = trecho
+        for coord, valor in escritas.items():
+            celulas[coord] = _xml_celula(coord, "", valor)
+
+        atributos = _RE_ATRIBUTO_SPANS.sub("", ml.group(1))
+        conteudo = "".join(celulas[c] for c in sorted(celulas, key=_coluna))
+        linhas.append((numero, f"<row{atributos}>{conteudo}</row>"))
+
+    for numero, escritas in por_linha.items():
+        conteudo = "".join(_xml_celula(c, "", escritas[c]) for c in sorted(escritas, key=_coluna))
+        linhas.append((numero, f'<row r="{numero}">{conteudo}</row>'))
+
+    linhas.sort(key=lambda item: item[0])
+    novo = "<sheetData>" + "".join(xml_linha for _, xml_linha in linhas) + "</sheetData>"
+    return xml[:m.start()] + novo + xml[m.end():]
+
+
+class BackendXml(BackendPlanilha):
+    """
+    Edita o XML das abas direto no pacote .xlsx e recalcula em Python os valores
+    em cache das fórmulas (utils.vinculos_externos). Não carrega o workbook
+    inteiro para escrever e não toca no que não foi alterado.
+    """
+
+    nome = "xml"
+    capacidades = frozenset({HEADLESS, PRESERVA_VINCULOS, RECALCULA})
+
+    def salvar(self) -> Dict[str, Any]:
+        if not any(self._escritas.values()):
+            return {"gravado": False, "pendentes": []}
+
+        partes_novas: Dict[str, bytes] = {}
+        with LeitorStreaming(self.caminho) as leitor:
+            for aba, valores in self._escritas.items():
+                parte = leitor.parte_da_aba(aba)
+                xml = leitor.ler_parte(parte).decode("utf-8")
+                partes_novas[parte] = _escrever_no_xml(xml, valores).encode("utf-8")
+
+        # Recalcula sobre o pacote já alterado, em memória
+        pacote = io.BytesIO()
+        with zipfile.ZipFile(self.caminho) as origem, zipfile.ZipFile(pacote, "w", zipfile.ZIP_DEFLATED) as destino:
+            valores_externos = {v["indice"]: v["celulas"] for v in listar_vinculos(origem)}
+            for info in origem.infolist():
+                destino.writestr(info, partes_novas.get(info.filename) or origem.read(info.filename))
+        # Só interessam as fórmulas que dependem (mesmo indiretamente) das células escritas
+        novos_por_aba, pendentes = recalcular_formulas(pacote.getvalue(), valores_externos,
+                                                       alteradas=self._escritas)
+
+        gravar_valores_em_cache(self.caminho, novos_por_aba, partes_novas)
+        gravar_pacote(self.caminho, partes_novas)
+        self._escritas.clear()
+        return {
+            "gravado": True,
+            "pendentes": [f"{aba}!{coord}: {motivo}" for aba, coord, _, motivo in pendentes],
+        }
+
+
+# ============================================================================
+# BACKEND OPENPYXL
+# ============================================================================
+
+class BackendOpenpyxl(BackendPlanilha):
+    """
+    load_workbook + gravação atômica. Rápido, mas o openpyxl descarta os valores
+    em cache de todas as fórmulas ao salvar.
+    """
+
+    nome = "openpyxl"
+    capacidades = frozenset({HEADLESS})
+
+    def salvar(self) -> Dict[str, Any]:
+        if not any(self._escritas.values()):
+            return {"gravado": False, "pendentes": []}
+
+        wb = carregar_workbook(self.caminho)
+        for aba, valores in self._escritas.items():
+            ws = wb[aba]
+            for coord, valor in valores.items():
+                ws[coord] = valor
+        gravado = salvar_atomico(wb, self.caminho)
+        self._escritas.clear()
+        return {"gravado": gravado, "pendentes": []}
+
+
+# ============================================================================
+# BACKENDS EXCEL (xlwings / COM)
+# ============================================================================
+
+class BackendXlwings(BackendPlanilha):
+    """Excel via xlwings, invisível e sem atualizar vínculos ao abrir."""
+
+    nome = "xlwings"
+    capacidades = frozenset({PRESERVA_VINCULOS, RECALCULA})
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return XLWINGS_AVAILABLE
+
+    def __init__(self, caminho: Union[str, Path]):
+        super().__init__(caminho)
+        self._app = xw.App(visible=False, add_book=False)
+        self._app.display_alerts = False
+        self._app.screen_updating = False
+        try:
+            self._book = self._app.books.open(str(self.caminho), update_links=False)
+        except Exception:
+            self._app.quit()
+            raise
+
+    def ler_celulas(self, aba: str, coordenadas: Iterable[str]) -> Dict[str, Any]:
+        sheet = self._book.sheets[aba]
+        return {c.upper(): sheet.range(c).value for c in coordenadas}
+
+    def escrever_celulas(self, aba: str, valores: Dict[str, Any]) -> None:
+        sheet = self._book.sheets[aba]
+        for coord, valor in valores.items():
+            sheet.range(coord).value = valor
+
+    def salvar(self) -> Dict[str, Any]:
+        self._book.save()
+        if CACHE_AVAILABLE:
+            invalidate_cache_on_save(self.caminho)
+        return {"gravado": True, "pendentes": []}
+
+    def fechar(self) -> None:
+        try:
+            self._book.close()
+        finally:
+            self._app.quit()
+
+
+class BackendCom(BackendPlanilha):
+    """Excel via win32com, em uma instância própria e invisível."""
+
+    nome = "com"
+    capacidades = frozenset({PRESERVA_VINCULOS, RECALCULA})
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return COM_AVAILABLE
+
+    def __init__(self, caminho: Union[str, Path]):
+        super().__init__(caminho)
+        self._excel = win32.DispatchEx("Excel.Application")
+        self._excel.Visible = False
+        self._excel.DisplayAlerts = False
+        try:
+            self._wb = self._excel.Workbooks.Open(str(self.caminho.resolve()), UpdateLinks=0)
+        except Exception:
+            self._excel.Quit()
+            raise
+
+    def ler_celulas(self, aba: str, coordenadas: Iterable[str]) -> Dict[str, Any]:
+        ws = self._wb.Worksheets(aba)
+        return {c.upper(): ws.Range(c).Value for c in coordenadas}
+
+    def escrever_celulas(self, aba: str, valores: Dict[str, Any]) -> None:
+        ws = self._wb.Worksheets(aba)
+        for coord, valor in valores.items():
+            ws.Range(coord).Value = valor
+
+    def salvar(self) -> Dict[str, Any]:
+        self._wb.Save()
+        if CACHE_AVAILABLE:
+            invalidate_cache_on_save(self.caminho)
+        return {"gravado": True, "pendentes": []}
+
+    def fechar(self) -> None:
+        try:
+            self._wb.Close(SaveChanges=False)
+        finally:
+            self._excel.Quit()
+
+
+# ============================================================================
+# ESCOLHA DO BACKEND
+# ============================================================================
+
+# Ordem de preferência: headless antes do Excel (ver benchmarks/bench_backends_planilha.py).
+# XML e openpyxl custam quase o mesmo, mas só o XML mantém vínculos e valores em cache.
+BACKENDS: Dict[str, Type[BackendPlanilha]] = {
+    BackendXml.nome: BackendXml,
+    BackendOpenpyxl.nome: BackendOpenpyxl,
+    BackendXlwings.nome: BackendXlwings,
+    BackendCom.nome: BackendCom,
+}
+
+
+def escolher_backend(requisitos: Iterable[str] = REQUISITOS_PADRAO,
+                     excluir: Iterable[str] = ()) -> Type[BackendPlanilha]:
+    """Backend disponível mais rápido que atende a todos os requisitos."""
+    requisitos = set(requisitos)
+    excluir = set(excluir)
+    for nome, backend in BACKENDS.items():
+        if nome not in excluir and requisitos <= backend.capacidades and backend.disponivel():
+            return backend
+    raise RuntimeError(f"Nenhum backend disponível com as capacidades: {', '.join(sorted(requisitos))}")
+
+
+def abrir_planilha(caminho: Union[str, Path], requisitos: Iterable[str] = REQUISITOS_PADRAO,
+                   backend: Optional[str] = None) -> BackendPlanilha:
+    """Abre a planilha com o backend informado ou com o mais rápido que atende aos requisitos."""
+    classe = BACKENDS[backend] if backend else escolher_backend(requisitos)
+    return classe(caminho)
+
+
+def escrever_celulas_planilha(caminho: Union[str, Path], aba: str, valores: Dict[str, Any],
+                              requisitos: Iterable[str] = REQUISITOS_PADRAO) -> Dict[str, Any]:
+    """
+    Escreve células e salva com o backend mais rápido que atende aos requisitos.
+
+    Se o backend headless não conseguir escrever com segurança ou deixar
+    fórmulas sem recalcular, a escrita é refeita pelo Excel (quando disponível).
+    Retorna {"backend", "gravado", "pendentes", "duration_ms"}.
+    """
+    requisitos = tuple(requisitos)
+    start_time = time.time()
+    classe = escolher_backend(requisitos)
+
+    try:
+        with classe(caminho) as planilha:
+            planilha.escrever_celulas(aba, valores)
+            resultado = planilha.salvar()
+    except EscritaNaoSuportada as e:
+        resultado = {"gravado": False, "pendentes": [str(e)]}
+
+    if resultado["pendentes"] and HEADLESS in classe.capacidades:
+        try:
+            excel = escolher_backend(requisitos, excluir=[n for n, b in BACKENDS.items() if HEADLESS in b.capacidades])
+        except RuntimeError:
+            excel = None
+        if excel is None:
+            if not resultado["gravado"]:
+                raise EscritaNaoSuportada(f"Escrita em {caminho} exige o Excel: {resultado['pendentes']}")
+            print(f"[AVISO] Fórmulas não recalculadas (Excel indisponível): {resultado['pendentes']}")
+            if LOGGING_AVAILABLE:
+                logger.warning(f"[Planilha] {caminho}: fórmulas dependentes sem recalcular: {resultado['pendentes']}")
+        else:
+            print(f"[Planilha] {len(resultado['pendentes'])} pendência(s) no backend {classe.nome}; usando {excel.nome}.")
+            classe = excel
+            with classe(caminho) as planilha:
+                planilha.escrever_celulas(aba, valores)
+                resultado = planilha.salvar()
+
+    duration_ms = (time.time() - start_time) * 1000
+    resultado = {"backend": classe.nome, **resultado, "duration_ms": duration_ms}
+
+    if LOGGING_AVAILABLE:
+        log_operacao("escrever_celulas_planilha", "SUCESSO" if not resultado["pendentes"] else "PARCIAL", {
+            "arquivo": str(caminho),
+            "aba": aba,
+            "celulas": sorted(valores),
+            **resultado
+        })
+    if METRICS_AVAILABLE:
+        record_operation_metric("planilha_backend_write", duration_ms, {"backend": classe.nome, "celulas": len(valores)})
+
+    return resultado
@@ -10,14 +10,26 @@ Este módulo adiciona:
 3. Cache de dados processados (DataFrames, valores extraídos)
 4. Otimização de carregamento de workbooks
 5. Integração com sistema de logging e métricas
+6. Camada em memória (LRU limitada por bytes estimados) na frente do disco
+7. Limite de tamanho do disco aplicado com remoção LRU (ordem persistida em index.json)
+8. DataFrames gravados em formato colunar e lidos por memory-map (sem cópia)
+9. Índice arquivo de origem -> entradas: invalidação direta, qualquer que seja o mtime
+10. Manifesto incremental (tipo, tamanho, acesso): estatísticas sem varrer o diretório
+11. Locks por faixa de chave, serialização fora de lock e gravação atômica (temporário + rename)
 """
 
 import os
 import time
+import atexit
 import hashlib
+import json
 import pickle
+import sys
+import tempfile
+import zlib
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional, Callable, Union, Tuple
+from typing import Any, Dict, List, Optional, Callable, Union, Tuple
 from datetime import datetime, timedelta
 from functools import wraps
 import threading
@@ -29,6 +41,19 @@ try:
 except ImportError:
     LOGGING_AVAILABLE = False
 
+# Import do formato colunar de DataFrames (se pandas/numpy disponíveis)
+try:
+    from utils.dataframe_colunar import (
+        MAGIC as COLUMNAR_MAGIC,
+        carregar_dataframe,
+        e_arquivo_colunar,
+        gravar_dataframe,
+        pode_gravar_colunar,
+    )
+    COLUMNAR_AVAILABLE = True
+except ImportError:
+    COLUMNAR_AVAILABLE = False
+
 # Import do sistema de exceções (se disponível)
 try:
     from utils.exceptions import FileOperationError, safe_execute
@@ -49,8 +74,23 @@ class CacheConfig:
     # Tempo de vida padrão do cache (em segundos)
     DEFAULT_TTL = 3600  # 1 hora
     
-    # Tamanho máximo do cache em MB
+    # Tamanho máximo do cache em MB (aplicado: as entradas menos usadas saem primeiro)
     MAX_CACHE_SIZE_MB = 100
+
+    # Índice do disco: tamanho e último acesso de cada entrada
+    INDEX_FILE = "index.json"
+
+    # Intervalo mínimo entre gravações do índice (segundos); sempre gravado ao sair
+    INDEX_FLUSH_INTERVAL = 5.0
+
+    # Quantidade de locks por faixa de chave (só o rename e o índice ficam sob lock)
+    LOCK_STRIPES = 16
+
+    # Temporários de gravações interrompidas mais velhos que isso são removidos
+    STALE_TEMP_SECONDS = 3600
+
+    # Orçamento da camada em memória (bytes estimados dos objetos) em MB
+    MAX_MEMORY_CACHE_MB = 64
     
     # Extensões de arquivo que podem ser cacheadas
     CACHEABLE_EXTENSIONS = {".xlsx", ".xls", ".csv"}
@@ -62,6 +102,131 @@ class CacheConfig:
     PROCESSED_PREFIX = "proc_"
 
 
+# ============================================================================
+# CAMADA EM MEMÓRIA (LRU)
+# ============================================================================
+
+def _cache_type(name: str) -> str:
+    """Tipo da entrada pelo prefixo do arquivo (chaves de get_cache_stats()["by_type"])"""
+    if name.startswith(CacheConfig.WORKBOOK_PREFIX):
+        return "workbooks"
+    if name.startswith(CacheConfig.DATAFRAME_PREFIX):
+        return "dataframes"
+    if name.startswith(CacheConfig.VALUE_PREFIX):
+        return "values"
+    return "other"
+
+
+def _estimar_tamanho(data: Any, tamanho_serializado: Optional[int] = None) -> int:
+    """
+    Bytes estimados de um objeto em memória: DataFrames pelo memory_usage,
+    o resto pelo tamanho serializado (pickle) quando conhecido.
+    """
+    memory_usage = getattr(data, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            return int(memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    if tamanho_serializado is not None:
+        return tamanho_serializado
+    return sys.getsizeof(data)
+
+
+def _copy_on_write_ativo() -> bool:
+    """Copy-on-write do pandas: sempre no pandas 3, opcional no 2.x."""
+    pd = sys.modules.get("pandas")
+    if pd is None:
+        return False
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def _isolar(data: Any) -> Any:
+    """
+    DataFrames/Series compartilhados com a camada em memória saem como cópia
+    rasa quando o copy-on-write do pandas está ativo (alterar a cópia não
+    altera o cache); sem copy-on-write, saem como cópia profunda.
+    """
+    if callable(getattr(data, "memory_usage", None)) and hasattr(data, "copy"):
+        return data.copy(deep=not _copy_on_write_ativo())
+    return data
+
+
+class MemoryLRUCache:
+    """
+    Cache em memória, do mais recente ao menos recente, limitado por bytes
+    estimados. Cada entrada guarda o momento de criação para respeitar o TTL
+    do mesmo jeito que o mtime dos arquivos em disco.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str, ttl: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            data, size, created = entry
+            if time.time() - created >= ttl:
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return data
+
+    def put(self, key: str, data: Any, size: int, created: Optional[float] = None) -> bool:
+        """Guarda a entrada; objetos maiores que o orçamento inteiro não entram."""
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return False
+            self._entries[key] = (data, size, created if created is not None else time.time())
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+        return True
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def discard(self, predicate: Callable[[str, float], bool]) -> int:
+        """Remove as entradas para as quais predicate(chave, criado_em) é verdadeiro."""
+        with self._lock:
+            keys = [k for k, (_, _, created) in self._entries.items() if predicate(k, created)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_mb": self.size_bytes / (1024 * 1024),
+                "max_size_mb": self.max_bytes / (1024 * 1024),
+                **self.stats,
+            }
+
+
 # ============================================================================
 # SISTEMA DE CACHE PRINCIPAL
 # ============================================================================
@@ -72,11 +237,31 @@ class ExcelCache:
     Mantém compatibilidade total com operações existentes.
     """
     
-    def __init__(self, cache_dir: Optional[Path] = None):
+    def __init__(self, cache_dir: Optional[Path] = None,
+                 max_memory_mb: float = CacheConfig.MAX_MEMORY_CACHE_MB,
+                 max_size_mb: float = CacheConfig.MAX_CACHE_SIZE_MB):
         self.cache_dir = cache_dir or CacheConfig.CACHE_DIR
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
-        self._memory_cache = {}
+        self._stripes = [threading.Lock() for _ in range(CacheConfig.LOCK_STRIPES)]
+        self._memory_cache = MemoryLRUCache(int(max_memory_mb * 1024 * 1024))
+
+        # Índice do disco: {arquivo: [tamanho, último acesso, origem]}, do menos ao
+        # mais recente; _by_source é o inverso: {arquivo de origem: {entradas}}
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._index_path = self.cache_dir / CacheConfig.INDEX_FILE
+        self._index_lock = threading.RLock()
+        self._index: "OrderedDict[str, list]" = OrderedDict()
+        self._by_source: Dict[str, set] = {}
+        self._type_totals: Dict[str, list] = {}  # {tipo: [entradas, bytes]}
+        # Entradas removidas do cache cujo arquivo ainda não pôde ser apagado
+        # (no Windows, um DataFrame mapeado em memória trava o arquivo)
+        self._pending_removal: set = set()
+        self._index_dirty = False
+        self._last_flush = time.monotonic()
+        self.disk_size_bytes = 0
+        self.disk_evictions = 0
+        self._load_index()
+        atexit.register(self.flush_index)
         
         # Log de inicialização
         if LOGGING_AVAILABLE:
@@ -85,6 +270,222 @@ class ExcelCache:
                 "max_size_mb": CacheConfig.MAX_CACHE_SIZE_MB
             })
     
+    # ------------------------------------------------------------------------
+    # Índice do disco (LRU persistido)
+    # ------------------------------------------------------------------------
+
+    def _load_index(self) -> None:
+        """
+        Carrega index.json e concilia com os arquivos do diretório: entradas
+        sem arquivo saem, arquivos fora do índice (outro processo, versão
+        anterior) entram com o mtime como último acesso.
+        """
+        saved: Dict[str, list] = {}
+        pending: List[str] = []
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            saved = manifest.get("entries", {})
+            pending = manifest.get("pending_removal", [])
+        except (OSError, ValueError, AttributeError):
+            saved = {}
+
+        # Temporários de gravações interrompidas (processo encerrado no meio)
+        cutoff_time = time.time() - CacheConfig.STALE_TEMP_SECONDS
+        # ("index.<pid>.tmp" é o nome usado pelo índice em versões anteriores)
+        for tmp_file in [*self.cache_dir.glob(".*.tmp"), *self.cache_dir.glob("index.*.tmp")]:
+            try:
+                if tmp_file.stat().st_mtime < cutoff_time:
+                    tmp_file.unlink()
+            except OSError:
+                pass
+
+        entries = []
+        for cache_file in self.cache_dir.glob("*.cache"):
+            info = saved.get(cache_file.name)
+            if info is None:
+                try:
+                    stat = cache_file.stat()
+                except OSError:
+                    continue
+                info = [stat.st_size, stat.st_mtime]
+            source = info[2] if len(info) > 2 else None
+            entries.append((info[1], cache_file.name, info[0], source))
+        entries.sort(key=lambda entry: entry[0])
+
+        with self._index_lock:
+            self._index = OrderedDict((name, [size, atime, source]) for atime, name, size, source in entries)
+            self._by_source = {}
+            self._type_totals = {}
+            self.disk_size_bytes = 0
+            for name, (size, _, source) in self._index.items():
+                self._account(name, size, 1)
+                if source:
+                    self._by_source.setdefault(source, set()).add(name)
+            self._pending_removal = {name for name in pending if name in self._index}
+            self._index_dirty = len(self._index) != len(saved)
+        # Remoções adiadas na execução anterior (o processo que travava o arquivo já saiu)
+        self._retry_pending_removals()
+
+    def _account(self, name: str, size_bytes: int, sign: int) -> None:
+        """Atualiza os totais geral e por tipo (chamado com _index_lock)."""
+        totals = self._type_totals.setdefault(_cache_type(name), [0, 0])
+        totals[0] += sign
+        totals[1] += sign * size_bytes
+        self.disk_size_bytes += sign * size_bytes
+
+    def _maybe_flush_index(self) -> None:
+        """Grava o índice no máximo a cada INDEX_FLUSH_INTERVAL segundos."""
+        if time.monotonic() - self._last_flush >= CacheConfig.INDEX_FLUSH_INTERVAL:
+            self.flush_index()
+
+    def flush_index(self) -> None:
+        """
+        Grava o índice se houver mudanças (escrita atômica: temporário + rename).
+        Um índice atrasado é seguro: _load_index concilia com o diretório.
+        """
+        with self._index_lock:
+            self._last_flush = time.monotonic()
+            if not self._index_dirty or not self.cache_dir.exists():
+                return
+            entries = {name: list(entry) for name, entry in self._index.items()}
+            pending = sorted(self._pending_removal)
+            self._index_dirty = False
+        content = json.dumps({"entries": entries, "pending_removal": pending})
+        tmp_path = None
+        try:
+            # Mesmo padrão das entradas: temporários órfãos são limpos em _load_index
+            fd, tmp_path = tempfile.mkstemp(prefix=".index.", suffix=".tmp", dir=self.cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, self._index_path)
+            tmp_path = None
+        except OSError as e:
+            if LOGGING_AVAILABLE:
+                logger.warning(f"Erro ao gravar índice do cache: {e}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _touch(self, name: str) -> None:
+        """Marca a entrada como usada agora (gravado no próximo flush)."""
+        with self._index_lock:
+            entry = self._index.get(name)
+            if entry is not None:
+                entry[1] = time.time()
+                self._index.move_to_end(name)
+                self._index_dirty = True
+
+    def _forget(self, name: str) -> Optional[list]:
+        with self._index_lock:
+            self._pending_removal.discard(name)
+            entry = self._index.pop(name, None)
+            if entry is not None:
+                self._account(name, entry[0], -1)
+                self._index_dirty = True
+                names = self._by_source.get(entry[2])
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del self._by_source[entry[2]]
+            return entry
+
+    def _keep_pending(self, name: str, entry: Optional[list]) -> None:
+        """
+        Mantém no índice (como a menos usada) uma entrada cujo arquivo não pôde
+        ser apagado: ela continua contando no tamanho do disco, deixa de ser
+        servida e a remoção é tentada de novo em _retry_pending_removals.
+        """
+        with self._index_lock:
+            if entry is not None and name not in self._index:
+                self._index[name] = entry
+                self._index.move_to_end(name, last=False)
+                self._account(name, entry[0], 1)
+                if entry[2]:
+                    self._by_source.setdefault(entry[2], set()).add(name)
+                self._index_dirty = True
+            self._pending_removal.add(name)
+
+    def _unlink_entry(self, name: str, entry: Optional[list]) -> bool:
+        """
+        Apaga o arquivo de uma entrada já tirada do índice. Se o arquivo estiver
+        travado (PermissionError), a entrada volta ao índice como pendente.
+        Sob o lock da faixa: se a chave foi regravada depois de sair do índice,
+        o arquivo novo fica.
+        """
+        try:
+            with self._stripe(name):
+                with self._index_lock:
+                    if name in self._index:
+                        return False
+                (self.cache_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+        except PermissionError as e:
+            self._keep_pending(name, entry)
+            if LOGGING_AVAILABLE:
+                logger.warning(f"Cache {name} em uso, remoção adiada: {e}")
+            return False
+        except OSError as e:
+            if LOGGING_AVAILABLE:
+                logger.warning(f"Erro ao remover cache {name}: {e}")
+            return False
+        return True
+
+    def _retry_pending_removals(self) -> int:
+        """Tenta de novo apagar os arquivos pendentes. Retorna quantos saíram."""
+        with self._index_lock:
+            pending = list(self._pending_removal)
+        removed = 0
+        for name in pending:
+            entry = self._forget(name)
+            if self._unlink_entry(name, entry):
+                removed += 1
+        return removed
+
+    def _record_write(self, name: str, size_bytes: int, source: Optional[str] = None) -> Dict[str, list]:
+        """
+        Registra a entrada gravada e tira do índice as menos usadas até caber
+        no limite. Retorna {entrada: dados do índice} das removidas (pode incluir
+        a própria, se não couber); os arquivos saem em _remove_evicted, fora de lock.
+        """
+        with self._index_lock:
+            self._forget(name)
+            self._index[name] = [size_bytes, time.time(), source]
+            if source:
+                self._by_source.setdefault(source, set()).add(name)
+            self._account(name, size_bytes, 1)
+            self._index_dirty = True
+
+            evicted = {}
+            candidates = (n for n in list(self._index) if n not in self._pending_removal)
+            while self.disk_size_bytes > self.max_size_bytes:
+                oldest = next(candidates, None)
+                if oldest is None:
+                    break
+                evicted[oldest] = self._forget(oldest)
+        return evicted
+
+    def _remove_evicted(self, evicted: Dict[str, list]) -> None:
+        for old_name, entry in evicted.items():
+            self._unlink_entry(old_name, entry)
+        self.disk_evictions += len(evicted)
+        self._maybe_flush_index()
+
+        if LOGGING_AVAILABLE and evicted:
+            log_operacao("cache_evict", "SUCESSO", {
+                "files_removed": len(evicted),
+                "disk_size_mb": self.disk_size_bytes / (1024 * 1024)
+            })
+
+    @staticmethod
+    def _source_key(file_path: Union[str, Path]) -> str:
+        """Chave do arquivo de origem no índice (caminho absoluto normalizado)."""
+        return os.path.normcase(os.path.abspath(file_path))
+
     def _get_file_hash(self, file_path: Union[str, Path]) -> str:
         """Gera hash único baseado no caminho e timestamp do arquivo"""
         file_path = Path(file_path)
@@ -110,49 +511,128 @@ class ExcelCache:
         cache_age = time.time() - cache_path.stat().st_mtime
         return cache_age < ttl
     
-    def _save_to_cache(self, cache_path: Path, data: Any) -> bool:
-        """Salva dados no cache"""
+    def _stripe(self, name: str) -> threading.Lock:
+        """Lock da faixa da chave: gravações de chaves diferentes raramente disputam"""
+        return self._stripes[zlib.crc32(name.encode()) % len(self._stripes)]
+
+    def _save_to_cache(self, cache_path: Path, data: Any, source: Optional[str] = None) -> bool:
+        """
+        Salva dados no cache (disco e memória). A serialização vai para um
+        temporário fora de qualquer lock; só o os.replace e o registro no
+        índice ficam sob o lock da faixa da chave.
+        """
+        tmp_path = None
         try:
-            with self._lock:
-                with open(cache_path, 'wb') as f:
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{cache_path.stem}.", suffix=".tmp", dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                if COLUMNAR_AVAILABLE and pode_gravar_colunar(data):
+                    gravar_dataframe(f, data)
+                else:
                     pickle.dump(data, f)
-                
-                if LOGGING_AVAILABLE:
-                    log_operacao("cache_save", "SUCESSO", {
-                        "cache_file": cache_path.name,
-                        "size_bytes": cache_path.stat().st_size
-                    })
-                
-                return True
+                size_bytes = f.tell()
+            memory_size = _estimar_tamanho(data, size_bytes)
+            if self._pending_removal:
+                # Libera antes o espaço das remoções adiadas, se já for possível
+                self._retry_pending_removals()
+
+            with self._stripe(cache_path.name):
+                try:
+                    os.replace(tmp_path, cache_path)
+                except PermissionError:
+                    # Versão anterior travada (mapeada): não pode mais ser servida
+                    self._memory_cache.pop(cache_path.name)
+                    self._keep_pending(cache_path.name, None)
+                    raise
+                tmp_path = None
+                evicted = self._record_write(cache_path.name, size_bytes, source)
+                self._memory_cache.put(cache_path.name, _isolar(data), memory_size)
+            self._remove_evicted(evicted)
+            if source:
+                # A origem só existe no índice: sem ela, invalidate_file_cache
+                # não acha a entrada depois de uma queda do processo
+                self.flush_index()
+            stored = cache_path.name not in evicted
+            
+            if LOGGING_AVAILABLE:
+                log_operacao("cache_save", "SUCESSO" if stored else "EXCEDE_LIMITE", {
+                    "cache_file": cache_path.name,
+                    "size_bytes": size_bytes
+                })
+            
+            return stored
         except Exception as e:
             if LOGGING_AVAILABLE:
                 logger.error(f"Erro ao salvar cache {cache_path}: {e}")
             return False
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
     
     def _load_from_cache(self, cache_path: Path) -> Optional[Any]:
-        """Carrega dados do cache"""
+        """
+        Carrega dados do cache em disco e promove para a memória. A leitura é
+        sem lock: o arquivo só é trocado por os.replace, então ela vê a versão
+        anterior ou a nova inteira, nunca uma gravação pela metade. A promoção
+        para a memória é feita sob o lock da faixa e só se o arquivo lido
+        ainda for o atual: uma gravação concorrente já pôs a versão nova lá.
+        """
         try:
-            with self._lock:
-                with open(cache_path, 'rb') as f:
+            with open(cache_path, 'rb') as f:
+                lido = os.fstat(f.fileno())
+                if COLUMNAR_AVAILABLE and e_arquivo_colunar(f.read(len(COLUMNAR_MAGIC))):
+                    data = carregar_dataframe(cache_path)
+                    size_bytes = lido.st_size
+                else:
+                    f.seek(0)
                     data = pickle.load(f)
-                
-                if LOGGING_AVAILABLE:
-                    log_operacao("cache_load", "SUCESSO", {
-                        "cache_file": cache_path.name,
-                        "size_bytes": cache_path.stat().st_size
-                    })
-                
-                return data
+                    size_bytes = f.tell()
+            with self._stripe(cache_path.name):
+                try:
+                    atual = os.stat(cache_path)
+                except FileNotFoundError:
+                    atual = None
+                if atual is not None and (atual.st_ino, atual.st_mtime_ns, atual.st_size) == \
+                        (lido.st_ino, lido.st_mtime_ns, lido.st_size):
+                    self._memory_cache.put(cache_path.name, data, _estimar_tamanho(data, size_bytes),
+                                           created=lido.st_mtime)
+            self._touch(cache_path.name)
+            
+            if LOGGING_AVAILABLE:
+                log_operacao("cache_load", "SUCESSO", {
+                    "cache_file": cache_path.name,
+                    "size_bytes": size_bytes
+                })
+            
+            return data
+        except FileNotFoundError:
+            # Removido (invalidação/remoção LRU) entre a validação e a leitura
+            return None
         except Exception as e:
             if LOGGING_AVAILABLE:
                 logger.error(f"Erro ao carregar cache {cache_path}: {e}")
             return None
     
+    def _get_cached(self, cache_path: Path, ttl: int) -> Optional[Any]:
+        """
+        Busca na memória e depois no disco. O objeto devolvido pela memória é o
+        mesmo entre chamadas (exceto DataFrames, ver _isolar): não altere
+        workbooks obtidos do cache.
+        """
+        if cache_path.name in self._pending_removal:
+            return None
+        data = self._memory_cache.get(cache_path.name, ttl)
+        if data is not None:
+            self._touch(cache_path.name)
+        elif self._is_cache_valid(cache_path, ttl):
+            data = self._load_from_cache(cache_path)
+        return _isolar(data) if data is not None else None
+
     def get_workbook_cache(self, file_path: Union[str, Path], 
                           data_only: bool = True, ttl: int = CacheConfig.DEFAULT_TTL) -> Optional[Any]:
         """
         Obtém workbook do cache ou None se não estiver disponível.
         Complementa load_workbook() existente sem substituí-lo.
+        O workbook é compartilhado entre chamadas (ver cached_load_workbook).
         """
         file_path = Path(file_path)
         
@@ -164,11 +644,7 @@ class ExcelCache:
         cache_key = f"{file_hash}_{data_only}"
         cache_path = self._get_cache_path(CacheConfig.WORKBOOK_PREFIX, cache_key)
         
-        # Verifica se cache é válido
-        if self._is_cache_valid(cache_path, ttl):
-            return self._load_from_cache(cache_path)
-        
-        return None
+        return self._get_cached(cache_path, ttl)
     
     def set_workbook_cache(self, file_path: Union[str, Path], workbook: Any, 
                           data_only: bool = True) -> bool:
@@ -183,7 +659,7 @@ class ExcelCache:
         cache_key = f"{file_hash}_{data_only}"
         cache_path = self._get_cache_path(CacheConfig.WORKBOOK_PREFIX, cache_key)
         
-        return self._save_to_cache(cache_path, workbook)
+        return self._save_to_cache(cache_path, workbook, self._source_key(file_path))
     
     def get_dataframe_cache(self, file_path: Union[str, Path], sheet_name: Optional[str] = None,
                            skiprows: int = 0, ttl: int = CacheConfig.DEFAULT_TTL) -> Optional[Any]:
@@ -201,11 +677,7 @@ class ExcelCache:
         cache_key = f"{file_hash}_{sheet_name}_{skiprows}"
         cache_path = self._get_cache_path(CacheConfig.DATAFRAME_PREFIX, cache_key)
         
-        # Verifica se cache é válido
-        if self._is_cache_valid(cache_path, ttl):
-            return self._load_from_cache(cache_path)
-        
-        return None
+        return self._get_cached(cache_path, ttl)
     
     def set_dataframe_cache(self, file_path: Union[str, Path], dataframe: Any,
                            sheet_name: Optional[str] = None, skiprows: int = 0) -> bool:
@@ -220,7 +692,7 @@ class ExcelCache:
         cache_key = f"{file_hash}_{sheet_name}_{skiprows}"
         cache_path = self._get_cache_path(CacheConfig.DATAFRAME_PREFIX, cache_key)
         
-        return self._save_to_cache(cache_path, dataframe)
+        return self._save_to_cache(cache_path, dataframe, self._source_key(file_path))
     
     def get_value_cache(self, operation_key: str, ttl: int = CacheConfig.DEFAULT_TTL) -> Optional[Any]:
         """
@@ -229,11 +701,7 @@ class ExcelCache:
         """
         cache_path = self._get_cache_path(CacheConfig.VALUE_PREFIX, operation_key)
         
-        # Verifica se cache é válido
-        if self._is_cache_valid(cache_path, ttl):
-            return self._load_from_cache(cache_path)
-        
-        return None
+        return self._get_cached(cache_path, ttl)
     
     def set_value_cache(self, operation_key: str, value: Any) -> bool:
         """
@@ -245,21 +713,22 @@ class ExcelCache:
     def invalidate_file_cache(self, file_path: Union[str, Path]) -> int:
         """
         Invalida todos os caches relacionados a um arquivo específico.
-        Útil quando arquivo é modificado.
+        Útil quando arquivo é modificado: as entradas são encontradas pelo
+        índice de origem, inclusive as gravadas antes da modificação.
         """
         file_path = Path(file_path)
-        file_hash = self._get_file_hash(file_path)
+        with self._index_lock:
+            names = list(self._by_source.get(self._source_key(file_path), ()))
         
         invalidated = 0
         
         # Remove caches relacionados ao arquivo
-        for cache_file in self.cache_dir.glob(f"*{file_hash}*.cache"):
-            try:
-                cache_file.unlink()
-                invalidated += 1
-            except Exception as e:
-                if LOGGING_AVAILABLE:
-                    logger.warning(f"Erro ao invalidar cache {cache_file}: {e}")
+        for name in names:
+            self._memory_cache.pop(name)
+            self._unlink_entry(name, self._forget(name))
+            invalidated += 1
+        if invalidated:
+            self._maybe_flush_index()
         
         if LOGGING_AVAILABLE and invalidated > 0:
             log_operacao("cache_invalidate", "SUCESSO", {
@@ -279,14 +748,17 @@ class ExcelCache:
         if older_than_hours:
             cutoff_time = time.time() - (older_than_hours * 3600)
         
+        self._memory_cache.discard(lambda _, created: cutoff_time is None or created < cutoff_time)
+        
         for cache_file in self.cache_dir.glob("*.cache"):
             try:
                 if cutoff_time is None or cache_file.stat().st_mtime < cutoff_time:
-                    cache_file.unlink()
-                    removed += 1
+                    if self._unlink_entry(cache_file.name, self._forget(cache_file.name)):
+                        removed += 1
             except Exception as e:
                 if LOGGING_AVAILABLE:
                     logger.warning(f"Erro ao remover cache {cache_file}: {e}")
+        self._maybe_flush_index()
         
         if LOGGING_AVAILABLE:
             log_operacao("cache_clear", "SUCESSO", {
@@ -299,40 +771,30 @@ class ExcelCache:
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Retorna estatísticas do cache.
+        Lidas do manifesto mantido a cada gravação/leitura/remoção, sem varrer o diretório.
         """
-        stats = {
+        mb = 1024 * 1024
+        with self._index_lock:
+            by_type = {
+                cache_type: {"count": count, "size_mb": size_bytes / mb}
+                for cache_type, (count, size_bytes) in self._type_totals.items()
+                if count
+            }
+            total_files = len(self._index)
+            disk_size_bytes = self.disk_size_bytes
+
+        return {
             "cache_dir": str(self.cache_dir),
-            "total_files": 0,
-            "total_size_mb": 0.0,
-            "by_type": {}
+            "total_files": total_files,
+            "total_size_mb": disk_size_bytes / mb,
+            "by_type": by_type,
+            "memory": self._memory_cache.get_stats(),
+            "disk": {
+                "size_mb": disk_size_bytes / mb,
+                "max_size_mb": self.max_size_bytes / mb,
+                "evictions": self.disk_evictions
+            }
         }
-        
-        for cache_file in self.cache_dir.glob("*.cache"):
-            try:
-                size_bytes = cache_file.stat().st_size
-                stats["total_files"] += 1
-                stats["total_size_mb"] += size_bytes / (1024 * 1024)
-                
-                # Categoriza por tipo
-                if cache_file.name.startswith(CacheConfig.WORKBOOK_PREFIX):
-                    cache_type = "workbooks"
-                elif cache_file.name.startswith(CacheConfig.DATAFRAME_PREFIX):
-                    cache_type = "dataframes"
-                elif cache_file.name.startswith(CacheConfig.VALUE_PREFIX):
-                    cache_type = "values"
-                else:
-                    cache_type = "other"
-                
-                if cache_type not in stats["by_type"]:
-                    stats["by_type"][cache_type] = {"count": 0, "size_mb": 0.0}
-                
-                stats["by_type"][cache_type]["count"] += 1
-                stats["by_type"][cache_type]["size_mb"] += size_bytes / (1024 * 1024)
-                
-            except Exception:
-                continue
-        
-        return stats
 
 
 # ============================================================================
@@ -506,6 +968,12 @@ def cached_load_workbook(filename: Union[str, Path], data_only: bool = True,
     """
     Versão com cache da função load_workbook().
     Complementa a função original sem substituí-la.
+
+    ATENÇÃO: o workbook devolvido é compartilhado. Enquanto a entrada estiver
+    na memória, chamadas seguintes com o mesmo arquivo recebem o mesmo objeto,
+    e alterações nele aparecem para todos os chamadores (e nunca são gravadas
+    no arquivo). Use só para leitura; para editar, use load_workbook ou
+    utils.workbook_pool.abrir_workbook.
     """
     # Tenta obter do cache primeiro
     cached_wb = excel_cache.get_workbook_cache(filename, data_only, ttl)
@@ -0,0 +1,261 @@
+"""
+Modo Daemon - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com a execução atual.
+Sem --daemon, run.py abre a interface como sempre; nada aqui é importado.
+
+Este módulo adiciona:
+1. Execução diária do pipeline em um horário configurado, no mesmo processo
+   (imports, pools de workbooks e caches continuam quentes entre os dias)
+2. Preparação por execução: configuração dinâmica, .env e config recarregados,
+   datas derivadas do relógio injetável (utils.relogio)
+3. Espera em fatias curtas, robusta a suspensão da máquina e ajuste de horário
+4. Integração com logging e métricas
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as horario_do_dia, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils import relogio
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, log_erro, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+HORARIO_PADRAO = "06:00"
+# Maior intervalo dormido de uma vez: o horário alvo é reavaliado a cada fatia
+ESPERA_MAXIMA_S = 60.0
+
+
+def interpretar_horario(texto: str) -> horario_do_dia:
+    """Converte "HH:MM" em datetime.time."""
+    try:
+        horas, minutos = (int(parte) for parte in texto.strip().split(":"))
+        return horario_do_dia(horas, minutos)
+    except ValueError:
+        raise ValueError(f"Horário inválido: {texto!r}. Use HH:MM, ex.: 06:00.") from None
+
+
+# ============================================================================
+# PREPARAÇÃO DE CADA EXECUÇÃO
+# ============================================================================
+
+def _religar_nomes_config(antigos: Dict[str, Any], novos: Dict[str, Any]) -> List[str]:
+    """
+    Atualiza os nomes importados com "from config import X" nos módulos já
+    carregados (utils.etapas, utils.email, interfaces...): todo nome de config
+    que ainda aponta para o valor antigo passa a apontar para o novo.
+    Retorna ["modulo.NOME", ...] atualizados.
+    """
+    religados = []
+    for modulo in list(sys.modules.values()):
+        namespace = getattr(modulo, "__dict__", None)
+        if namespace is None or namespace.get("__name__") == "config":
+            continue
+        for nome, valor in antigos.items():
+            if nome in novos and nome in namespace and namespace[nome] is valor:
+                namespace[nome] = novos[nome]
+                religados.append(f"{modulo.__name__}.{nome}")
+    return religados
+
+
+def recarregar_configuracao() -> List[str]:
+    """
+    Relê o .env e o módulo config, e atualiza os nomes já importados de config
+    pelos outros módulos (ex.: caminhos mensais trocados pela configuração
+    dinâmica no dia 2, credenciais do e-mail alteradas no .env).
+    """
+    from dotenv import load_dotenv
+    load_dotenv(override=True)
+
+    import config
+    antigos = {nome: valor for nome, valor in vars(config).items() if nome.isupper()}
+    config = importlib.reload(config)
+    novos = {nome: valor for nome, valor in vars(config).items() if nome.isupper()}
+    return _religar_nomes_config(antigos, novos)
+
+
+def preparar_execucao() -> Dict[str, Any]:
+    """Atualiza configuração e caminhos para o dia do relógio. Retorna as datas da execução."""
+    from utils.dynamic_config import auto_update_config
+
+    resultado = auto_update_config()
+    if resultado.get("error"):
+        print(f"⚠️ Erro na configuração automática: {resultado['error']}")
+    recarregar_configuracao()
+
+    return {
+        "agora": relogio.agora(),
+        "ontem": relogio.ontem(),
+        "dias_do_mes": relogio.dias_do_mes(),
+        "configuracao": resultado,
+    }
+
+
+# Resposta de cada caixa do tkinter.messagebox quando não há ninguém para clicar
+_RESPOSTAS_DIALOGOS = {
+    "showinfo": "ok",
+    "showwarning": "ok",
+    "showerror": "ok",
+    "askquestion": "no",
+    "askokcancel": False,
+    "askyesno": False,
+    "askretrycancel": False,
+    "askyesnocancel": None,
+}
+
+
+@contextmanager
+def dialogos_no_log() -> Iterator[List[str]]:
+    """
+    Troca as caixas modais do tkinter.messagebox por registros no log, para
+    que uma execução sem ninguém na frente da máquina não fique parada no
+    primeiro "OK". Perguntas recebem a resposta negativa. Vale para todos os
+    módulos que fizeram "from tkinter import messagebox".
+    Devolve a lista de mensagens registradas na execução.
+    """
+    from tkinter import messagebox
+
+    registradas: List[str] = []
+
+    def silenciar(nome: str, resposta: Any) -> Callable[..., Any]:
+        def dialogo(title: Optional[str] = None, message: Optional[str] = None, **_) -> Any:
+            texto = f"[Daemon] {nome}: {title} - {message}"
+            registradas.append(texto)
+            print(texto)
+            if LOGGING_AVAILABLE:
+                (logger.error if nome == "showerror" else logger.info)(texto)
+            return resposta
+        return dialogo
+
+    originais = {nome: getattr(messagebox, nome) for nome in _RESPOSTAS_DIALOGOS}
+    for nome, resposta in _RESPOSTAS_DIALOGOS.items():
+        setattr(messagebox, nome, silenciar(nome, resposta))
+    try:
+        yield registradas
+    finally:
+        for nome, original in originais.items():
+            setattr(messagebox, nome, original)
+
+
+def executar_pipeline_diario() -> None:
+    """
+    Etapas 1 a 8, como o botão "executar todas", com a janela principal oculta
+    e as caixas de mensagem desviadas para o log (dialogos_no_log).
+    """
+    import tkinter as tk
+    from controllers.app_controller import AppController
+
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        with dialogos_no_log():
+            AppController(root).executar_todas()
+    finally:
+        root.destroy()
+
+
+# ============================================================================
+# DAEMON
+# ============================================================================
+
+class DaemonDiario:
+    """
+    Executa `tarefa` uma vez por dia, no horário configurado.
+
+    A data/hora vem sempre de utils.relogio (injetável nos testes); `dormir`
+    recebe segundos e pode ser trocado para simular a passagem do tempo.
+    """
+
+    def __init__(self, tarefa: Callable[[], Any] = executar_pipeline_diario,
+                 horario: Optional[str] = None,
+                 preparar: Optional[Callable[[], Dict[str, Any]]] = preparar_execucao,
+                 dormir: Optional[Callable[[float], Any]] = None,
+                 espera_maxima_s: float = ESPERA_MAXIMA_S):
+        self.tarefa = tarefa
+        self.horario = interpretar_horario(horario or os.getenv("HORARIO_EXECUCAO") or HORARIO_PADRAO)
+        self.preparar = preparar
+        self.espera_maxima_s = espera_maxima_s
+        self._parar = threading.Event()
+        self._dormir = dormir or self._parar.wait
+        self.execucoes: List[Dict[str, Any]] = []
+
+    def proxima_execucao(self, depois_de: Optional[datetime] = None) -> datetime:
+        """Próximo horário configurado estritamente depois de `depois_de` (padrão: agora)."""
+        depois_de = depois_de or relogio.agora()
+        alvo = datetime.combine(depois_de.date(), self.horario)
+        if alvo <= depois_de:
+            alvo += timedelta(days=1)
+        return alvo
+
+    def executar_uma_vez(self) -> Dict[str, Any]:
+        """Prepara e executa a tarefa agora. Erros são registrados, não propagados."""
+        inicio = time.perf_counter()
+        execucao: Dict[str, Any] = {"inicio": relogio.agora(), "status": "ok", "erro": None}
+        try:
+            if self.preparar:
+                execucao["datas"] = self.preparar()
+            print(f"[Daemon] Executando pipeline de {execucao['inicio']:%d/%m/%Y %H:%M}...")
+            self.tarefa()
+        except Exception as e:
+            execucao["status"] = "erro"
+            execucao["erro"] = str(e)
+            print(f"❌ [Daemon] Erro na execução: {e}")
+            if LOGGING_AVAILABLE:
+                log_erro("daemon_execucao", e, {"inicio": execucao["inicio"].isoformat()})
+        execucao["duracao_ms"] = (time.perf_counter() - inicio) * 1000
+
+        if LOGGING_AVAILABLE:
+            log_operacao("daemon_execucao", execucao["status"].upper(), {
+                "inicio": execucao["inicio"].isoformat(),
+                "duracao_ms": execucao["duracao_ms"],
+            })
+        if METRICS_AVAILABLE:
+            record_operation_metric("daemon_execucao", execucao["duracao_ms"], {
+                "status": execucao["status"],
+                "execucoes": len(self.execucoes) + 1,
+            })
+
+        self.execucoes.append(execucao)
+        return execucao
+
+    def aguardar(self, alvo: datetime) -> bool:
+        """Dorme até `alvo` em fatias de no máximo espera_maxima_s. False se parado antes."""
+        while not self._parar.is_set():
+            falta = (alvo - relogio.agora()).total_seconds()
+            if falta <= 0:
+                return True
+            self._dormir(min(falta, self.espera_maxima_s))
+        return False
+
+    def executar(self, max_execucoes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Laço principal: espera o horário, executa, repete. Retorna as execuções feitas."""
+        feitas = 0
+        while max_execucoes is None or feitas < max_execucoes:
+            alvo = self.proxima_execucao()
+            print(f"[Daemon] Próxima execução: {alvo:%d/%m/%Y %H:%M}")
+            if not self.aguardar(alvo):
+                break
+            self.executar_uma_vez()
+            feitas += 1
+        return self.execucoes
+
+    def parar(self) -> None:
+        self._parar.set()
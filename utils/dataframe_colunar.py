@@ -0,0 +1,118 @@
+"""
+Serialização Colunar de DataFrames - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com o cache existente.
+Entradas antigas (pickle) continuam sendo lidas; só DataFrames com colunas
+numéricas passam a ser gravados neste formato.
+
+Este módulo adiciona:
+1. Formato de arquivo com as colunas numéricas (int, float, bool, datas) em
+   buffers alinhados, e o resto (texto, índice, nomes) em um pickle no final
+2. Leitura por memory-map: as colunas numéricas viram views do arquivo, sem
+   cópia nem desserialização (páginas carregadas sob demanda pelo sistema)
+3. Mapeamento copy-on-write: alterar o DataFrame carregado não altera o arquivo
+
+Layout: MAGIC (8 bytes) | tamanho do cabeçalho (8 bytes, little-endian) |
+cabeçalho JSON | buffers das colunas (alinhados em 64 bytes) | pickle do resto.
+"""
+
+import json
+import pickle
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Union
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"OCDCOL1\n"
+ALINHAMENTO = 64
+
+# Tipos NumPy gravados como buffer: bool, inteiros, float, complexo, datas
+_TIPOS_BUFFER = set("biufcmM")
+
+
+def _alinhar(posicao: int) -> int:
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def _coluna_em_buffer(serie: pd.Series) -> bool:
+    return isinstance(serie.dtype, np.dtype) and serie.dtype.kind in _TIPOS_BUFFER
+
+
+def pode_gravar_colunar(data: Any) -> bool:
+    """DataFrame com pelo menos uma coluna numérica (as demais vão no pickle)."""
+    if not isinstance(data, pd.DataFrame):
+        return False
+    return any(_coluna_em_buffer(data.iloc[:, pos]) for pos in range(data.shape[1]))
+
+
+def e_arquivo_colunar(inicio: bytes) -> bool:
+    """Verifica os primeiros bytes de um arquivo de cache."""
+    return inicio[:len(MAGIC)] == MAGIC
+
+
+def gravar_dataframe(f: BinaryIO, df: pd.DataFrame) -> int:
+    """Grava `df` no arquivo aberto em modo binário. Retorna os bytes gravados."""
+    colunas, buffers, resto = [], [], {}
+    offset = 0
+    for pos in range(df.shape[1]):
+        serie = df.iloc[:, pos]
+        if _coluna_em_buffer(serie):
+            valores = np.ascontiguousarray(serie.to_numpy())
+            offset = _alinhar(offset)
+            colunas.append({"pos": pos, "dtype": valores.dtype.str, "offset": offset})
+            buffers.append((offset, valores))
+            offset += valores.nbytes
+        else:
+            colunas.append({"pos": pos})
+            resto[pos] = serie.array
+
+    cabecalho = json.dumps({
+        "linhas": len(df),
+        "colunas": colunas,
+        "resto": _alinhar(offset),
+    }).encode("utf-8")
+
+    f.write(MAGIC)
+    f.write(len(cabecalho).to_bytes(8, "little"))
+    f.write(cabecalho)
+    base = _alinhar(len(MAGIC) + 8 + len(cabecalho))
+    inicio = f.tell() - (len(MAGIC) + 8 + len(cabecalho))
+
+    for posicao, valores in buffers:
+        f.write(b"\0" * (inicio + base + posicao - f.tell()))
+        f.write(valores.view(np.uint8).data if valores.size else b"")
+    f.write(b"\0" * (inicio + base + _alinhar(offset) - f.tell()))
+    pickle.dump({"colunas": resto, "index": df.index, "columns": df.columns, "attrs": df.attrs},
+                f, protocol=pickle.HIGHEST_PROTOCOL)
+    return f.tell() - inicio
+
+
+def carregar_dataframe(caminho: Union[str, Path]) -> pd.DataFrame:
+    """Abre o arquivo por memory-map; colunas numéricas sem cópia."""
+    with open(caminho, "rb") as f:
+        if not e_arquivo_colunar(f.read(len(MAGIC))):
+            raise ValueError(f"{caminho} não está no formato colunar.")
+        tamanho = int.from_bytes(f.read(8), "little")
+        cabecalho = json.loads(f.read(tamanho))
+    base = _alinhar(len(MAGIC) + 8 + tamanho)
+
+    # mode="c": páginas privadas, alterações ficam só na memória do processo
+    mapa = np.memmap(caminho, dtype=np.uint8, mode="c").view(np.ndarray)
+    resto = pickle.loads(mapa[base + cabecalho["resto"]:])
+
+    linhas = cabecalho["linhas"]
+    dados: Dict[int, Any] = {}
+    for coluna in cabecalho["colunas"]:
+        pos = coluna["pos"]
+        if "dtype" not in coluna:
+            dados[pos] = resto["colunas"][pos]
+            continue
+        tipo = np.dtype(coluna["dtype"])
+        inicio = base + coluna["offset"]
+        dados[pos] = mapa[inicio:inicio + linhas * tipo.itemsize].view(tipo)
+
+    df = pd.DataFrame(dados, index=resto["index"], copy=False)
+    df.columns = resto["columns"]
+    df.attrs = resto["attrs"]
+    return df
@@ -13,13 +13,14 @@ Este módulo adiciona:
 """
 
 import os
-import calendar
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Tuple, Optional, Any
 import shutil
 import re
 
+from utils import relogio
+
 # Import dos sistemas implementados
 try:
     from utils.logger import log_operacao, log_erro, logger
@@ -98,7 +99,7 @@ class DynamicConfigManager:
     
     def __init__(self):
         self.settings = DynamicConfigSettings()
-        self.current_date = datetime.now()
+        self._data_fixa: Optional[datetime] = None
         
         # Cria diretório de backup se não existir
         self.settings.ENV_BACKUP_DIR.mkdir(exist_ok=True)
@@ -109,6 +110,19 @@ class DynamicConfigManager:
                 "backup_dir": str(self.settings.ENV_BACKUP_DIR)
             })
     
+    @property
+    def current_date(self) -> datetime:
+        """
+        Data de referência: lida do relógio a cada acesso, para que um processo
+        que fica aberto (modo daemon) não continue no dia em que foi iniciado.
+        Atribuir uma data fixa a sobrepõe; atribuir None volta ao relógio.
+        """
+        return self._data_fixa or relogio.agora()
+
+    @current_date.setter
+    def current_date(self, valor: Optional[datetime]) -> None:
+        self._data_fixa = valor
+
     def should_update_dates(self) -> bool:
         """
         Verifica se deve atualizar as datas (dia 1 do mês).
@@ -550,14 +564,14 @@ def enhanced_etapa8_dates() -> Tuple[str, str, int]:
     dia_inicio, dia_fim = get_dynamic_date_range()
 
     # Calcula ontem (sempre o dia anterior)
-    ontem = (datetime.now() - timedelta(days=1)).day
+    ontem = relogio.ontem().day
 
     if LOGGING_AVAILABLE:
         log_operacao("enhanced_etapa8_dates", "SUCESSO", {
             "dia_inicio": dia_inicio,
             "dia_fim": dia_fim,
             "ontem": ontem,
-            "current_day": datetime.now().day,
+            "current_day": relogio.agora().day,
             "logic": "dynamic_dates"
         })
 
@@ -628,7 +642,7 @@ def get_system_status() -> Dict[str, Any]:
     Retorna status completo do sistema de configuração dinâmica.
     Útil para debugging e monitoramento.
     """
-    current_day = datetime.now().day
+    current_day = relogio.agora().day
     mes_info = get_current_month_info()
 
     # Verifica próximas ações
@@ -638,7 +652,7 @@ def get_system_status() -> Dict[str, Any]:
     elif current_day == 2:
         next_actions.append("Verificando se caminhos precisam ser atualizados")
     else:
-        days_until_next_month = calendar.monthrange(datetime.now().year, datetime.now().month)[1] - current_day + 1
+        days_until_next_month = relogio.dias_do_mes() - current_day + 1
         next_actions.append(f"Próxima atualização em {days_until_next_month} dias (dia 1)")
 
     # Obtém datas atuais
@@ -201,7 +201,7 @@ def exemplo_atualizacao_automatica():
             print("  📊 Outros dias: Do dia 1 do mês atual até ontem")
     
     # Restaura data atual
-    dynamic_config.current_date = datetime.now()
+    dynamic_config.current_date = None
     print("\n✅ Simulação de atualização automática concluída!")
 
 
@@ -1,12 +1,9 @@
 from config import (
     CAMINHO_PLANILHA,
     NOME_ABA,
-    DATA_HOJE,
-    DATA_ONTEM,
     LOGIN_SISTEMA,
     SENHA_SISTEMA,
 )
-from openpyxl import load_workbook
 from tkinter import messagebox
 import os
 
@@ -35,6 +32,11 @@ from utils.sistema import (
     posto_chacaltaya
 )
 from utils.email import enviar_relatorio
+from utils.meu_controle import sessao_meu_controle
+from utils.postos import coleta_relatorios_postos
+from utils.historico import registrar_no_historico
+from utils import relogio
+from utils.workbook_pool import abrir_workbook, salvar_workbook
 from interfaces.entrada_dados import coletar_litros_usuario
 from interfaces.metodos_pagamento import coletar_formas_pagamento
 from interfaces.valores_fechamento import abrir_janela_valores
@@ -66,14 +68,15 @@ def etapa1_backup_e_precos():
     criar_backup_planilha(caminho)
     
     # Carregando planilha
-    wb = load_workbook(caminho)
+    wb = abrir_workbook(caminho)
     
     # Copiando intervalo
-    copiar_intervalo_k5_r14(wb, DATA_HOJE)
-    formatar_coluna_o_em_vermelho(wb, DATA_HOJE)
+    data_hoje = relogio.agora()
+    copiar_intervalo_k5_r14(wb, data_hoje)
+    formatar_coluna_o_em_vermelho(wb, data_hoje)
     
     # Salvando alterações
-    wb.save(caminho)
+    salvar_workbook(wb, caminho)
     
     mostrar_alerta_visual("Etapa 1 Concluída", "Backup e preços atualizados com sucesso!", tipo="success")
     messagebox.showinfo("Etapa 1", "Backup e preços atualizados com sucesso!")
@@ -95,9 +98,9 @@ def etapa2_minimercado():
     mostrar_alerta_visual("Processando dados", "Extraindo e salvando relatório...", tipo="info")
     valor = extrair_valor_tmp()
     
-    wb = load_workbook(caminho)
-    inserir_valor_planilha(wb, valor, DATA_HOJE)
-    wb.save(caminho)
+    wb = abrir_workbook(caminho)
+    inserir_valor_planilha(wb, valor, relogio.agora())
+    salvar_workbook(wb, caminho)
     
     mostrar_alerta_visual("Etapa 2 Concluída", "Relatório mini-mercado processado!", tipo="success")
     messagebox.showinfo("Etapa 2", "Relatório mini-mercado salvo na planilha.")
@@ -131,6 +134,7 @@ def etapa4_cashback_pix():
     # Gerando relatório
     mostrar_alerta_visual("Gerando relatório", "Solicitando dados de cashback e pix...", tipo="info")
     cashback, pix_total = auto_system_relatorio_cashback_e_pix()
+    registrar_no_historico(relogio.ontem(), {"cashback": cashback, "pix": pix_total}, origem="etapa4")
     mostrar_alerta_visual("Dados obtidos", f"Cashback: R$ {cashback:,.2f} | Pix: R$ {pix_total:,.2f}", tipo="dev")
     
     # Inserindo na planilha
@@ -165,7 +169,7 @@ def etapa6_envio_email():
     # Enviando relatório
     mostrar_alerta_visual("Enviando e-mail", "Preparando e enviando relatório...", tipo="info")
     enviar_relatorio(
-        CAMINHO_PLANILHA_DINAMICO or CAMINHO_PLANILHA, DATA_ONTEM
+        CAMINHO_PLANILHA_DINAMICO or CAMINHO_PLANILHA, relogio.data_ontem_formatada()
     )
     
     mostrar_alerta_visual("Etapa 6 Concluída", "Relatório enviado por e-mail com sucesso!", tipo="success")
@@ -176,7 +180,7 @@ def etapa7_fechamento_caixa():
     mostrar_alerta_visual("Iniciando Etapa 7", "Fechamento de Caixa (EMSys)", tipo="info")
     
     # Acessando fechamento
-    acessar_fechamento_caixa(DATA_ONTEM)
+    acessar_fechamento_caixa(relogio.data_ontem_formatada())
     # Automatizando processo
     mostrar_alerta_visual("Automatizando fechamento", "Executando automação de caixa...", tipo="info")
     automatizar_fechamento_caixa()
@@ -196,33 +200,36 @@ def etapa8_projecao_de_vendas() -> None:
     """
     # SISTEMA AUTOMÁTICO DE DATAS - Substitui lógica manual
     from utils.dynamic_config import enhanced_etapa8_dates
-    from datetime import datetime
 
     dia_inicio, dia_fim, ontem = enhanced_etapa8_dates()
-    hoje = datetime.now()  # Mantém variável hoje para compatibilidade
+    hoje = relogio.agora()  # Mantém variável hoje para compatibilidade
 
     # Processo comentado - descomente conforme necessário
     atualizando_planilhas_projecao()
-    acessar_relatorio_subcategoria()
-
-    # Relatórios específicos
-    relatorios = [
-        ("Combustíveis", lambda: relatorio_combustiveis(hoje, dia_inicio, dia_fim, ontem)),
-        ("Bebidas não alcoólicas", lambda: relatorio_bebida_nao_alcoolica(ontem)),
-        ("Bomboniere", lambda: relatorio_bomboniere(ontem)),
-        ("Cerveja", lambda: relatorio_cerveja(ontem)),
-        ("Food", lambda: relatorio_food(ontem)),
-        ("Cigarro", lambda: relatorio_cigarro(ontem)),
-        ("Isqueiros", lambda: relatorio_isqueiros(ontem))
-    ]
-    
-    for nome, func in relatorios:
-        print(f"Gerando relatório de {nome}...")
-        func()
-    
-    # Posto Chacaltaya - único alerta durante pyautogui
-    mostrar_alerta_visual("Processando Chacaltaya", "Atualizando dados do posto...", tipo="info")
-    posto_chacaltaya()
-    
+
+    # Todas as fórmulas do Meu Controle são gravadas de uma vez ao final da etapa;
+    # os relatórios exportados dos dois postos são lidos juntos, em paralelo
+    with sessao_meu_controle(), coleta_relatorios_postos(os.getenv("CAMINHO_MEU_CONTROLE")):
+        acessar_relatorio_subcategoria()
+
+        # Relatórios específicos
+        relatorios = [
+            ("Combustíveis", lambda: relatorio_combustiveis(hoje, dia_inicio, dia_fim, ontem)),
+            ("Bebidas não alcoólicas", lambda: relatorio_bebida_nao_alcoolica(ontem)),
+            ("Bomboniere", lambda: relatorio_bomboniere(ontem)),
+            ("Cerveja", lambda: relatorio_cerveja(ontem)),
+            ("Food", lambda: relatorio_food(ontem)),
+            ("Cigarro", lambda: relatorio_cigarro(ontem)),
+            ("Isqueiros", lambda: relatorio_isqueiros(ontem))
+        ]
+
+        for nome, func in relatorios:
+            print(f"Gerando relatório de {nome}...")
+            func()
+
+        # Posto Chacaltaya - único alerta durante pyautogui
+        mostrar_alerta_visual("Processando Chacaltaya", "Atualizando dados do posto...", tipo="info")
+        posto_chacaltaya()
+
     mostrar_alerta_visual("Etapa 8 Concluída", "Projeção de vendas finalizada com sucesso!", tipo="success")
     messagebox.showinfo("Etapa 8", "Relatórios atualizados com sucesso!")
\ No newline at end of file
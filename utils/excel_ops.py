@@ -1,7 +1,14 @@
 from utils.file_utils import aguardar_arquivo
+from utils.meu_controle import gravar_no_meu_controle
+from utils.workbook_pool import abrir_workbook, salvar_workbook
+from utils.excel_stream import LeitorStreaming
+from utils.agendador import Passo, executar_passos
+from utils.historico import registrar_no_historico
 from openpyxl.styles import Font
-from openpyxl.cell import MergedCell
+from openpyxl.utils.cell import range_boundaries
 from openpyxl import load_workbook
+import calendar
+import numbers
 import pandas as pd
 import openpyxl
 from datetime import datetime, timedelta
@@ -16,17 +23,130 @@ from projecao.combustiveis import (
     atualizar_dados_projecao_combustiveis,
 )
 from projecao.consolidado import atualizar_valores_de_vendas_geral
+from projecao.modelos import projetar_totais
+from projecao.util import atualizar_conexoes_excel
+from utils import relogio
 from tkinter import messagebox
 from interfaces.alerta_visual import mostrar_alerta_visual, mostrar_alerta_progresso
 import time
-import calendar
+from copy import copy
 from datetime import datetime
 load_dotenv()
 
-hoje = datetime.today()
-dias_do_mes = calendar.monthrange(hoje.year, hoje.month)[1]
 LETRA_PLANILHA = "H"
 
+
+def __getattr__(nome):
+    # hoje/dias_do_mes eram fixados na importação; agora seguem o relógio a cada acesso
+    if nome == "hoje":
+        return relogio.agora()
+    if nome == "dias_do_mes":
+        return relogio.dias_do_mes()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+# Produtos somados no relatório de isqueiros de cada posto
+ISQUEIROS_CHACALTAYA = [
+    "ISQUEIRO CLIPPER MINI SPECIAL",
+    "ISQUEIRO BIC MINI",
+    "ISQUEIRO BIC MAXXI",
+    "ISQUEIRO BIC MAXXI TREND MUSIC",
+]
+ISQUEIROS_OCEANIC = [
+    "ISQUEIRO BIC MINI",
+    "ISQUEIRO BIC MAXXI",
+    "ISQUEIRO CRICKET MINI",
+    "ISQUEIRO CLIPPER MAXI LISO",
+    "ISQUEIRO ZENGAZ EMBORRACHADO GRAND JET CORES",
+]
+
+def _celulas_mescladas(ws, min_col, min_row, max_col, max_row):
+    """
+    Conjunto (linha, coluna) das células mescladas não editáveis dentro dos limites.
+    A célula superior esquerda de cada mesclagem continua editável, como no openpyxl.
+    """
+    cobertas = set()
+    for faixa in ws.merged_cells.ranges:
+        if faixa.max_row < min_row or faixa.min_row > max_row or faixa.max_col < min_col or faixa.min_col > max_col:
+            continue
+        for row in range(max(faixa.min_row, min_row), min(faixa.max_row, max_row) + 1):
+            for col in range(max(faixa.min_col, min_col), min(faixa.max_col, max_col) + 1):
+                if (row, col) != (faixa.min_row, faixa.min_col):
+                    cobertas.add((row, col))
+    return cobertas
+
+
+def _copiar_estilo(origem_cell, destino_cell):
+    """Copia o estilo pelos objetos públicos, válido entre workbooks diferentes."""
+    destino_cell.font = copy(origem_cell.font)
+    destino_cell.fill = copy(origem_cell.fill)
+    destino_cell.border = copy(origem_cell.border)
+    destino_cell.alignment = copy(origem_cell.alignment)
+    destino_cell.protection = copy(origem_cell.protection)
+    destino_cell.number_format = origem_cell.number_format
+
+
+def copiar_intervalo(sheet_origem, destinos, intervalo, valores=True, estilos=False):
+    """
+    Copia um intervalo (ex.: "K5:R14") da aba de origem para uma ou várias abas de destino.
+
+    A origem é lida uma única vez e, para cada destino, as células mescladas são
+    calculadas antes da cópia em vez de testadas célula a célula.
+    Com estilos=True, destinos de outro workbook recebem cópias de fonte,
+    preenchimento, borda, alinhamento, formato e proteção (os índices de
+    estilo só valem dentro do workbook de origem).
+    Retorna o total de células gravadas em todos os destinos.
+    """
+    if not isinstance(destinos, (list, tuple)):
+        destinos = [destinos]
+
+    min_col, min_row, max_col, max_row = range_boundaries(intervalo)
+    linhas_origem = [
+        list(linha)
+        for linha in sheet_origem.iter_rows(
+            min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col
+        )
+    ]
+
+    celulas_copiadas = 0
+    for sheet_destino in destinos:
+        mesmo_workbook = sheet_destino.parent is sheet_origem.parent
+        mescladas = _celulas_mescladas(sheet_destino, min_col, min_row, max_col, max_row)
+        for row, linha in enumerate(linhas_origem, start=min_row):
+            for col, origem_cell in enumerate(linha, start=min_col):
+                if (row, col) in mescladas:
+                    continue
+                destino_cell = sheet_destino.cell(row=row, column=col)
+                if valores:
+                    destino_cell.value = origem_cell.value
+                if estilos and origem_cell.has_style:
+                    if mesmo_workbook:
+                        destino_cell._style = copy(origem_cell._style)
+                    else:
+                        _copiar_estilo(origem_cell, destino_cell)
+                celulas_copiadas += 1
+
+    return celulas_copiadas
+
+
+def copiar_intervalo_para_dias(wb, nome_aba_origem, dias, intervalo="K5:R14", valores=True, estilos=False):
+    """
+    Replica o intervalo da aba de origem nas abas "Dia NN" indicadas (ex.: o mês inteiro).
+    """
+    nomes_destino = [f"Dia {dia:02d}" for dia in dias]
+    ausentes = [nome for nome in [nome_aba_origem] + nomes_destino if nome not in wb.sheetnames]
+    if ausentes:
+        mostrar_alerta_visual("Erro: Abas não encontradas", f"Verificar: {', '.join(ausentes)}", tipo="error")
+        raise ValueError(f"Abas não encontradas no arquivo: {', '.join(ausentes)}")
+
+    destinos = [wb[nome] for nome in nomes_destino if nome != nome_aba_origem]
+    celulas_copiadas = copiar_intervalo(wb[nome_aba_origem], destinos, intervalo, valores, estilos)
+    print(
+        f"[Cópia] Intervalo {intervalo} de '{nome_aba_origem}' replicado em {len(destinos)} aba(s) ({celulas_copiadas} células)."
+    )
+    return celulas_copiadas
+
+
 def copiar_intervalo_k5_r14(wb, data_referencia):
     dia_origem = data_referencia - timedelta(days=2)
     dia_destino = data_referencia - timedelta(days=1)
@@ -39,22 +159,7 @@ def copiar_intervalo_k5_r14(wb, data_referencia):
             f"Aba '{nome_aba_origem}' ou '{nome_aba_destino}' não encontrada no arquivo."
         )
 
-    sheet_origem = wb[nome_aba_origem]
-    sheet_destino = wb[nome_aba_destino]
-    
-    # Contador para progresso
-    total_celulas = 0
-    celulas_copiadas = 0
-    
-    for row in range(5, 15):
-        for col in range(11, 19):
-            total_celulas += 1
-            valor = sheet_origem.cell(row=row, column=col).value
-            destino_cell = sheet_destino.cell(row=row, column=col)
-            if isinstance(destino_cell, MergedCell):
-                continue
-            destino_cell.value = valor
-            celulas_copiadas += 1
+    copiar_intervalo(wb[nome_aba_origem], wb[nome_aba_destino], "K5:R14")
     print(
         f"[Cópia] Intervalo K5:R14 copiado de '{nome_aba_origem}' para '{nome_aba_destino}'."
     )
@@ -141,7 +246,7 @@ def inserir_litro_e_desconto_planilha(caminho_arquivo, nome_aba):
 
     mostrar_alerta_visual("Dados processados", f"{produtos_processados} produtos extraídos", tipo="dev")
 
-    wb = load_workbook(caminho_arquivo)
+    wb = abrir_workbook(caminho_arquivo)
     ws = wb[nome_aba]
     mapa_celulas = {
         "GASOLINA COMUM": {"quantidade": "D21", "desconto": "F21"},
@@ -155,7 +260,7 @@ def inserir_litro_e_desconto_planilha(caminho_arquivo, nome_aba):
         ws[celulas["quantidade"]] = dados_produto["Litragem"]
         ws[celulas["desconto"]] = dados_produto["Desconto"]
     
-    wb.save(caminho_arquivo)
+    salvar_workbook(wb, caminho_arquivo)
     print("✅ Quantidade e Desconto inseridos com sucesso.")
 
     if os.path.exists(desktop_tmp):
@@ -170,7 +275,7 @@ def inserir_cashback_e_pix_planilha(
 ):
     mostrar_alerta_visual("Inserindo cashback e pix", "Salvando valores na planilha...", tipo="info")
     
-    wb_destino = load_workbook(caminho_arquivo)
+    wb_destino = abrir_workbook(caminho_arquivo)
     ws_destino = wb_destino[nome_aba]
     
     if cashback_valor is not None:
@@ -183,7 +288,7 @@ def inserir_cashback_e_pix_planilha(
     ws_destino.cell(row=21, column=13).value = total_pix
     mostrar_alerta_visual("Pix inserido", f"Total: R$ {total_pix:,.2f}", tipo="dev")
     
-    wb_destino.save(caminho_arquivo)
+    salvar_workbook(wb_destino, caminho_arquivo)
     print("✅ Valores inseridos com sucesso.")
     mostrar_alerta_visual("Cashback e pix salvos", "Valores inseridos com sucesso!", tipo="success")
 
@@ -193,7 +298,7 @@ def inserir_litros_planilha(
 ):
     mostrar_alerta_visual("Inserindo litros", "Salvando dados de combustíveis...", tipo="info")
     
-    wb = load_workbook(caminho_arquivo)
+    wb = abrir_workbook(caminho_arquivo)
     ws = wb[nome_aba]
     
     litros_inseridos = 0
@@ -222,11 +327,62 @@ def inserir_litros_planilha(
         time.sleep(1)
         litros_inseridos += 1
 
-    wb.save(caminho_arquivo)
+    salvar_workbook(wb, caminho_arquivo)
     print("✅ Litros inseridos na planilha com sucesso.")
     mostrar_alerta_visual("Litros inseridos", f"{litros_inseridos} valores salvos com sucesso!", tipo="success")
 
 
+def passos_projecao(caminho_chacaltaya, caminho_oceanico_vendas, caminho_oceanico,
+                    caminho_controle, caminho_combustivel, caminho_copia):
+    """
+    Passos da etapa 8 com os arquivos que cada um lê e grava, na ordem da
+    execução sequencial. Os vínculos externos são atualizados no próprio
+    arquivo, por isso a planilha de vendas e a cópia aparecem como gravadas.
+    Os vínculos da planilha de vendas são atualizados uma vez, antes dos dois
+    passos que leem a aba do dia, que assim compartilham o mesmo snapshot.
+    """
+    return [
+        Passo(
+            "vinculos_vendas",
+            atualizar_conexoes_excel,
+            escreve=[caminho_oceanico],
+            kwargs=dict(caminho_arquivo=caminho_oceanico),
+        ),
+        Passo(
+            "projecao_vendas",
+            atualizar_projecao_vendas,
+            le=[caminho_chacaltaya, caminho_oceanico_vendas],
+            escreve=[caminho_controle],
+            kwargs=dict(
+                caminho_arquivo_chacaltaya=caminho_chacaltaya,
+                caminho_arquivo_vendas=caminho_oceanico_vendas,
+                caminho_arquivo_destino=caminho_controle,
+            ),
+        ),
+        Passo(
+            "combustiveis",
+            atualizar_combustiveis,
+            le=[caminho_oceanico],
+            escreve=[caminho_combustivel],
+            kwargs=dict(caminho_vendas=caminho_oceanico, caminho_destino=caminho_combustivel),
+        ),
+        Passo(
+            "dados_projecao_combustiveis",
+            atualizar_dados_projecao_combustiveis,
+            le=[caminho_oceanico],
+            escreve=[caminho_copia],
+            kwargs=dict(caminho_vendas=caminho_oceanico, caminho_projecao=caminho_copia,
+                        atualizar_vinculos=False),
+        ),
+        Passo(
+            "vendas_geral",
+            atualizar_valores_de_vendas_geral,
+            escreve=[caminho_copia, caminho_controle],
+            kwargs=dict(caminho_arquivo_copia=caminho_copia, caminho_arquivo_meu_controle=caminho_controle),
+        ),
+    ]
+
+
 def atualizando_planilhas_projecao():
     mostrar_alerta_visual("Atualizando projeções", "Processando planilhas de projeção...", tipo="info")
     
@@ -260,278 +416,365 @@ def atualizando_planilhas_projecao():
         mostrar_alerta_visual("Erro de Configuração", f"Variáveis ausentes: {', '.join(faltantes)}", tipo="error")
         raise EnvironmentError(f"Variável(is) de caminho ausente(s) no .env: {', '.join(faltantes)}")
 
-    
-    atualizar_projecao_vendas(
-        caminho_arquivo_chacaltaya=caminho_chacaltaya,
-        caminho_arquivo_vendas=caminho_oceanico_vendas,
-        caminho_arquivo_destino=caminho_controle,
-    )
-
-    atualizar_combustiveis(
-        caminho_vendas=caminho_oceanico,
-        caminho_destino=caminho_combustivel,
-    )
-
-    atualizar_dados_projecao_combustiveis(
-        caminho_vendas=caminho_oceanico,
-        caminho_projecao=caminho_copia,
-    )
+    executar_passos(passos_projecao(
+        caminho_chacaltaya=caminho_chacaltaya,
+        caminho_oceanico_vendas=caminho_oceanico_vendas,
+        caminho_oceanico=caminho_oceanico,
+        caminho_controle=caminho_controle,
+        caminho_combustivel=caminho_combustivel,
+        caminho_copia=caminho_copia,
+    ))
 
-    atualizar_valores_de_vendas_geral(
-        caminho_arquivo_copia=caminho_copia,
-        caminho_arquivo_meu_controle=caminho_controle,
-    )
-    
     return messagebox.showinfo("Etapa 8", "Valores atualizados nas planilhas.")
     
 
 def extrair_valores_relatorio_combustivel_tmp(ontem, chacal=False):
     """
     Lê os valores do relatório tmp.xlsx e insere projeções como fórmulas
-    na planilha 'Meu Controle' no caminho especificado no .env.
-    
-    Fórmula usada: =valor/dia_fim*30
-    """
-    load_dotenv()
-    
-    # Caminhos
-    caminho_tmp = Path.home() / "Desktop" / "tmp.xlsx"
-    caminho_meu_controle = os.getenv("CAMINHO_MEU_CONTROLE")
-
-    # Carrega valores do relatório temporário
-    wb_tmp = load_workbook(caminho_tmp, data_only=True)
-    ws_tmp = wb_tmp.active
+    na planilha 'Meu Controle' no caminho especificado no .env, nas células
+    de RELATORIOS_MEU_CONTROLE["combustiveis"] (linhas 32-36 no Oceanic e
+    10-13 no Chacaltaya).
 
-    valores = {
-        "gasolina_comum": ws_tmp["I14"].value,
-        "gasolina_aditivada": ws_tmp["I20"].value,
-        "etanol_comum": ws_tmp["I11"].value,
-        "diesel_s10": ws_tmp["I17"].value,
-    }
-
-    # Carrega planilha Meu Controle
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active  # ou nome da aba, se necessário
-
-    # Mapeamento: célula destino -> variável
-    if chacal:    
-        destino = {
-            f"{LETRA_PLANILHA}10": "gasolina_comum",
-            f"{LETRA_PLANILHA}11": "gasolina_aditivada",
-            f"{LETRA_PLANILHA}12": "etanol_comum",
-            f"{LETRA_PLANILHA}13": "diesel_s10",
-        }
-    else:
-        destino = {
-            f"{LETRA_PLANILHA}32": "gasolina_comum",
-            f"{LETRA_PLANILHA}33": "gasolina_aditivada",
-            f"{LETRA_PLANILHA}34": "etanol_comum",
-            f"{LETRA_PLANILHA}36": "diesel_s10",
-        }
-
-    # Inserir fórmulas
-    for celula, nome_var in destino.items():
-        valor = valores[nome_var]
-        if isinstance(valor, (int, float)):
-            formula = f"={valor}/{ontem}*{dias_do_mes}"
-            ws_controle[celula] = formula
-
-    wb_controle.save(caminho_meu_controle)
-    
-    os.remove(caminho_tmp)
-    print(f"[Limpeza] Arquivo temporário removido: {caminho_tmp}")
+    Fórmula usada: =valor/dia_fim*dias_do_mes (ver montar_projecoes)
+    """
+    _processar_relatorio_tmp("combustiveis", ontem, chacal)
     
 
 def buscar_valor_total_geral(path_planilha: str, chacal=False) -> float:
     """
     Procura pela linha onde está o texto 'Total Geral (Todos os Departamentos)' na Coluna A
-    e retorna o valor da Coluna R três linhas acima.
+    e retorna o valor da Coluna R (ou K, no Chacaltaya) da mesma linha.
+
+    A leitura é feita em streaming: só a coluna A é examinada e a varredura
+    para na primeira ocorrência, sem carregar o workbook inteiro.
     """
-    wb = load_workbook(path_planilha, data_only=True)
-    ws = wb.active
+    with LeitorStreaming(path_planilha) as leitor:
+        return _buscar_valor_total_geral(leitor, chacal)
 
-    for row in ws.iter_rows(min_col=1, max_col=1):
-        cell = row[0]
-        if isinstance(cell.value, str) and "Total Geral (Todos os Departamentos)" in cell.value:
-            linha = cell.row
-            if chacal:
-                valor = ws[f"K{linha}"].value  
-                print(f"[Valor encontrado] K{linha} = {valor}")
-                return valor
-            else:    
-                valor = ws[f"R{linha}"].value  
-                print(f"[Valor encontrado] R{linha} = {valor}")
-                return valor
 
-    raise ValueError("Texto 'Total Geral (Todos os Departamentos)' não encontrado na Coluna A.")
+def _buscar_valor_total_geral(leitor, chacal=False, coluna=None):
+    coluna = coluna or ("K" if chacal else "R")
+    resultado = leitor.localizar_valor_por_rotulo(
+        "Total Geral (Todos os Departamentos)", coluna_valor=coluna
+    )
+
+    if resultado is None:
+        raise ValueError("Texto 'Total Geral (Todos os Departamentos)' não encontrado na Coluna A.")
+
+    linha, valor = resultado
+    print(f"[Valor encontrado] {coluna}{linha} = {valor}")
+    return valor
 
 
 def extrair_valores_relatorio_bebidas_nao_alcoolicas_tmp(dia_fim: int, chacal=False):
     """
-    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na célula G39.
-    A fórmula será: =valor/dia_fim*30
+    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na
+    célula da categoria em RELATORIOS_MEU_CONTROLE (coluna LETRA_PLANILHA,
+    linha 39 no Oceanic e 17 no Chacaltaya).
+    A fórmula será: =valor/dia_fim*dias_do_mes (ver montar_projecoes).
     """
-    load_dotenv()
-
-    # Caminhos
-    caminho_tmp = Path.home() / "Desktop" / "tmp.xlsx"
-    caminho_meu_controle = os.getenv("CAMINHO_MEU_CONTROLE")
-
-    # Extrair valor da planilha temporária
-    valor = buscar_valor_total_geral(caminho_tmp, chacal=chacal)
-
-    try:
-        if isinstance(valor, str):
-            valor = float(valor.replace(".", "").replace(",", "."))
-    except ValueError:
-        raise ValueError(f"Não foi possível converter o valor '{valor}' para float.")
+    _processar_relatorio_tmp("bebidas_nao_alcoolicas", dia_fim, chacal)
 
 
-    # Formatar valor com vírgula decimal (para Excel em português)
-    valor_str = f"{valor:.2f}"  # mantém ponto decimal (ex: "9991.68")
-
-    # Atualizar planilha Meu Controle
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active
+def relatorio_bomboniere_tmp(dia_fim: int, chacal=False):
+    """
+    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na
+    célula da categoria em RELATORIOS_MEU_CONTROLE (coluna LETRA_PLANILHA,
+    linha 40 no Oceanic e 18 no Chacaltaya).
+    A fórmula será: =valor/dia_fim*dias_do_mes (ver montar_projecoes).
+    """
+    _processar_relatorio_tmp("bomboniere", dia_fim, chacal)
 
-    formula = f"={valor_str}/{dia_fim}*{dias_do_mes}"
     
-    if chacal:
-        ws_controle[f"{LETRA_PLANILHA}17"] = formula
-    else:
-        ws_controle[f"{LETRA_PLANILHA}39"] = formula
-
-    wb_controle.save(caminho_meu_controle)
-
-    # Remover tmp.xlsx
-    os.remove(caminho_tmp)
-    print(f"[Limpeza] Arquivo temporário removido: {caminho_tmp}")
-
-
-def relatorio_bomboniere_tmp(dia_fim: int, chacal=False):
+def relatorio_cerveja_tmp(dia_fim: int, chacal=False):
     """
-    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na célula G39.
-    A fórmula será: =valor/dia_fim*30
+    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na
+    célula da categoria em RELATORIOS_MEU_CONTROLE (coluna LETRA_PLANILHA,
+    linha 41 no Oceanic e 19 no Chacaltaya).
+    A fórmula será: =valor/dia_fim*dias_do_mes (ver montar_projecoes).
     """
-    load_dotenv()
+    _processar_relatorio_tmp("cerveja", dia_fim, chacal)
 
-    # Caminhos
-    caminho_tmp = Path.home() / "Desktop" / "tmp.xlsx"
-    caminho_meu_controle = os.getenv("CAMINHO_MEU_CONTROLE")
 
-    # Extrair valor da planilha temporária
-    valor = buscar_valor_total_geral(caminho_tmp, chacal=chacal)
+def relatorio_cigarro_tmp(dia_fim: int, chacal=False):
+    """
+    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na
+    célula da categoria em RELATORIOS_MEU_CONTROLE (coluna LETRA_PLANILHA,
+    linha 44 no Oceanic e 22 no Chacaltaya).
+    A fórmula será: =valor/dia_fim*dias_do_mes (ver montar_projecoes).
+    """
+    _processar_relatorio_tmp("cigarro", dia_fim, chacal)
+    
+    
+def relatorio_isqueiro_tmp(dia_fim: int, chacal=False):
+    """
+    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na
+    célula da categoria em RELATORIOS_MEU_CONTROLE (coluna LETRA_PLANILHA,
+    linha 43 no Oceanic e 21 no Chacaltaya).
+    A fórmula será: =valor/dia_fim*dias_do_mes (ver montar_projecoes).
+    """
+    _processar_relatorio_tmp("isqueiros", dia_fim, chacal)
 
-    try:
-        if isinstance(valor, str):
-            valor = float(valor.replace(".", "").replace(",", "."))
-    except ValueError:
-        raise ValueError(f"Não foi possível converter o valor '{valor}' para float.")
 
+def buscar_isqueiro(caminho_tmp, chacal=False):
+    """
+    Soma a coluna I (quantidade) das linhas cujo produto (coluna B) está na
+    lista de isqueiros do posto. Só as colunas B e I são lidas e o filtro é
+    feito sobre as colunas inteiras.
+    """
+    with LeitorStreaming(caminho_tmp) as leitor:
+        return _buscar_isqueiro(leitor, chacal)
 
-    # Formatar valor com vírgula decimal (para Excel em português)
-    valor_str = f"{valor:.2f}"  # mantém ponto decimal (ex: "9991.68")
 
-    # Atualizar planilha Meu Controle
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active
+def _buscar_isqueiro(leitor, chacal=False, nomes_procurados=None):
+    if nomes_procurados is None:
+        nomes_procurados = ISQUEIROS_CHACALTAYA if chacal else ISQUEIROS_OCEANIC
 
-    formula = f"={valor_str}/{dia_fim}*{dias_do_mes}"
-    if chacal:
-        ws_controle[f"{LETRA_PLANILHA}18"] = formula
-    else:
-        ws_controle[f"{LETRA_PLANILHA}40"] = formula
-    wb_controle.save(caminho_meu_controle)
+    total = round(leitor.somar_por_nome(nomes_procurados, "B", "I"), 2)
+    print(f"Total de isqueiros vendidos: {total}")
+    return total
 
-    # Remover tmp.xlsx
-    os.remove(caminho_tmp)
-    print(f"[Limpeza] Arquivo temporário removido: {caminho_tmp}")
 
-    
-def relatorio_cerveja_tmp(dia_fim: int, chacal=False):
-    """
-    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na célula G39.
-    A fórmula será: =valor/dia_fim*30
-    """
-    load_dotenv()
+# ============================================================================
+# MAPEAMENTO RELATÓRIO -> CÉLULAS DO MEU CONTROLE
+# ============================================================================
 
-    # Caminhos
-    caminho_tmp = Path.home() / "Desktop" / "tmp.xlsx"
-    caminho_meu_controle = os.getenv("CAMINHO_MEU_CONTROLE")
+def _extrair_combustiveis(leitor, perfil):
+    celulas = leitor.ler_celulas(["I14", "I20", "I11", "I17"])
+    return {
+        "gasolina_comum": celulas["I14"],
+        "gasolina_aditivada": celulas["I20"],
+        "etanol_comum": celulas["I11"],
+        "diesel_s10": celulas["I17"],
+    }
 
-    # Extrair valor da planilha temporária
-    valor = buscar_valor_total_geral(caminho_tmp, chacal=chacal)
 
+def _extrair_total_geral(leitor, perfil):
+    valor = _buscar_valor_total_geral(leitor, coluna=perfil["coluna_total"])
     try:
         if isinstance(valor, str):
             valor = float(valor.replace(".", "").replace(",", "."))
     except ValueError:
         raise ValueError(f"Não foi possível converter o valor '{valor}' para float.")
+    return {"total": valor}
+
+
+def _extrair_isqueiros(leitor, perfil):
+    return {"total": _buscar_isqueiro(leitor, nomes_procurados=perfil["isqueiros"])}
+
+
+# Cada categoria: extrator (leitor, perfil) -> {chave: valor}, células de destino
+# por posto e formatação do valor na fórmula (None = valor como veio).
+# ignorar_nao_numerico: mantém a célula em vez de falhar (como o antigo fluxo de
+# combustíveis); nas demais, um total não numérico interrompe o relatório.
+# Food não entra aqui porque o total é somado via automação em vários relatórios.
+RELATORIOS_MEU_CONTROLE = {
+    "combustiveis": {
+        "extrator": _extrair_combustiveis,
+        "oceanic": {
+            "gasolina_comum": f"{LETRA_PLANILHA}32",
+            "gasolina_aditivada": f"{LETRA_PLANILHA}33",
+            "etanol_comum": f"{LETRA_PLANILHA}34",
+            "diesel_s10": f"{LETRA_PLANILHA}36",
+        },
+        "chacal": {
+            "gasolina_comum": f"{LETRA_PLANILHA}10",
+            "gasolina_aditivada": f"{LETRA_PLANILHA}11",
+            "etanol_comum": f"{LETRA_PLANILHA}12",
+            "diesel_s10": f"{LETRA_PLANILHA}13",
+        },
+        "casas_decimais": None,
+        "ignorar_nao_numerico": True,
+    },
+    "bebidas_nao_alcoolicas": {
+        "extrator": _extrair_total_geral,
+        "oceanic": {"total": f"{LETRA_PLANILHA}39"},
+        "chacal": {"total": f"{LETRA_PLANILHA}17"},
+        "casas_decimais": 2,
+    },
+    "bomboniere": {
+        "extrator": _extrair_total_geral,
+        "oceanic": {"total": f"{LETRA_PLANILHA}40"},
+        "chacal": {"total": f"{LETRA_PLANILHA}18"},
+        "casas_decimais": 2,
+    },
+    "cerveja": {
+        "extrator": _extrair_total_geral,
+        "oceanic": {"total": f"{LETRA_PLANILHA}41"},
+        "chacal": {"total": f"{LETRA_PLANILHA}19"},
+        "casas_decimais": 2,
+    },
+    "isqueiros": {
+        "extrator": _extrair_isqueiros,
+        "oceanic": {"total": f"{LETRA_PLANILHA}43"},
+        "chacal": {"total": f"{LETRA_PLANILHA}21"},
+        "casas_decimais": None,
+    },
+    "cigarro": {
+        "extrator": _extrair_total_geral,
+        "oceanic": {"total": f"{LETRA_PLANILHA}44"},
+        "chacal": {"total": f"{LETRA_PLANILHA}22"},
+        "casas_decimais": 2,
+    },
+}
+
+
+# ============================================================================
+# PERFIS DE POSTO
+# ============================================================================
+
+def perfil_posto(nome, arquivos=None, caminho_meu_controle=None, coluna_total="R",
+                 isqueiros=None, celulas=None, base="oceanic"):
+    """
+    Perfil de um posto para os relatórios do Meu Controle (dict simples, que
+    pode ser enviado a outros processos).
 
+    coluna_total: coluna do "Total Geral" nos relatórios de subcategoria.
+    isqueiros: produtos somados no relatório de isqueiros.
+    celulas: {categoria: {chave: célula}}; categorias ausentes usam as células
+    do posto `base` ("oceanic" ou "chacal") em RELATORIOS_MEU_CONTROLE.
+    """
+    celulas_base = {categoria: dict(config[base]) for categoria, config in RELATORIOS_MEU_CONTROLE.items()}
+    celulas_base.update(celulas or {})
+    return {
+        "nome": nome,
+        "arquivos": dict(arquivos or {}),
+        "caminho_meu_controle": caminho_meu_controle,
+        "coluna_total": coluna_total,
+        "isqueiros": list(isqueiros if isqueiros is not None else ISQUEIROS_OCEANIC),
+        "celulas": celulas_base,
+    }
 
-    # Formatar valor com vírgula decimal (para Excel em português)
-    valor_str = f"{valor:.2f}"  # mantém ponto decimal (ex: "9991.68")
-
-    # Atualizar planilha Meu Controle
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active
 
-    formula = f"={valor_str}/{dia_fim}*{dias_do_mes}"
+def _perfil_padrao(chacal=False):
+    """Perfis dos dois postos atuais, equivalentes ao antigo parâmetro chacal."""
     if chacal:
-        ws_controle[f"{LETRA_PLANILHA}19"] = formula
-    else:
-        ws_controle[f"{LETRA_PLANILHA}41"] = formula
-    wb_controle.save(caminho_meu_controle)
+        return perfil_posto("chacaltaya", coluna_total="K", isqueiros=ISQUEIROS_CHACALTAYA, base="chacal")
+    return perfil_posto("oceanic", coluna_total="R", isqueiros=ISQUEIROS_OCEANIC, base="oceanic")
 
-    # Remover tmp.xlsx
-    os.remove(caminho_tmp)
-    print(f"[Limpeza] Arquivo temporário removido: {caminho_tmp}")
 
-
-def relatorio_cigarro_tmp(dia_fim: int, chacal=False):
+def montar_projecoes(valores_por_categoria, dia_fim, perfil, modo="formula"):
     """
-    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na célula G39.
-    A fórmula será: =valor/dia_fim*30
+    Projeção de todas as categorias de uma vez (modelo linear, vetorizado).
+
+    valores_por_categoria: {categoria: {chave: total do mês até dia_fim}}.
+    modo="formula" grava =valor/dia_fim*dias_do_mes (como sempre); modo="valor"
+    grava o número projetado. Valor não numérico levanta ValueError, exceto nas
+    categorias com "ignorar_nao_numerico" (combustíveis), em que a célula é mantida.
+    Retorna ({célula: fórmula ou valor}, {célula: valor projetado}).
     """
-    load_dotenv()
+    if modo not in ("formula", "valor"):
+        raise ValueError(f"Modo inválido: {modo}. Use 'formula' ou 'valor'.")
+
+    celulas, acumulados, textos = [], [], []
+    for categoria, valores in valores_por_categoria.items():
+        casas = RELATORIOS_MEU_CONTROLE[categoria]["casas_decimais"]
+        for chave, celula in perfil["celulas"][categoria].items():
+            valor = valores.get(chave)
+            if not isinstance(valor, (int, float)):
+                if not RELATORIOS_MEU_CONTROLE[categoria].get("ignorar_nao_numerico"):
+                    raise ValueError(f"[{categoria}] Valor não numérico para {chave}: {valor!r}.")
+                print(f"⚠️ [{categoria}] Valor não numérico para {chave}: {valor!r}. Célula {celula} mantida.")
+                continue
+            celulas.append(celula)
+            acumulados.append(valor)
+            textos.append(f"{valor:.{casas}f}" if casas is not None else f"{valor}")
 
-    # Caminhos
-    caminho_tmp = Path.home() / "Desktop" / "tmp.xlsx"
-    caminho_meu_controle = os.getenv("CAMINHO_MEU_CONTROLE")
+    dias_do_mes = relogio.dias_do_mes()
+    projetados = projetar_totais(acumulados, dia_fim, dias_do_mes).tolist()
+    projecoes = dict(zip(celulas, projetados))
+    if modo == "valor":
+        return dict(projecoes), projecoes
+    formulas = {celula: f"={texto}/{dia_fim}*{dias_do_mes}" for celula, texto in zip(celulas, textos)}
+    return formulas, projecoes
 
-    # Extrair valor da planilha temporária
-    valor = buscar_valor_total_geral(caminho_tmp, chacal=chacal)
 
-    try:
-        if isinstance(valor, str):
-            valor = float(valor.replace(".", "").replace(",", "."))
-    except ValueError:
-        raise ValueError(f"Não foi possível converter o valor '{valor}' para float.")
+def montar_formulas_projecao(categoria, valores, dia_fim, chacal=False, perfil=None):
+    """
+    Converte os valores extraídos de uma categoria em {célula: fórmula}
+    no formato =valor/dia_fim*dias_do_mes (mesmas regras de montar_projecoes).
+    """
+    formulas, _ = montar_projecoes({categoria: valores}, dia_fim, perfil or _perfil_padrao(chacal))
+    return formulas
 
 
-    # Formatar valor com vírgula decimal (para Excel em português)
-    valor_str = f"{valor:.2f}"  # mantém ponto decimal (ex: "9991.68")
+def extrair_relatorios_posto(arquivos, dia_fim, perfil, modo="formula"):
+    """
+    Parte sem efeitos colaterais de executar_relatorios_meu_controle: lê os
+    relatórios e monta as fórmulas, sem gravar nada.
+    modo: "formula" (padrão) ou "valor", como em montar_projecoes.
+    Retorna ({categoria: valores extraídos}, {célula: fórmula ou valor}).
+    """
+    desconhecidas = [c for c in arquivos if c not in RELATORIOS_MEU_CONTROLE]
+    if desconhecidas:
+        raise KeyError(f"Categoria(s) sem mapeamento no Meu Controle: {', '.join(desconhecidas)}")
+
+    por_arquivo = {}
+    for categoria, caminho in arquivos.items():
+        por_arquivo.setdefault(Path(caminho).resolve(), []).append(categoria)
+
+    resultados = {}
+    for caminho, categorias in por_arquivo.items():
+        extraidos = {}
+        with LeitorStreaming(caminho) as leitor:
+            for categoria in categorias:
+                extrator = RELATORIOS_MEU_CONTROLE[categoria]["extrator"]
+                if extrator not in extraidos:
+                    extraidos[extrator] = extrator(leitor, perfil)
+                resultados[categoria] = extraidos[extrator]
+
+    formulas, projecoes = montar_projecoes(resultados, dia_fim, perfil, modo=modo)
+    for celula, valor in projecoes.items():
+        print(f"[Projeção] {perfil['nome']} {celula} = {valor:,.2f}")
+    return resultados, formulas
+
+
+def _data_do_dia(dia):
+    """Data mais recente (hoje ou antes) com o dia do mês informado (1 a 31)."""
+    if isinstance(dia, bool) or not isinstance(dia, numbers.Integral) or not 1 <= dia <= 31:
+        raise ValueError(f"Dia do mês inválido: {dia!r}. Use um número de 1 a 31.")
+    referencia = relogio.hoje()
+    if dia > referencia.day:
+        referencia = referencia.replace(day=1) - timedelta(days=1)  # último dia do mês anterior
+    # Mês sem esse dia (ex.: 31 em abril): volta para o mês anterior; no máximo duas vezes
+    while dia > calendar.monthrange(referencia.year, referencia.month)[1]:
+        referencia = referencia.replace(day=1) - timedelta(days=1)
+    return referencia.replace(day=dia)
+
+
+def registrar_acumulados_no_historico(resultados, dia_fim, posto):
+    """Registra no histórico os totais do mês até dia_fim: métricas "acumulado.<categoria>.<chave>"."""
+    valores = {
+        f"acumulado.{categoria}.{chave}": valor
+        for categoria, por_chave in resultados.items()
+        for chave, valor in por_chave.items()
+    }
+    registrar_no_historico(_data_do_dia(dia_fim), valores, posto=posto, origem="relatorios_meu_controle")
 
-    # Atualizar planilha Meu Controle
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active
 
-    formula = f"={valor_str}/{dia_fim}*{dias_do_mes}"
-    if chacal:
-        ws_controle[f"{LETRA_PLANILHA}22"] = formula
-    else:
-        ws_controle[f"{LETRA_PLANILHA}44"] = formula
-    wb_controle.save(caminho_meu_controle)
+def executar_relatorios_meu_controle(arquivos, dia_fim, chacal=False, caminho_meu_controle=None, perfil=None,
+                                     modo="formula"):
+    """
+    Processa um lote de categorias a partir de relatórios já exportados.
+
+    arquivos: {categoria: caminho do .xlsx}. Categorias que apontam para o
+    mesmo arquivo compartilham uma única abertura (e o índice de strings).
+    Todas as fórmulas vão para o Meu Controle em uma única gravação (ou são
+    agendadas na sessão ativa). Retorna {categoria: valores extraídos}.
+    perfil (opcional) substitui o posto escolhido por chacal. modo="valor"
+    grava o número projetado em vez da fórmula (ver montar_projecoes).
+    """
+    perfil = perfil or _perfil_padrao(chacal)
+    resultados, formulas = extrair_relatorios_posto(arquivos, dia_fim, perfil, modo=modo)
+    gravar_no_meu_controle(formulas, caminho_meu_controle)
+    registrar_acumulados_no_historico(resultados, dia_fim, perfil["nome"])
+    return resultados
 
-    # Remover tmp.xlsx
-    os.remove(caminho_tmp)
-    print(f"[Limpeza] Arquivo temporário removido: {caminho_tmp}")
-    
-    
-def relatorio_isqueiro_tmp(dia_fim: int, chacal=False):
+
+def _processar_relatorio_tmp(categoria, dia_fim, chacal=False):
     """
-    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na célula G39.
-    A fórmula será: =valor/dia_fim*30
+    Processa o tmp.xlsx recém-exportado de uma categoria e o remove.
+    Dentro de coleta_relatorios_postos() o arquivo é só guardado para a coleta.
     """
     load_dotenv()
 
@@ -539,63 +782,13 @@ def relatorio_isqueiro_tmp(dia_fim: int, chacal=False):
     caminho_tmp = Path.home() / "Desktop" / "tmp.xlsx"
     caminho_meu_controle = os.getenv("CAMINHO_MEU_CONTROLE")
 
-    # Extrair valor da planilha temporária
-    valor = buscar_isqueiro(caminho_tmp, chacal=chacal)
-
-    # Formatar valor com vírgula decimal (para Excel em português)
-    valor_str = f"{valor}"  # mantém ponto decimal (ex: "9991.68")
-
-    # Atualizar planilha Meu Controle
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active
+    # Na etapa 8 a leitura fica para o fim, com os dois postos em paralelo
+    from utils.postos import adiar_relatorio_tmp  # import local: utils.postos importa este módulo
+    if adiar_relatorio_tmp(categoria, caminho_tmp, dia_fim, chacal):
+        return
 
-    formula = f"={valor_str}/{dia_fim}*{dias_do_mes}"
-    if chacal:
-        ws_controle[f"{LETRA_PLANILHA}21"] = formula
-    else:
-        ws_controle[f"{LETRA_PLANILHA}43"] = formula
-    wb_controle.save(caminho_meu_controle)
+    executar_relatorios_meu_controle({categoria: caminho_tmp}, dia_fim, chacal, caminho_meu_controle)
 
     # Remover tmp.xlsx
     os.remove(caminho_tmp)
     print(f"[Limpeza] Arquivo temporário removido: {caminho_tmp}")
-
-
-def buscar_isqueiro(caminho_tmp, chacal=False):
-                
-    if chacal:
-        nomes_procurados = [
-            "ISQUEIRO CLIPPER MINI SPECIAL",						
-            "ISQUEIRO BIC MINI",		
-            "ISQUEIRO BIC MAXXI",						
-            "ISQUEIRO BIC MAXXI TREND MUSIC"
-        ]
-    else:		
-        nomes_procurados = [
-            "ISQUEIRO BIC MINI",
-            "ISQUEIRO BIC MAXXI",
-            "ISQUEIRO CRICKET MINI",
-            "ISQUEIRO CLIPPER MAXI LISO",
-            "ISQUEIRO ZENGAZ EMBORRACHADO GRAND JET CORES"
-        ]
-
-    wb = load_workbook(caminho_tmp, data_only=True)
-    ws = wb.active
-
-    valores = []
-
-    for row in ws.iter_rows(min_row=1):
-        nome = str(row[1].value).strip().upper() if row[1].value else ""
-        if nome in nomes_procurados:
-            valor_celula = row[8].value  # Coluna I = índice 8
-            if isinstance(valor_celula, str):
-                valor_celula = valor_celula.replace(".", "").replace(",", ".")
-            try:
-                valor = float(valor_celula)
-                valores.append(valor)
-            except (TypeError, ValueError):
-                continue
-
-    total = round(sum(valores), 2)
-    print(f"Total de isqueiros vendidos: {total}")
-    return total
\ No newline at end of file
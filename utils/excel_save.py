@@ -0,0 +1,207 @@
+"""
+Gravação Atômica de Workbooks - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com wb.save(caminho).
+O arquivo final é o mesmo que o openpyxl gravaria.
+
+Este módulo adiciona:
+1. Registro do estado das células no carregamento (valores e estilos), e do
+   que fica fora delas (dimensões, validações, propriedades, nomes definidos)
+2. Comparação antes de salvar: nada alterado, nenhuma gravação
+3. Gravação em arquivo temporário no mesmo diretório + os.replace (sem arquivo corrompido)
+4. Contadores de gravações evitadas e bytes gravados, integrados ao utils/metrics.py
+5. Invalidação das entradas do utils/cache.py referentes ao arquivo gravado
+"""
+
+import os
+import stat
+import time
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from openpyxl import load_workbook
+from openpyxl.xml.functions import tostring
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric, record_save_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+# Import do sistema de cache (se disponível)
+try:
+    from utils.cache import invalidate_cache_on_save
+    CACHE_AVAILABLE = True
+except ImportError:
+    CACHE_AVAILABLE = False
+
+
+# Atributo usado para guardar o estado carregado no próprio workbook
+_ATRIBUTO_ESTADO = "_oceanic_estado_carregado"
+
+_stats_lock = threading.Lock()
+_save_stats = {
+    "gravacoes": 0,
+    "gravacoes_evitadas": 0,
+    "bytes_gravados": 0,
+}
+
+
+# ============================================================================
+# ESTADO DAS CÉLULAS
+# ============================================================================
+
+def _xml(parte) -> Optional[bytes]:
+    """XML de uma parte do openpyxl (propriedades, validações...), para comparação."""
+    return tostring(parte.to_tree()) if parte is not None else None
+
+
+def _estado_da_aba(ws) -> Dict[Any, Any]:
+    estado = {
+        coord: (cell.value, tuple(cell._style) if cell.has_style else None)
+        for coord, cell in ws._cells.items()
+        if cell.value is not None or cell.has_style
+    }
+    estado["__mescladas__"] = tuple(sorted(str(r) for r in ws.merged_cells.ranges))
+    # O que não está nas células: cada item alterado conta como uma alteração
+    estado["__colunas__"] = tuple(sorted((k, tuple(sorted(dict(d).items()))) for k, d in ws.column_dimensions.items()))
+    estado["__linhas__"] = tuple(sorted((k, tuple(sorted(dict(d).items()))) for k, d in ws.row_dimensions.items()))
+    estado["__validacoes__"] = _xml(ws.data_validations)
+    estado["__formatacao_condicional__"] = tuple(
+        (str(cf.sqref), tuple(_xml(regra) for regra in cf.rules)) for cf in ws.conditional_formatting
+    )
+    estado["__propriedades__"] = tuple(_xml(parte) for parte in (
+        ws.sheet_properties, ws.sheet_format, ws.views, ws.protection,
+        ws.page_setup, ws.print_options, ws.page_margins, ws.auto_filter,
+    )) + (ws.sheet_state, ws.print_title_rows, ws.print_title_cols, str(ws.print_area))
+    estado["__nomes__"] = tuple(sorted((n, _xml(d)) for n, d in ws.defined_names.items()))
+    return estado
+
+
+def _estado_do_workbook(wb) -> Dict[str, Dict[Any, Any]]:
+    estado = {ws.title: _estado_da_aba(ws) for ws in wb.worksheets}
+    # Pseudoaba com o que é do workbook (nomes definidos e aba ativa)
+    estado["__workbook__"] = {
+        "__nomes__": tuple(sorted((n, _xml(d)) for n, d in wb.defined_names.items())),
+        "__aba_ativa__": wb.active.title if wb.active is not None else None,
+    }
+    return estado
+
+
+def registrar_estado(wb) -> None:
+    """Guarda o estado atual das células como referência para a próxima gravação."""
+    setattr(wb, _ATRIBUTO_ESTADO, _estado_do_workbook(wb))
+
+
+def carregar_workbook(caminho: Union[str, Path], **kwargs):
+    """load_workbook que já registra o estado para gravação com salvar_atomico()."""
+    wb = load_workbook(caminho, **kwargs)
+    registrar_estado(wb)
+    return wb
+
+
+def contar_alteracoes(wb) -> Optional[int]:
+    """
+    Quantidade de células (valor ou estilo) diferentes do estado registrado,
+    mais um por item alterado fora das células (mesclagens, larguras de
+    coluna, alturas de linha, validações, propriedades da aba, nomes definidos).
+    Retorna None se o workbook não tiver estado registrado.
+    """
+    anterior = getattr(wb, _ATRIBUTO_ESTADO, None)
+    if anterior is None:
+        return None
+
+    atual = _estado_do_workbook(wb)
+    if list(atual) != list(anterior):
+        return max(1, len(set(atual) ^ set(anterior)))
+
+    alteracoes = 0
+    for titulo, celulas in atual.items():
+        celulas_antes = anterior[titulo]
+        if celulas == celulas_antes:
+            continue
+        for coord in set(celulas) | set(celulas_antes):
+            if celulas.get(coord) != celulas_antes.get(coord):
+                alteracoes += 1
+    return alteracoes
+
+
+# ============================================================================
+# GRAVAÇÃO
+# ============================================================================
+
+def salvar_atomico(wb, caminho: Union[str, Path], forcar: bool = False) -> bool:
+    """
+    Salva o workbook somente se houver alteração em relação ao estado registrado,
+    gravando em um temporário no mesmo diretório e substituindo com os.replace.
+
+    Workbooks sem estado registrado (carregados direto com load_workbook) são
+    sempre gravados. Retorna True se o arquivo foi gravado.
+    """
+    caminho = Path(caminho)
+    alteracoes = None if forcar else contar_alteracoes(wb)
+
+    if alteracoes == 0 and caminho.exists():
+        with _stats_lock:
+            _save_stats["gravacoes_evitadas"] += 1
+        if METRICS_AVAILABLE:
+            record_save_metric(skipped=True)
+        if LOGGING_AVAILABLE:
+            log_operacao("salvar_atomico", "IGNORADO", {"arquivo": str(caminho), "motivo": "sem alterações"})
+        return False
+
+    start_time = time.time()
+    fd, temporario = tempfile.mkstemp(prefix=f".{caminho.stem}_", suffix=caminho.suffix, dir=caminho.parent)
+    os.close(fd)
+    try:
+        wb.save(temporario)
+        if caminho.exists():
+            os.chmod(temporario, stat.S_IMODE(os.stat(caminho).st_mode))
+        bytes_gravados = os.path.getsize(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    registrar_estado(wb)
+    if CACHE_AVAILABLE:
+        invalidate_cache_on_save(caminho)
+    duration_ms = (time.time() - start_time) * 1000
+
+    with _stats_lock:
+        _save_stats["gravacoes"] += 1
+        _save_stats["bytes_gravados"] += bytes_gravados
+
+    if METRICS_AVAILABLE:
+        record_save_metric(bytes_written=bytes_gravados)
+        record_operation_metric("workbook_save", duration_ms, {
+            "arquivo": str(caminho),
+            "bytes": bytes_gravados,
+            "celulas_alteradas": alteracoes
+        })
+    if LOGGING_AVAILABLE:
+        log_operacao("salvar_atomico", "SUCESSO", {
+            "arquivo": str(caminho),
+            "bytes": bytes_gravados,
+            "celulas_alteradas": alteracoes,
+            "duration_ms": duration_ms
+        })
+
+    return True
+
+
+def get_save_stats() -> Dict[str, int]:
+    """Gravações feitas, evitadas e bytes gravados neste processo."""
+    with _stats_lock:
+        return dict(_save_stats)
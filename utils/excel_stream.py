@@ -0,0 +1,476 @@
+"""
+Leitura em Streaming de Planilhas - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as leituras existentes.
+Os valores retornados são os mesmos de load_workbook(..., data_only=True).
+
+Este módulo adiciona:
+1. Leitura incremental (iterparse) do XML da planilha, sem montar o modelo do openpyxl
+2. Busca por rótulo com parada antecipada na primeira ocorrência
+3. Resolução preguiçosa de shared strings e das abas do arquivo
+4. Base reutilizável para os extratores dos relatórios tmp.xlsx
+5. Leitura de células específicas de várias abas (planilhas de projeção)
+"""
+
+import re
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# ============================================================================
+# CONSTANTES DO FORMATO XLSX
+# ============================================================================
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_TAG_ROW = f"{{{NS_MAIN}}}row"
+_TAG_C = f"{{{NS_MAIN}}}c"
+_TAG_V = f"{{{NS_MAIN}}}v"
+_TAG_IS = f"{{{NS_MAIN}}}is"
+_TAG_T = f"{{{NS_MAIN}}}t"
+_TAG_SI = f"{{{NS_MAIN}}}si"
+
+_RE_COORD = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+# ============================================================================
+# LEITOR EM STREAMING
+# ============================================================================
+
+class LeitorStreaming:
+    """
+    Abre um .xlsx como zip e percorre as células de uma aba em streaming.
+    Use como context manager para garantir que o arquivo seja fechado
+    (importante no Windows, onde o tmp.xlsx é removido logo após a leitura).
+    """
+
+    def __init__(self, caminho: Union[str, Path]):
+        self.caminho = Path(caminho)
+        self._zip = zipfile.ZipFile(self.caminho)
+        self._shared_strings: Optional[List[str]] = None
+        self._abas: Optional[List[Tuple[str, str]]] = None
+        self._aba_ativa = 0
+
+    def __enter__(self) -> "LeitorStreaming":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    # ------------------------------------------------------------------
+    # Estrutura do arquivo
+    # ------------------------------------------------------------------
+
+    def _carregar_abas(self) -> List[Tuple[str, str]]:
+        """Lista (nome da aba, caminho da parte XML) na ordem do workbook."""
+        if self._abas is not None:
+            return self._abas
+
+        rels = ET.fromstring(self._zip.read("xl/_rels/workbook.xml.rels"))
+        destinos = {}
+        for rel in rels.iter(f"{{{NS_PKG_REL}}}Relationship"):
+            alvo = rel.get("Target", "")
+            if alvo.startswith("/"):
+                alvo = alvo.lstrip("/")
+            else:
+                alvo = posixpath.normpath(posixpath.join("xl", alvo))
+            destinos[rel.get("Id")] = alvo
+
+        workbook = ET.fromstring(self._zip.read("xl/workbook.xml"))
+        view = workbook.find(f"{{{NS_MAIN}}}bookViews/{{{NS_MAIN}}}workbookView")
+        if view is not None:
+            self._aba_ativa = int(view.get("activeTab", 0))
+
+        self._abas = [
+            (sheet.get("name"), destinos[sheet.get(f"{{{NS_REL}}}id")])
+            for sheet in workbook.iter(f"{{{NS_MAIN}}}sheet")
+        ]
+        return self._abas
+
+    @property
+    def nomes_abas(self) -> List[str]:
+        return [nome for nome, _ in self._carregar_abas()]
+
+    def parte_da_aba(self, nome_aba: Optional[str]) -> str:
+        """Caminho da parte XML da aba no pacote (None = aba ativa), ex.: "xl/worksheets/sheet2.xml"."""
+        abas = self._carregar_abas()
+        if nome_aba is None:
+            indice = self._aba_ativa if self._aba_ativa < len(abas) else 0
+            return abas[indice][1]
+        for nome, parte in abas:
+            if nome == nome_aba:
+                return parte
+        raise KeyError(f"Aba '{nome_aba}' não encontrada em {self.caminho.name}.")
+
+    def ler_parte(self, parte: str) -> bytes:
+        """Conteúdo bruto de uma parte do pacote (ex.: o XML de uma aba)."""
+        return self._zip.read(parte)
+
+    def _carregar_shared_strings(self) -> List[str]:
+        if self._shared_strings is not None:
+            return self._shared_strings
+
+        self._shared_strings = []
+        try:
+            arquivo = self._zip.open("xl/sharedStrings.xml")
+        except KeyError:
+            return self._shared_strings
+
+        with arquivo:
+            for _, elem in ET.iterparse(arquivo):
+                if elem.tag == _TAG_SI:
+                    self._shared_strings.append("".join(t.text or "" for t in elem.iter(_TAG_T)))
+                    elem.clear()
+        return self._shared_strings
+
+    # ------------------------------------------------------------------
+    # Valores das células
+    # ------------------------------------------------------------------
+
+    def _valor_da_celula(self, elem: ET.Element) -> Any:
+        tipo = elem.get("t", "n")
+
+        if tipo == "inlineStr":
+            bloco = elem.find(_TAG_IS)
+            return "".join(t.text or "" for t in bloco.iter(_TAG_T)) if bloco is not None else None
+
+        v = elem.find(_TAG_V)
+        if v is None or v.text is None:
+            return None
+        texto = v.text
+
+        if tipo == "s":
+            return self._carregar_shared_strings()[int(texto)]
+        if tipo in ("str", "e"):
+            return texto
+        if tipo == "b":
+            return texto == "1"
+        try:
+            if "." in texto or "E" in texto or "e" in texto:
+                return float(texto)
+            return int(texto)
+        except ValueError:
+            return texto
+
+    def iterar_celulas(self, nome_aba: Optional[str] = None,
+                       colunas: Optional[set] = None,
+                       max_linha: Optional[int] = None) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Gera (linha, coluna, valor) das células preenchidas da aba, em ordem.
+        Apenas as colunas pedidas têm o valor resolvido; a leitura para ao
+        passar de max_linha.
+        """
+        parte = self.parte_da_aba(nome_aba)
+
+        with self._zip.open(parte) as arquivo:
+            linha_atual = 0
+            coluna_atual = 0
+
+            for evento, elem in ET.iterparse(arquivo, events=("start", "end")):
+                if evento == "start":
+                    if elem.tag == _TAG_ROW:
+                        r = elem.get("r")
+                        linha_atual = int(r) if r else linha_atual + 1
+                        coluna_atual = 0
+                        if max_linha is not None and linha_atual > max_linha:
+                            return
+                    continue
+
+                if elem.tag == _TAG_C:
+                    coordenada = elem.get("r")
+                    if coordenada:
+                        m = _RE_COORD.match(coordenada)
+                        coluna_atual = column_index_from_string(m.group(1))
+                    else:
+                        coluna_atual += 1
+
+                    if colunas is None or coluna_atual in colunas:
+                        valor = self._valor_da_celula(elem)
+                        if valor is not None:
+                            yield linha_atual, coluna_atual, valor
+                    elem.clear()
+                elif elem.tag == _TAG_ROW:
+                    elem.clear()
+
+    def localizar_valor_por_rotulo(self, texto: str, coluna_valor: Union[str, int],
+                                   coluna_rotulo: Union[str, int] = "A",
+                                   nome_aba: Optional[str] = None) -> Optional[Tuple[int, Any]]:
+        """
+        Procura a primeira célula da coluna de rótulo que contém `texto` e
+        retorna (linha, valor da coluna_valor na mesma linha). Para de ler
+        assim que a linha encontrada termina. Retorna None se não encontrar.
+        """
+        col_rotulo = _indice_coluna(coluna_rotulo)
+        col_valor = _indice_coluna(coluna_valor)
+
+        linha_encontrada = None
+        valor = None
+
+        for linha, coluna, conteudo in self.iterar_celulas(nome_aba, {col_rotulo, col_valor}):
+            if linha_encontrada is not None and linha != linha_encontrada:
+                break
+            if linha_encontrada is None:
+                if coluna == col_rotulo and isinstance(conteudo, str) and texto in conteudo:
+                    linha_encontrada = linha
+                    if col_valor < col_rotulo:
+                        # A célula de valor vem antes no XML; relê só essa linha
+                        valor = self.ler_celula(linha, col_valor, nome_aba)
+                        break
+                continue
+            if coluna == col_valor:
+                valor = conteudo
+                break
+
+        if linha_encontrada is None:
+            return None
+        return linha_encontrada, valor
+
+    def indexar_rotulos(self, rotulos: Iterable[str], coluna_valor: Union[str, int],
+                        colunas_rotulo: Optional[Iterable[Union[str, int]]] = None,
+                        nome_aba: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Monta, em uma única passada, o mapa rótulo -> valor da coluna_valor
+        na linha do rótulo. Apenas células de texto das colunas de rótulo são
+        comparadas (após strip/upper) e a leitura para assim que todos os
+        rótulos pedidos forem encontrados. Vale a primeira ocorrência de cada
+        rótulo; rótulos ausentes ficam com None.
+        """
+        procurados = {_normalizar_rotulo(r): r for r in rotulos}
+        resultado: Dict[str, Any] = {r: None for r in procurados.values()}
+        col_valor = _indice_coluna(coluna_valor)
+
+        cols_rotulo = None
+        colunas = None
+        if colunas_rotulo is not None:
+            cols_rotulo = {_indice_coluna(c) for c in colunas_rotulo}
+            colunas = cols_rotulo | {col_valor}
+
+        pendentes = dict(procurados)
+        linha_atual = None
+        rotulos_da_linha: List[str] = []
+        valor_da_linha = None
+
+        def registrar_linha() -> None:
+            for chave in rotulos_da_linha:
+                if chave in pendentes:
+                    resultado[pendentes.pop(chave)] = valor_da_linha
+
+        for linha, coluna, conteudo in self.iterar_celulas(nome_aba, colunas):
+            if linha != linha_atual:
+                registrar_linha()
+                if not pendentes:
+                    break
+                linha_atual = linha
+                rotulos_da_linha = []
+                valor_da_linha = None
+
+            if coluna == col_valor:
+                valor_da_linha = conteudo
+            if isinstance(conteudo, str) and (cols_rotulo is None or coluna in cols_rotulo):
+                chave = _normalizar_rotulo(conteudo)
+                if chave in pendentes:
+                    rotulos_da_linha.append(chave)
+        else:
+            registrar_linha()
+
+        return resultado
+
+    def ler_colunas(self, colunas: Iterable[Union[str, int]],
+                    nome_aba: Optional[str] = None) -> Dict[Union[str, int], List[Any]]:
+        """
+        Lê apenas as colunas pedidas, alinhadas por linha: {coluna: [valores]}.
+        Linhas sem nenhum valor nessas colunas são omitidas.
+        """
+        indices = {_indice_coluna(c): c for c in colunas}
+        dados: Dict[Union[str, int], List[Any]] = {c: [] for c in indices.values()}
+        ultima_linha = None
+
+        for linha, coluna, valor in self.iterar_celulas(nome_aba, set(indices)):
+            if linha != ultima_linha:
+                for lista in dados.values():
+                    lista.append(None)
+                ultima_linha = linha
+            dados[indices[coluna]][-1] = valor
+
+        return dados
+
+    def ler_celulas(self, coordenadas: Iterable[str],
+                    nome_aba: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lê várias células ("I14", "I20", ...) de uma aba em uma única passada,
+        parando na maior linha pedida. Células vazias retornam None.
+        """
+        alvos = {}
+        for coord in coordenadas:
+            m = _RE_COORD.match(coord.upper().replace("$", ""))
+            if not m:
+                raise ValueError(f"Coordenada inválida: {coord}")
+            alvos[(int(m.group(2)), column_index_from_string(m.group(1)))] = coord
+
+        resultado: Dict[str, Any] = {coord: None for coord in alvos.values()}
+        if not alvos:
+            return resultado
+
+        colunas = {col for _, col in alvos}
+        max_linha = max(linha for linha, _ in alvos)
+        faltam = len(alvos)
+
+        for linha, coluna, valor in self.iterar_celulas(nome_aba, colunas, max_linha=max_linha):
+            coord = alvos.get((linha, coluna))
+            if coord is not None:
+                resultado[coord] = valor
+                faltam -= 1
+                if not faltam:
+                    break
+
+        return resultado
+
+    def somar_por_nome(self, nomes: Iterable[str], coluna_nome: Union[str, int],
+                       coluna_valor: Union[str, int], nome_aba: Optional[str] = None) -> float:
+        """
+        Soma a coluna de valores das linhas cujo nome (strip/upper) está em `nomes`.
+        Lê só as duas colunas e faz normalização, conversão de números no formato
+        brasileiro ("1.234,56") e filtro com operações de coluna do pandas.
+        """
+        dados = self.ler_colunas([coluna_nome, coluna_valor], nome_aba)
+
+        nomes_coluna = pd.Series(dados[coluna_nome], dtype=object)
+        valores = pd.Series(dados[coluna_valor], dtype=object)
+
+        nomes_norm = nomes_coluna.fillna("").astype(str).str.strip().str.upper()
+        mascara = nomes_norm.isin({_normalizar_rotulo(n) for n in nomes})
+
+        eh_texto = valores.map(type).eq(str)
+        numeros = pd.to_numeric(valores.where(~eh_texto), errors="coerce").astype(float)
+        if eh_texto.any():
+            textos = (
+                valores[eh_texto]
+                .str.replace(".", "", regex=False)
+                .str.replace(",", ".", regex=False)
+            )
+            numeros[eh_texto] = pd.to_numeric(textos, errors="coerce")
+
+        return float(numeros[mascara].sum())
+
+    def ler_celula(self, linha: int, coluna: Union[str, int],
+                   nome_aba: Optional[str] = None) -> Any:
+        """Lê uma única célula, parando assim que a linha é ultrapassada."""
+        col = _indice_coluna(coluna)
+        for l, c, valor in self.iterar_celulas(nome_aba, {col}, max_linha=linha):
+            if l == linha and c == col:
+                return valor
+        return None
+
+
+# ============================================================================
+# FUNÇÕES DE CONVENIÊNCIA
+# ============================================================================
+
+def _indice_coluna(coluna: Union[str, int]) -> int:
+    return coluna if isinstance(coluna, int) else column_index_from_string(coluna.upper())
+
+
+def _normalizar_rotulo(texto: Any) -> str:
+    return str(texto).strip().upper()
+
+
+def localizar_valor_por_rotulo(caminho: Union[str, Path], texto: str,
+                               coluna_valor: Union[str, int],
+                               coluna_rotulo: Union[str, int] = "A",
+                               nome_aba: Optional[str] = None) -> Optional[Tuple[int, Any]]:
+    """
+    Versão em streaming da busca "rótulo na coluna A -> valor na mesma linha".
+    Retorna (linha, valor) ou None quando o rótulo não existe.
+    """
+    with LeitorStreaming(caminho) as leitor:
+        resultado = leitor.localizar_valor_por_rotulo(texto, coluna_valor, coluna_rotulo, nome_aba)
+
+    if LOGGING_AVAILABLE:
+        log_operacao("stream_localizar_rotulo", "SUCESSO" if resultado else "NAO_ENCONTRADO", {
+            "arquivo": str(caminho),
+            "rotulo": texto,
+            "linha": resultado[0] if resultado else None
+        })
+
+    return resultado
+
+
+def indexar_rotulos(caminho: Union[str, Path], rotulos: Iterable[str],
+                    coluna_valor: Union[str, int],
+                    colunas_rotulo: Optional[Iterable[Union[str, int]]] = None,
+                    nome_aba: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extrai de uma vez os valores de vários rótulos de um relatório tmp.xlsx.
+    Retorna {rótulo: valor ou None}.
+    """
+    with LeitorStreaming(caminho) as leitor:
+        resultado = leitor.indexar_rotulos(rotulos, coluna_valor, colunas_rotulo, nome_aba)
+
+    if LOGGING_AVAILABLE:
+        log_operacao("stream_indexar_rotulos", "SUCESSO", {
+            "arquivo": str(caminho),
+            "encontrados": [r for r, v in resultado.items() if v is not None],
+            "ausentes": [r for r, v in resultado.items() if v is None]
+        })
+
+    return resultado
+
+
+def somar_por_nome(caminho: Union[str, Path], nomes: Iterable[str],
+                   coluna_nome: Union[str, int], coluna_valor: Union[str, int],
+                   nome_aba: Optional[str] = None) -> float:
+    """
+    Soma a coluna de valores das linhas cujo nome (strip/upper) está em `nomes`.
+    Veja LeitorStreaming.somar_por_nome.
+    """
+    with LeitorStreaming(caminho) as leitor:
+        return leitor.somar_por_nome(nomes, coluna_nome, coluna_valor, nome_aba)
+
+
+def coordenada_do_iloc(linha: int, coluna: int) -> str:
+    """
+    Coordenada Excel equivalente a df.iloc[linha, coluna] de um
+    pd.read_excel(..., sheet_name=aba) padrão (cabeçalho na linha 1, a partir de A1).
+    Ex.: iloc[36, 2] -> "C38".
+    """
+    return f"{get_column_letter(coluna + 1)}{linha + 2}"
+
+
+def ler_celulas(caminho: Union[str, Path],
+                celulas_por_aba: Dict[Optional[str], Iterable[str]]) -> Dict[Optional[str], Dict[str, Any]]:
+    """
+    Lê células específicas de uma ou mais abas: {aba: ["C38", "P38"], ...}.
+    Só as abas pedidas são abertas e cada uma é lida até a maior linha pedida.
+    Retorna {aba: {coordenada: valor ou None}}.
+    """
+    with LeitorStreaming(caminho) as leitor:
+        resultado = {
+            nome_aba: leitor.ler_celulas(coordenadas, nome_aba)
+            for nome_aba, coordenadas in celulas_por_aba.items()
+        }
+
+    if LOGGING_AVAILABLE:
+        log_operacao("stream_ler_celulas", "SUCESSO", {
+            "arquivo": str(caminho),
+            "abas": [str(aba) for aba in resultado],
+            "celulas": sum(len(celulas) for celulas in resultado.values())
+        })
+
+    return resultado
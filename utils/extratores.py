@@ -1,21 +1,16 @@
 import os
 import time
 import pyautogui
-import win32com.client as win32
 from pathlib import Path
 from dotenv import load_dotenv
 
 from utils.logger import logger
-from utils.file_utils import aguardar_arquivo, corrigir_cache_excel_com
+from utils.file_utils import aguardar_arquivo, preencher_valores_planilha
 from utils.excel_ops import buscar_valor_total_geral
 from interfaces.alerta_visual import mostrar_alerta_visual
 
 
 def salvar_planilha_emsys():
-    from openpyxl import load_workbook
-    from openpyxl.cell import MergedCell
-    import win32com.client as win32
-    
     mostrar_alerta_visual("Salvando planilha EMSys", "Iniciando processo de salvamento...", tipo="info")
     
     time.sleep(4)
@@ -33,31 +28,22 @@ def salvar_planilha_emsys():
     pyautogui.press("enter")
     time.sleep(10)
 
-    mostrar_alerta_visual("Corrigindo cache", "Regenerando cache do Excel...", tipo="dev")
-    corrigir_cache_excel_com()
-    time.sleep(5)
-
     desktop_tmp = os.path.join(os.path.expanduser("~"), "Desktop", "tmp.xlsx")
     mostrar_alerta_visual("Aguardando arquivo", "Verificando tmp.xlsx...", tipo="info")
     aguardar_arquivo(desktop_tmp)
-    
-    mostrar_alerta_visual("Abrindo Excel", "Carregando arquivo via COM...", tipo="dev")
-    excel = win32.gencache.EnsureDispatch("Excel.Application")
-    excel.Visible = False
-    wb = excel.Workbooks.Open(desktop_tmp)
-    time.sleep(10)
-    wb.Save()
-    wb.Close(SaveChanges=True)
-    excel.Quit()
-    
-    logger.info("🔄 Arquivo tmp.xlsx aberto e salvo via Excel COM.")
+
+    mostrar_alerta_visual("Calculando fórmulas", "Preenchendo valores do tmp.xlsx...", tipo="dev")
+    preencher_valores_planilha(desktop_tmp)
+
+    logger.info("🔄 Valores das fórmulas de tmp.xlsx preenchidos.")
     mostrar_alerta_visual("Planilha salva", "tmp.xlsx processado com sucesso", tipo="success")
 
 
 def extrair_food_tmp(chacal=False):
     """
-    Extrai valor do tmp.xlsx e insere fórmula de projeção em Meu Controle na célula G39.
-    A fórmula será: =valor/dia_fim*30
+    Extrai o total geral do tmp.xlsx de Food e devolve como texto (ex: "9991.68").
+    A fórmula de projeção (=valor/dia_fim*dias_do_mes) é montada e gravada em
+    Meu Controle por utils.relatorios.food.
     """
     mostrar_alerta_visual("Extraindo dados Food", "Processando tmp.xlsx...", tipo="info")
     
@@ -58,4 +58,38 @@ def corrigir_cache_excel_com():
     except Exception as e:
         mostrar_alerta_visual("Erro ao corrigir cache", f"Falha: {str(e)}", tipo="error")
         print(f"[ERRO] Falha ao corrigir cache COM do Excel: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+def recalcular_via_excel_com(caminho_arquivo, visivel=False, espera=10):
+    """
+    Abre o arquivo no Excel via COM e salva, para que o próprio Excel grave os
+    valores calculados das fórmulas. Usado apenas quando o avaliador em Python
+    (utils.formulas) não consegue resolver todas as fórmulas.
+    """
+    corrigir_cache_excel_com()
+
+    excel = win32com.client.gencache.EnsureDispatch("Excel.Application")
+    excel.Visible = visivel
+    wb = excel.Workbooks.Open(caminho_arquivo)
+    time.sleep(espera)
+    wb.Save()
+    wb.Close(SaveChanges=True)
+    excel.Quit()
+    print(f"[COM] Arquivo aberto e salvo via Excel: {caminho_arquivo}")
+
+
+def preencher_valores_planilha(caminho_arquivo, visivel=False):
+    """
+    Garante que as fórmulas do arquivo tenham valores legíveis com data_only=True.
+    Calcula em Python e só recorre ao Excel se sobrar fórmula não suportada.
+    """
+    from utils.formulas import preencher_valores_em_cache
+
+    resultado = preencher_valores_em_cache(caminho_arquivo)
+    print(f"[Fórmulas] {resultado['calculadas']} calculada(s), {resultado['pendentes']} pendente(s) em {caminho_arquivo}")
+
+    if resultado["pendentes"]:
+        mostrar_alerta_visual("Abrindo Excel", "Fórmulas não suportadas, recalculando via COM...", tipo="warning")
+        recalcular_via_excel_com(caminho_arquivo, visivel=visivel)
+
+    return resultado
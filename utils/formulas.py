@@ -0,0 +1,480 @@
+"""
+Avaliação de Fórmulas Simples - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as leituras existentes.
+As planilhas continuam sendo lidas com load_workbook(..., data_only=True).
+
+Este módulo adiciona:
+1. Avaliador em Python puro para as fórmulas exportadas pelo EMSys (SUM e aritmética)
+2. Preenchimento dos valores calculados que faltam no tmp.xlsx, sem abrir o Excel
+3. Detecção de fórmulas não suportadas, para que o chamador possa recorrer ao Excel
+4. Grafo de dependências entre células (inclusive de fórmulas não suportadas),
+   para saber quais fórmulas uma alteração ou um vínculo externo afeta
+5. Integração com sistemas de logging e métricas
+"""
+
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries, get_column_letter
+
+from utils.excel_save import salvar_atomico
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+class FormulaNaoSuportada(ValueError):
+    """Fórmula fora do subconjunto avaliado (ou com erro de cálculo)."""
+
+
+# ============================================================================
+# ANALISADOR DE FÓRMULAS
+# ============================================================================
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<func>[A-Za-z_][A-Za-z0-9_.]*)\s*\(
+      | (?P<ref>(?:(?:'(?:[^']|'')+'|(?:\[\d+\])?[A-Za-z_][A-Za-z0-9_.]*)!)?
+               \$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)
+      | (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<str>"(?:[^"]|"")*")
+      | (?P<op>[-+*/^(),;%])
+    )""", re.VERBOSE)
+
+
+def _tokenizar(formula: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    texto = formula.strip()
+    while pos < len(texto):
+        m = _TOKEN.match(texto, pos)
+        if not m or m.end() == pos:
+            if texto[pos:].strip() == "":
+                break
+            raise FormulaNaoSuportada(f"Trecho não suportado em '{formula}': {texto[pos:]!r}")
+        tipo = m.lastgroup
+        tokens.append((tipo, m.group(tipo)))
+        pos = m.end()
+    return tokens
+
+
+def _numero(valor: Any) -> float:
+    """Converte um operando escalar como o Excel faz na aritmética."""
+    if valor is None:
+        return 0.0
+    if isinstance(valor, bool):
+        return 1.0 if valor else 0.0
+    if isinstance(valor, (int, float)):
+        return valor
+    if isinstance(valor, str):
+        try:
+            return float(valor)
+        except ValueError:
+            pass
+    raise FormulaNaoSuportada(f"Operando não numérico: {valor!r}")
+
+
+def _numeros_dos_argumentos(args: List[Any]) -> List[float]:
+    """Números considerados por SUM/MIN/MAX/AVERAGE (textos e vazios de intervalos são ignorados)."""
+    numeros = []
+    for arg in args:
+        if isinstance(arg, list):
+            numeros.extend(v for v in arg if isinstance(v, (int, float)) and not isinstance(v, bool))
+        else:
+            numeros.append(_numero(arg))
+    return numeros
+
+
+def _media(args: List[Any]) -> float:
+    numeros = _numeros_dos_argumentos(args)
+    if not numeros:
+        raise FormulaNaoSuportada("AVERAGE sem valores numéricos")
+    return sum(numeros) / len(numeros)
+
+
+def _subtotal(args: List[Any]) -> float:
+    if not args:
+        raise FormulaNaoSuportada("SUBTOTAL sem argumentos")
+    codigo = int(_numero(args[0])) % 100
+    if codigo not in _SUBTOTAL:
+        raise FormulaNaoSuportada(f"SUBTOTAL({codigo}) não suportado")
+    return FUNCOES[_SUBTOTAL[codigo]](args[1:])
+
+
+def _arredondar(args: List[Any]) -> float:
+    casas = int(_numero(args[1])) if len(args) > 1 else 0
+    valor = _numero(args[0])
+    fator = 10 ** casas
+    # Excel arredonda metades para longe do zero
+    return (int(abs(valor) * fator + 0.5) / fator) * (1 if valor >= 0 else -1)
+
+
+FUNCOES: Dict[str, Callable[[List[Any]], float]] = {
+    "SUM": lambda args: sum(_numeros_dos_argumentos(args)),
+    "MIN": lambda args: min(_numeros_dos_argumentos(args), default=0),
+    "MAX": lambda args: max(_numeros_dos_argumentos(args), default=0),
+    "AVERAGE": _media,
+    "ABS": lambda args: abs(_numero(args[0])),
+    "ROUND": _arredondar,
+    "SUBTOTAL": _subtotal,
+}
+
+_SUBTOTAL = {1: "AVERAGE", 4: "MAX", 5: "MIN", 9: "SUM"}
+
+
+class _Parser:
+    """Analisador descendente recursivo: + - * / ^ %, parênteses, referências e FUNCOES."""
+
+    def __init__(self, formula: str, resolver: Callable[[str, bool], Any]):
+        self.formula = formula
+        self.tokens = _tokenizar(formula[1:] if formula.startswith("=") else formula)
+        self.pos = 0
+        self.resolver = resolver
+
+    def _atual(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _consumir_op(self, *ops: str) -> Optional[str]:
+        token = self._atual()
+        if token and token[0] == "op" and token[1] in ops:
+            self.pos += 1
+            return token[1]
+        return None
+
+    def avaliar(self) -> Any:
+        valor = self._expressao()
+        if self._atual() is not None:
+            raise FormulaNaoSuportada(f"Sobrou trecho em '{self.formula}'")
+        if isinstance(valor, list):
+            raise FormulaNaoSuportada(f"Intervalo usado como valor em '{self.formula}'")
+        return valor
+
+    def _expressao(self) -> Any:
+        valor = self._termo()
+        while True:
+            op = self._consumir_op("+", "-")
+            if op is None:
+                return valor
+            direita = self._termo()
+            valor = _numero(valor) + _numero(direita) if op == "+" else _numero(valor) - _numero(direita)
+
+    def _termo(self) -> Any:
+        valor = self._potencia()
+        while True:
+            op = self._consumir_op("*", "/")
+            if op is None:
+                return valor
+            direita = _numero(self._potencia())
+            if op == "*":
+                valor = _numero(valor) * direita
+            else:
+                if direita == 0:
+                    raise FormulaNaoSuportada("#DIV/0!")
+                valor = _numero(valor) / direita
+
+    def _potencia(self) -> Any:
+        valor = self._unario()
+        while self._consumir_op("^"):
+            valor = _numero(valor) ** _numero(self._unario())
+        return valor
+
+    def _unario(self) -> Any:
+        op = self._consumir_op("+", "-")
+        if op == "-":
+            return -_numero(self._unario())
+        if op == "+":
+            return _numero(self._unario())
+        valor = self._primario()
+        while self._consumir_op("%"):
+            valor = _numero(valor) / 100
+        return valor
+
+    def _primario(self) -> Any:
+        token = self._atual()
+        if token is None:
+            raise FormulaNaoSuportada(f"Fórmula incompleta: '{self.formula}'")
+        tipo, texto = token
+        self.pos += 1
+
+        if tipo == "num":
+            return float(texto) if any(c in texto for c in ".eE") else int(texto)
+        if tipo == "str":
+            return texto[1:-1].replace('""', '"')
+        if tipo == "ref":
+            return self.resolver(texto, ":" in texto)
+        if tipo == "func":
+            return self._funcao(texto)
+        if tipo == "op" and texto == "(":
+            valor = self._expressao()
+            if not self._consumir_op(")"):
+                raise FormulaNaoSuportada(f"Parêntese não fechado em '{self.formula}'")
+            return valor
+        raise FormulaNaoSuportada(f"Token inesperado {texto!r} em '{self.formula}'")
+
+    def _funcao(self, nome: str) -> Any:
+        nome = nome.upper().replace("_XLFN.", "")
+        if nome not in FUNCOES:
+            raise FormulaNaoSuportada(f"Função {nome} não suportada")
+
+        args = []
+        if not self._consumir_op(")"):
+            while True:
+                args.append(self._expressao())
+                if self._consumir_op(")"):
+                    break
+                if not self._consumir_op(",", ";"):
+                    raise FormulaNaoSuportada(f"Argumentos inválidos em {nome}")
+        return FUNCOES[nome](args)
+
+
+# ============================================================================
+# AVALIADOR DE WORKBOOK
+# ============================================================================
+
+_RE_ABA_EXTERNA = re.compile(r"^\[(\d+)\](.+)$")
+
+# Referências em qualquer fórmula, suportada ou não (textos entre aspas removidos antes)
+_RE_TEXTO = re.compile(r'"(?:[^"]|"")*"')
+_RE_REFERENCIA = re.compile(r"""
+    (?<![A-Za-z0-9_.!$\]'])
+    (?:(?P<aba>'(?:[^']|'')+'|(?:\[\d+\])?[A-Za-z_][A-Za-z0-9_.]*)!)?
+    (?P<coord>\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)
+    (?![A-Za-z0-9_(])""", re.VERBOSE)
+
+
+def _referencias(formula: str, aba_atual: str) -> List[Tuple[str, Tuple[int, int, int, int]]]:
+    """[(aba, (min_col, min_row, max_col, max_row))] citadas na fórmula, sem avaliá-la."""
+    referencias = []
+    for m in _RE_REFERENCIA.finditer(_RE_TEXTO.sub('""', formula)):
+        aba = m.group("aba") or aba_atual
+        if aba.startswith("'"):
+            aba = aba[1:-1].replace("''", "'")
+        try:
+            limites = range_boundaries(m.group("coord").replace("$", "").upper())
+        except ValueError:
+            continue
+        referencias.append((aba, limites))
+    return referencias
+
+
+class AvaliadorFormulas:
+    """
+    Calcula valores de fórmulas de um workbook usando os valores em cache
+    quando existem e avaliando (recursivamente) as fórmulas que não têm.
+
+    Com recalcular=True todas as fórmulas são reavaliadas; o valor em cache só
+    é usado quando a fórmula não é suportada (a célula fica em nao_recalculadas).
+    valores_externos resolve referências a vínculos externos ("[1]Dia 19!D31"):
+    {índice do vínculo: {aba: {coordenada: valor}}}.
+    dependentes() usa as referências do texto das fórmulas, então também
+    enxerga as que o avaliador não suporta (IF, PROCV...).
+    """
+
+    def __init__(self, wb_formulas, wb_valores, recalcular: bool = False,
+                 valores_externos: Optional[Dict[int, Dict[str, Dict[str, Any]]]] = None):
+        self.wb_formulas = wb_formulas
+        self.wb_valores = wb_valores
+        self.recalcular = recalcular
+        self.valores_externos = valores_externos or {}
+        self.nao_recalculadas: set = set()
+        self._memo: Dict[Tuple[str, str], Any] = {}
+        self._em_calculo: set = set()
+        self._grafo: Optional[Tuple[Dict, Dict, Set]] = None
+
+    def _separar_aba(self, ref: str, aba_atual: str) -> Tuple[str, str]:
+        if "!" in ref:
+            aba, coord = ref.rsplit("!", 1)
+            if aba.startswith("'"):
+                aba = aba[1:-1].replace("''", "'")
+            if _RE_ABA_EXTERNA.match(aba):
+                return aba, coord.replace("$", "").upper()
+            if aba not in self.wb_formulas.sheetnames:
+                raise FormulaNaoSuportada(f"Referência a aba inexistente/externa: {ref}")
+            return aba, coord.replace("$", "").upper()
+        return aba_atual, ref.replace("$", "").upper()
+
+    def _valor_externo(self, aba: str, coord: str) -> Any:
+        m = _RE_ABA_EXTERNA.match(aba)
+        indice, nome_aba = int(m.group(1)), m.group(2)
+        celulas = self.valores_externos.get(indice, {}).get(nome_aba)
+        if celulas is None or coord not in celulas:
+            raise FormulaNaoSuportada(f"Vínculo externo não resolvido: {aba}!{coord}")
+        return celulas[coord]
+
+    def valor(self, aba: str, coord: str) -> Any:
+        """Valor de uma célula: literal, cache do Excel ou fórmula avaliada."""
+        if aba.startswith("["):
+            return self._valor_externo(aba, coord)
+
+        chave = (aba, coord)
+        if chave in self._memo:
+            return self._memo[chave]
+        if chave in self._em_calculo:
+            raise FormulaNaoSuportada(f"Referência circular em {aba}!{coord}")
+
+        conteudo = self.wb_formulas[aba][coord].value
+        if isinstance(conteudo, str) and conteudo.startswith("="):
+            cache = self.wb_valores[aba][coord].value
+            if cache is not None and not self.recalcular:
+                resultado = cache
+            else:
+                self._em_calculo.add(chave)
+                try:
+                    resultado = self.avaliar(conteudo, aba)
+                except FormulaNaoSuportada:
+                    if not self.recalcular or cache is None:
+                        raise
+                    self.nao_recalculadas.add(chave)
+                    resultado = cache
+                finally:
+                    self._em_calculo.discard(chave)
+        elif conteudo is not None and not isinstance(conteudo, (int, float, str, bool)):
+            raise FormulaNaoSuportada(f"Conteúdo não suportado em {aba}!{coord}")
+        else:
+            resultado = conteudo
+
+        self._memo[chave] = resultado
+        return resultado
+
+    def avaliar(self, formula: str, aba: str) -> Any:
+        """Avalia uma fórmula no contexto de uma aba."""
+        def resolver(ref: str, intervalo: bool) -> Any:
+            nome_aba, coord = self._separar_aba(ref, aba)
+            if not intervalo:
+                return self.valor(nome_aba, coord)
+            min_col, min_row, max_col, max_row = range_boundaries(coord)
+            return [
+                self.valor(nome_aba, f"{get_column_letter(col)}{row}")
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+            ]
+
+        return _Parser(formula, resolver).avaliar()
+
+    def _montar_grafo(self) -> Tuple[Dict, Dict, Set]:
+        """
+        Índice inverso das referências: célula -> fórmulas que a citam,
+        intervalos por aba e o conjunto de fórmulas que citam vínculos externos.
+        """
+        if self._grafo is None:
+            usado_por: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}
+            intervalos: Dict[str, List[Tuple[Tuple[int, int, int, int], Tuple[str, str]]]] = {}
+            externas: Set[Tuple[str, str]] = set()
+            for ws in self.wb_formulas.worksheets:
+                for row in ws.iter_rows():
+                    for cell in row:
+                        if not (isinstance(cell.value, str) and cell.value.startswith("=")):
+                            continue
+                        chave = (ws.title, cell.coordinate)
+                        for aba, (min_col, min_row, max_col, max_row) in _referencias(cell.value, ws.title):
+                            if _RE_ABA_EXTERNA.match(aba):
+                                externas.add(chave)
+                            elif (min_col, min_row) == (max_col, max_row):
+                                coord = f"{get_column_letter(min_col)}{min_row}"
+                                usado_por.setdefault((aba, coord), set()).add(chave)
+                            else:
+                                intervalos.setdefault(aba, []).append(((min_col, min_row, max_col, max_row), chave))
+            self._grafo = (usado_por, intervalos, externas)
+        return self._grafo
+
+    def dependentes(self, celulas: Iterable[Tuple[str, str]] = (),
+                    vinculos_externos: bool = False) -> Set[Tuple[str, str]]:
+        """
+        Fórmulas {(aba, coordenada)} que dependem, direta ou indiretamente, das
+        células informadas e, com vinculos_externos=True, de algum vínculo externo.
+        """
+        usado_por, intervalos, externas = self._montar_grafo()
+        resultado: Set[Tuple[str, str]] = set(externas) if vinculos_externos else set()
+        fila = deque(resultado)
+        fila.extend((aba, coord.replace("$", "").upper()) for aba, coord in celulas)
+
+        while fila:
+            aba, coord = fila.popleft()
+            candidatos = set(usado_por.get((aba, coord), ()))
+            if aba in intervalos:
+                col, row = range_boundaries(coord)[:2]
+                candidatos.update(
+                    chave for (min_col, min_row, max_col, max_row), chave in intervalos[aba]
+                    if min_col <= col <= max_col and min_row <= row <= max_row
+                )
+            for chave in candidatos - resultado:
+                resultado.add(chave)
+                fila.append(chave)
+        return resultado
+
+
+# ============================================================================
+# FUNÇÕES DE CONVENIÊNCIA
+# ============================================================================
+
+def preencher_valores_em_cache(caminho: Union[str, Path]) -> Dict[str, int]:
+    """
+    Garante que load_workbook(caminho, data_only=True) enxergue os resultados
+    das fórmulas sem precisar abrir e salvar o arquivo no Excel.
+
+    Cada fórmula recebe o valor em cache (quando o Excel/EMSys já gravou) ou o
+    valor calculado aqui, e é gravada como valor literal - o tmp.xlsx é só
+    lido e descartado. Fórmulas não suportadas são mantidas como estão e
+    contadas em "pendentes", para o chamador decidir se recorre ao Excel.
+    """
+    caminho = Path(caminho)
+    start_time = time.time()
+
+    wb_formulas = load_workbook(caminho)
+    wb_valores = load_workbook(caminho, data_only=True)
+    avaliador = AvaliadorFormulas(wb_formulas, wb_valores)
+
+    stats = {"formulas": 0, "calculadas": 0, "pendentes": 0}
+    alteradas = []
+
+    for ws in wb_formulas.worksheets:
+        for row in ws.iter_rows():
+            for cell in row:
+                if not (isinstance(cell.value, str) and cell.value.startswith("=")):
+                    continue
+                stats["formulas"] += 1
+                if wb_valores[ws.title][cell.coordinate].value is None:
+                    try:
+                        avaliador.valor(ws.title, cell.coordinate)
+                        stats["calculadas"] += 1
+                    except FormulaNaoSuportada as e:
+                        stats["pendentes"] += 1
+                        if LOGGING_AVAILABLE:
+                            logger.warning(f"[Fórmulas] {ws.title}!{cell.coordinate}: {e}")
+                        continue
+                alteradas.append(cell)
+
+    if stats["calculadas"]:
+        # Salvar pelo openpyxl descarta todos os caches; por isso todas as
+        # fórmulas resolvidas viram valores, não só as que foram calculadas.
+        for cell in alteradas:
+            cell.value = avaliador.valor(cell.parent.title, cell.coordinate)
+        salvar_atomico(wb_formulas, caminho, forcar=True)
+
+    duration_ms = (time.time() - start_time) * 1000
+    if LOGGING_AVAILABLE:
+        log_operacao("preencher_valores_em_cache", "SUCESSO", {
+            "arquivo": str(caminho),
+            **stats,
+            "duration_ms": duration_ms
+        })
+    if METRICS_AVAILABLE:
+        record_operation_metric("formulas_recalc", duration_ms, stats)
+
+    return stats
@@ -0,0 +1,330 @@
+"""
+Histórico Diário de Valores Extraídos - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as planilhas existentes.
+As planilhas continuam sendo gravadas como antes; o histórico é uma cópia local
+dos valores, e uma falha ao registrar nunca interrompe a automação.
+
+Este módulo adiciona:
+1. Base SQLite local com um valor por (posto, métrica, dia), indexada por data
+2. Registro dos valores extraídos a cada execução (litros, categorias, cashback, PIX...)
+3. Consultas por série, por mês e em matriz (métricas x dias) para projecao.modelos
+4. Importação das planilhas mensais existentes (abas "Dia NN") para preencher o histórico
+"""
+
+import os
+import sqlite3
+import threading
+import calendar
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from utils.excel_stream import LeitorStreaming
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+CAMINHO_PADRAO = Path.home() / ".oceanicdesk" / "historico.sqlite3"
+
+POSTO_PADRAO = "oceanic"
+
+# Células de cada aba "Dia NN" da planilha mensal importadas para o histórico
+# (as mesmas de projecao.snapshot + cashback e PIX inseridos na etapa 4)
+CELULAS_IMPORTACAO = {
+    "gasolina_comum": "D21",
+    "gasolina_aditivada": "D22",
+    "etanol": "D25",
+    "diesel_s10": "D28",
+    "litros": "D31",
+    "lucro": "E31",
+    "minimercado": "D33",
+    "margem": "G17",
+    "cashback": "H21",
+    "pix": "M21",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS valores_diarios (
+    posto TEXT NOT NULL,
+    metrica TEXT NOT NULL,
+    data TEXT NOT NULL,
+    valor REAL,
+    origem TEXT,
+    atualizado_em TEXT NOT NULL,
+    PRIMARY KEY (posto, metrica, data)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_valores_data ON valores_diarios (data, posto);
+"""
+
+
+def _como_data(valor: Union[date, datetime, str]) -> str:
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return date.fromisoformat(str(valor)).isoformat()
+
+
+def _como_numero(valor: Any) -> Optional[float]:
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = str(valor).strip()
+    if "," in texto:
+        # Formato brasileiro: 1.234,56
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# BASE DE HISTÓRICO
+# ============================================================================
+
+class HistoricoVendas:
+    """
+    Valores diários por posto e métrica em uma base SQLite.
+
+    Uma gravação para o mesmo (posto, métrica, dia) substitui a anterior, então
+    reprocessar um dia ou reimportar um mês não duplica valores.
+    """
+
+    def __init__(self, caminho: Optional[Union[str, Path]] = None):
+        self.caminho = Path(caminho or os.getenv("CAMINHO_HISTORICO") or CAMINHO_PADRAO)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.executescript(_SCHEMA)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+    def __enter__(self) -> "HistoricoVendas":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    # ------------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------------
+
+    def registrar(self, data: Union[date, str], valores: Dict[str, Any],
+                  posto: str = POSTO_PADRAO, origem: Optional[str] = None) -> int:
+        """Grava {métrica: valor} de um dia. Valores não numéricos são ignorados."""
+        return self.registrar_varios([(data, valores)], posto=posto, origem=origem)
+
+    def registrar_varios(self, dias: Iterable[Tuple[Union[date, str], Dict[str, Any]]],
+                         posto: str = POSTO_PADRAO, origem: Optional[str] = None) -> int:
+        """Grava vários dias em uma única transação: [(data, {métrica: valor}), ...]."""
+        linhas = []
+        for data, valores in dias:
+            data = _como_data(data)
+            for metrica, valor in valores.items():
+                numero = _como_numero(valor)
+                if numero is not None:
+                    linhas.append((posto, metrica, data, numero, origem))
+        return self._gravar(linhas)
+
+    def _gravar(self, linhas: List[Tuple[str, str, str, float, Optional[str]]]) -> int:
+        if not linhas:
+            return 0
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conexao:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO valores_diarios (posto, metrica, data, valor, origem, atualizado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [linha + (agora,) for linha in linhas],
+            )
+        return len(linhas)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _consultar(self, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conexao.execute(sql, parametros).fetchall()
+
+    def valores_do_dia(self, data: Union[date, str], posto: str = POSTO_PADRAO) -> Dict[str, float]:
+        """{métrica: valor} de um dia."""
+        return dict(self._consultar(
+            "SELECT metrica, valor FROM valores_diarios WHERE posto = ? AND data = ?",
+            (posto, _como_data(data)),
+        ))
+
+    def serie(self, metrica: str, inicio: Union[date, str], fim: Union[date, str],
+              posto: str = POSTO_PADRAO) -> Dict[date, float]:
+        """{dia: valor} de uma métrica no período (inclusive), só os dias registrados."""
+        linhas = self._consultar(
+            "SELECT data, valor FROM valores_diarios "
+            "WHERE posto = ? AND metrica = ? AND data BETWEEN ? AND ? ORDER BY data",
+            (posto, metrica, _como_data(inicio), _como_data(fim)),
+        )
+        return {date.fromisoformat(d): v for d, v in linhas}
+
+    def matriz(self, metricas: List[str], inicio: Union[date, str], fim: Union[date, str],
+               posto: str = POSTO_PADRAO, vazio: float = np.nan,
+               atualizado_apos: Optional[datetime] = None) -> np.ndarray:
+        """
+        Métricas x dias (de inicio a fim, contínuo) no formato usado por
+        projecao.modelos. Dias sem registro recebem `vazio`.
+        atualizado_apos: considera só os valores registrados depois desse
+        instante (ex.: mtime da planilha de origem); os mais antigos contam
+        como sem registro.
+        """
+        inicio_d = date.fromisoformat(_como_data(inicio))
+        fim_d = date.fromisoformat(_como_data(fim))
+        resultado = np.full((len(metricas), (fim_d - inicio_d).days + 1), vazio, dtype=float)
+        if not metricas:
+            return resultado
+
+        indices = {m: i for i, m in enumerate(metricas)}
+        marcadores = ", ".join("?" for _ in metricas)
+        sql = (f"SELECT metrica, data, valor FROM valores_diarios "
+               f"WHERE posto = ? AND data BETWEEN ? AND ? AND metrica IN ({marcadores})")
+        parametros = (posto, inicio_d.isoformat(), fim_d.isoformat(), *metricas)
+        if atualizado_apos is not None:
+            # atualizado_em tem resolução de segundos: no mesmo segundo, não dá para saber a ordem
+            sql += " AND atualizado_em > ?"
+            parametros += (atualizado_apos.isoformat(timespec="seconds"),)
+        linhas = self._consultar(sql, parametros)
+        for metrica, data, valor in linhas:
+            resultado[indices[metrica], (date.fromisoformat(data) - inicio_d).days] = valor
+        return resultado
+
+    def totais_mes(self, ano: int, mes: int, posto: str = POSTO_PADRAO) -> Dict[str, float]:
+        """Soma de cada métrica no mês."""
+        inicio = date(ano, mes, 1)
+        fim = date(ano, mes, calendar.monthrange(ano, mes)[1])
+        return dict(self._consultar(
+            "SELECT metrica, SUM(valor) FROM valores_diarios "
+            "WHERE posto = ? AND data BETWEEN ? AND ? GROUP BY metrica",
+            (posto, inicio.isoformat(), fim.isoformat()),
+        ))
+
+    def metricas(self, posto: Optional[str] = None) -> List[str]:
+        if posto is None:
+            return [m for (m,) in self._consultar("SELECT DISTINCT metrica FROM valores_diarios ORDER BY metrica")]
+        return [m for (m,) in self._consultar(
+            "SELECT DISTINCT metrica FROM valores_diarios WHERE posto = ? ORDER BY metrica", (posto,)
+        )]
+
+
+# ============================================================================
+# INSTÂNCIA DO PROCESSO
+# ============================================================================
+
+_historico: Optional[HistoricoVendas] = None
+_historico_lock = threading.Lock()
+
+
+def obter_historico() -> HistoricoVendas:
+    """Base de histórico padrão (CAMINHO_HISTORICO no .env ou ~/.oceanicdesk)."""
+    global _historico
+    with _historico_lock:
+        if _historico is None:
+            _historico = HistoricoVendas()
+        return _historico
+
+
+def redefinir_historico(caminho: Optional[Union[str, Path]] = None) -> HistoricoVendas:
+    """Fecha a base padrão atual e passa a usar a do caminho informado."""
+    global _historico
+    with _historico_lock:
+        if _historico is not None:
+            _historico.fechar()
+        _historico = HistoricoVendas(caminho)
+        return _historico
+
+
+def registrar_no_historico(data: Union[date, str], valores: Dict[str, Any],
+                           posto: str = POSTO_PADRAO, origem: Optional[str] = None) -> int:
+    """
+    Registra os valores de um dia no histórico padrão.
+    Falhas são apenas registradas no log: o histórico nunca interrompe a automação.
+    """
+    try:
+        return obter_historico().registrar(data, valores, posto=posto, origem=origem)
+    except Exception as e:
+        if LOGGING_AVAILABLE:
+            logger.warning(f"[Histórico] Falha ao registrar {sorted(valores)} de {data}: {e}")
+        return 0
+
+
+# ============================================================================
+# IMPORTAÇÃO DAS PLANILHAS MENSAIS
+# ============================================================================
+
+def importar_planilha_mes(caminho: Union[str, Path], ano: int, mes: int,
+                          posto: str = POSTO_PADRAO,
+                          celulas: Optional[Dict[str, str]] = None,
+                          historico: Optional[HistoricoVendas] = None) -> Dict[str, Any]:
+    """
+    Preenche o histórico a partir de uma planilha mensal com abas "Dia NN".
+    O arquivo é aberto uma única vez e só as células mapeadas são lidas.
+
+    Retorna {"dias": dias importados, "valores": valores gravados, "abas_ausentes": [...]}.
+    """
+    caminho = Path(caminho)
+    celulas = celulas or CELULAS_IMPORTACAO
+    historico = historico or obter_historico()
+    start_time = time.time()
+
+    dias_do_mes = calendar.monthrange(ano, mes)[1]
+    dias = []
+    ausentes = []
+    with LeitorStreaming(caminho) as leitor:
+        abas = set(leitor.nomes_abas)
+        for dia in range(1, dias_do_mes + 1):
+            nome_aba = f"Dia {dia:02d}"
+            if nome_aba not in abas:
+                ausentes.append(nome_aba)
+                continue
+            lidos = leitor.ler_celulas(list(celulas.values()), nome_aba)
+            dias.append((date(ano, mes, dia), {metrica: lidos[coord] for metrica, coord in celulas.items()}))
+
+    gravados = historico.registrar_varios(dias, posto=posto, origem=caminho.name)
+    duration_ms = (time.time() - start_time) * 1000
+    resultado = {"dias": len(dias), "valores": gravados, "abas_ausentes": ausentes}
+
+    print(f"[Histórico] {caminho.name}: {len(dias)} dia(s), {gravados} valor(es) importado(s).")
+    if LOGGING_AVAILABLE:
+        log_operacao("importar_planilha_mes", "SUCESSO", {
+            "arquivo": str(caminho),
+            "mes": f"{ano}-{mes:02d}",
+            **resultado,
+            "duration_ms": duration_ms
+        })
+    if METRICS_AVAILABLE:
+        record_operation_metric("historico_importacao", duration_ms, {"dias": len(dias), "valores": gravados})
+
+    return resultado
+
+
+def importar_planilhas(arquivos: Dict[Tuple[int, int], Union[str, Path]],
+                       posto: str = POSTO_PADRAO) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """Importa várias planilhas mensais: {(ano, mês): caminho}."""
+    return {(ano, mes): importar_planilha_mes(caminho, ano, mes, posto=posto)
+            for (ano, mes), caminho in arquivos.items()}
@@ -6,6 +6,37 @@ from typing import Dict, Any, Optional
 import traceback
 import sys
 
+class ArquivoDiarioHandler(logging.FileHandler):
+    """
+    FileHandler que grava em <prefixo>_<data>.log e troca de arquivo quando a
+    data muda (processos que passam da meia-noite, como o modo daemon).
+    """
+
+    def __init__(self, pasta: Path, prefixo: str, encoding: str = "utf-8"):
+        self.pasta = Path(pasta)
+        self.prefixo = prefixo
+        self.data = datetime.today().date()
+        super().__init__(self._arquivo(), encoding=encoding)
+
+    def _arquivo(self) -> Path:
+        return self.pasta / f"{self.prefixo}_{self.data}.log"
+
+    def emit(self, record: logging.LogRecord) -> None:
+        hoje = datetime.today().date()
+        if hoje != self.data:
+            self.acquire()
+            try:
+                if hoje != self.data:
+                    self.data = hoje
+                    self.baseFilename = str(self._arquivo().resolve())
+                    if self.stream is not None:
+                        self.stream.close()
+                        self.stream = None  # reaberto por FileHandler.emit
+            finally:
+                self.release()
+        super().emit(record)
+
+
 class StructuredLogger:
     """
     Logger estruturado para operações do sistema.
@@ -22,10 +53,9 @@ class StructuredLogger:
             # Usar a mesma configuração do logger principal
             log_dir = Path(__file__).resolve().parent.parent / "logs"
             log_dir.mkdir(exist_ok=True)
-            log_file = log_dir / f"structured_log_{datetime.today().date()}.log"
 
-            # Handler para arquivo estruturado
-            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            # Handler para arquivo estruturado (structured_log_<data>.log)
+            file_handler = ArquivoDiarioHandler(log_dir, "structured_log")
             file_handler.setLevel(logging.INFO)
 
             # Formato JSON para logs estruturados
@@ -85,14 +115,12 @@ class StructuredLogger:
 log_dir = Path(__file__).resolve().parent.parent / "logs"
 log_dir.mkdir(exist_ok=True)
 
-log_file = log_dir / f"log_{datetime.today().date()}.log"
-
-# Configuração original mantida exatamente igual
+# Mesmo arquivo log_<data>.log de sempre, trocado a cada dia
 logging.basicConfig(
     level=logging.INFO,
     format="[%(asctime)s] [%(levelname)s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[logging.FileHandler(log_file, encoding="utf-8"), logging.StreamHandler()],
+    handlers=[ArquivoDiarioHandler(log_dir, "log"), logging.StreamHandler()],
 )
 
 # Logger original mantido
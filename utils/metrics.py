@@ -108,6 +108,13 @@ class PerformanceMetrics:
             "average_duration_ms": 0.0,
             "cache_hit_rate": 0.0
         }
+
+        # Gravações de workbooks (utils/excel_save.py)
+        self._save_stats = {
+            "saves_written": 0,
+            "saves_skipped": 0,
+            "bytes_written": 0
+        }
         
         # Log de inicialização
         if LOGGING_AVAILABLE:
@@ -243,6 +250,20 @@ class PerformanceMetrics:
         if LOGGING_AVAILABLE:
             log_performance(operation, duration_ms, details)
     
+    def record_save(self, bytes_written: int = 0, skipped: bool = False):
+        """Registra uma gravação de workbook feita ou evitada."""
+        with self._lock:
+            if skipped:
+                self._save_stats["saves_skipped"] += 1
+            else:
+                self._save_stats["saves_written"] += 1
+                self._save_stats["bytes_written"] += bytes_written
+
+    def get_save_stats(self) -> Dict[str, int]:
+        """Retorna contadores de gravações de workbooks"""
+        with self._lock:
+            return self._save_stats.copy()
+    
     def _categorize_operation(self, operation: str) -> str:
         """Categoriza uma operação baseada no nome"""
         operation_lower = operation.lower()
@@ -353,6 +374,7 @@ class PerformanceMetrics:
                 "general_stats": self._stats.copy(),
                 "category_stats": dict(category_stats),
                 "most_common_operations": most_common,
+                "save_stats": self._save_stats.copy(),
                 "slow_operations_count": len(self._slow_operations),
                 "system_metrics_count": len(self._system_metrics),
                 "collection_active": self._collecting
@@ -496,6 +518,13 @@ def record_operation_metric(operation: str, duration_ms: float,
     performance_metrics.record_operation(operation, duration_ms, details)
 
 
+def record_save_metric(bytes_written: int = 0, skipped: bool = False):
+    """
+    Função de conveniência para registrar gravação de workbook feita ou evitada.
+    """
+    performance_metrics.record_save(bytes_written, skipped)
+
+
 def start_metrics_collection():
     """Inicia coleta automática de métricas do sistema"""
     performance_metrics.start_collection()
@@ -0,0 +1,191 @@
+"""
+Sessão de Escrita do Meu Controle - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as funções de relatório existentes.
+Sem uma sessão ativa, cada gravação continua abrindo e salvando a planilha na hora.
+
+Este módulo adiciona:
+1. Sessão que acumula as fórmulas de projeção destinadas ao Meu Controle
+2. Carregamento e gravação únicos da planilha ao final da etapa 8
+3. API explícita de flush/rollback das atualizações pendentes
+4. Integração com sistemas de logging e métricas
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from utils.excel_save import carregar_workbook, salvar_atomico
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+# ============================================================================
+# SESSÃO DE ESCRITA
+# ============================================================================
+
+class MeuControleSession:
+    """
+    Acumula atualizações (célula -> valor/fórmula) do Meu Controle e grava
+    todas de uma vez. A planilha só é carregada no flush, então gravações
+    feitas por outras rotinas antes disso não são sobrescritas.
+    """
+
+    def __init__(self, caminho: Optional[Union[str, Path]] = None,
+                 nome_aba: Optional[str] = None):
+        caminho = caminho or os.getenv("CAMINHO_MEU_CONTROLE")
+        if not caminho:
+            raise EnvironmentError("CAMINHO_MEU_CONTROLE não definido no .env.")
+
+        self.caminho = Path(caminho)
+        self.nome_aba = nome_aba
+        self._pendentes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.flushes = 0
+        self.celulas_gravadas = 0
+
+    def registrar(self, celula: str, valor: Any) -> None:
+        """Agenda a escrita de um valor ou fórmula em uma célula."""
+        with self._lock:
+            self._pendentes[celula.upper()] = valor
+
+    def registrar_varios(self, atualizacoes: Dict[str, Any]) -> None:
+        """Agenda várias escritas de uma vez."""
+        with self._lock:
+            for celula, valor in atualizacoes.items():
+                self._pendentes[celula.upper()] = valor
+
+    @property
+    def pendentes(self) -> Dict[str, Any]:
+        """Cópia das atualizações ainda não gravadas."""
+        with self._lock:
+            return dict(self._pendentes)
+
+    def rollback(self) -> int:
+        """Descarta as atualizações pendentes. Retorna quantas foram descartadas."""
+        with self._lock:
+            descartadas = len(self._pendentes)
+            self._pendentes.clear()
+
+        if LOGGING_AVAILABLE and descartadas:
+            log_operacao("meu_controle_rollback", "SUCESSO", {
+                "arquivo": str(self.caminho),
+                "celulas_descartadas": descartadas
+            })
+
+        return descartadas
+
+    def flush(self) -> int:
+        """
+        Carrega o Meu Controle uma única vez, aplica todas as atualizações
+        pendentes e salva. Retorna o número de células gravadas.
+        """
+        with self._lock:
+            if not self._pendentes:
+                return 0
+            atualizacoes = dict(self._pendentes)
+
+            start_time = time.time()
+            wb = carregar_workbook(self.caminho)
+            ws = wb[self.nome_aba] if self.nome_aba else wb.active
+
+            for celula, valor in atualizacoes.items():
+                ws[celula] = valor
+
+            salvar_atomico(wb, self.caminho)
+            self._pendentes.clear()
+
+        duration_ms = (time.time() - start_time) * 1000
+        self.flushes += 1
+        self.celulas_gravadas += len(atualizacoes)
+        print(f"[Meu Controle] {len(atualizacoes)} célula(s) gravada(s) em uma única operação.")
+
+        if LOGGING_AVAILABLE:
+            log_operacao("meu_controle_flush", "SUCESSO", {
+                "arquivo": str(self.caminho),
+                "celulas": sorted(atualizacoes),
+                "duration_ms": duration_ms
+            })
+        if METRICS_AVAILABLE:
+            record_operation_metric("meu_controle_save", duration_ms, {
+                "celulas": len(atualizacoes)
+            })
+
+        return len(atualizacoes)
+
+
+# ============================================================================
+# SESSÃO ATIVA DO PROCESSO
+# ============================================================================
+
+_sessao_ativa: Optional[MeuControleSession] = None
+
+
+def get_sessao_ativa() -> Optional[MeuControleSession]:
+    """Retorna a sessão aberta por sessao_meu_controle(), se houver."""
+    return _sessao_ativa
+
+
+@contextmanager
+def sessao_meu_controle(caminho: Optional[Union[str, Path]] = None,
+                        nome_aba: Optional[str] = None,
+                        flush_on_error: bool = True) -> Iterator[MeuControleSession]:
+    """
+    Abre uma sessão de escrita do Meu Controle para o bloco.
+
+    Ao sair do bloco as atualizações são gravadas. Em caso de erro, por padrão
+    as atualizações já concluídas também são gravadas (mesmo resultado de antes,
+    quando cada relatório salvava na hora); com flush_on_error=False elas são
+    descartadas.
+    """
+    global _sessao_ativa
+
+    if _sessao_ativa is not None:
+        # Sessões aninhadas reaproveitam a sessão externa
+        yield _sessao_ativa
+        return
+
+    sessao = MeuControleSession(caminho, nome_aba)
+    _sessao_ativa = sessao
+    try:
+        yield sessao
+    except BaseException:
+        _sessao_ativa = None
+        if flush_on_error:
+            sessao.flush()
+        else:
+            sessao.rollback()
+        raise
+    else:
+        _sessao_ativa = None
+        sessao.flush()
+
+
+def gravar_no_meu_controle(atualizacoes: Dict[str, Any],
+                           caminho: Optional[Union[str, Path]] = None) -> None:
+    """
+    Grava células no Meu Controle.
+    Com sessão ativa, apenas agenda a escrita; sem sessão, abre e salva na hora.
+    """
+    if _sessao_ativa is not None:
+        _sessao_ativa.registrar_varios(atualizacoes)
+        return
+
+    sessao = MeuControleSession(caminho)
+    sessao.registrar_varios(atualizacoes)
+    sessao.flush()
@@ -0,0 +1,268 @@
+"""
+Execução Paralela por Posto - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as funções de relatório
+existentes (parâmetro chacal). Os perfis "oceanic" e "chacaltaya" produzem as
+mesmas fórmulas que os fluxos atuais.
+
+Este módulo adiciona:
+1. Perfis de posto (caminhos, mapa de células, lista de isqueiros) via excel_ops.perfil_posto
+2. Leitura dos relatórios de N postos em paralelo, um processo por posto
+3. Gravação no Meu Controle serializada no processo principal, uma por arquivo
+4. Resultado e tempo por posto, com integração a logging e métricas
+5. Coleta da etapa 8: os tmp.xlsx exportados do EMSys são guardados e lidos
+   todos de uma vez, em paralelo, ao final da coleta
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from utils.excel_ops import extrair_relatorios_posto, registrar_acumulados_no_historico, _perfil_padrao
+from utils.meu_controle import MeuControleSession, get_sessao_ativa
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+# ============================================================================
+# PERFIS
+# ============================================================================
+
+def perfis_padrao(arquivos_oceanic: Dict[str, str], arquivos_chacal: Dict[str, str],
+                  caminho_meu_controle: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Perfis dos postos atuais (Oceanic e Chacaltaya) com os relatórios informados."""
+    perfis = []
+    for chacal, arquivos in ((False, arquivos_oceanic), (True, arquivos_chacal)):
+        perfil = _perfil_padrao(chacal)
+        perfil["arquivos"] = dict(arquivos)
+        perfil["caminho_meu_controle"] = caminho_meu_controle
+        perfis.append(perfil)
+    return perfis
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def _processar_perfil(perfil: Dict[str, Any], dia_fim: int) -> Dict[str, Any]:
+    """Lê os relatórios de um posto (executado em um processo do pool)."""
+    start_time = time.time()
+    try:
+        resultados, formulas = extrair_relatorios_posto(perfil["arquivos"], dia_fim, perfil)
+        erro = None
+    except Exception as e:
+        resultados, formulas = {}, {}
+        erro = f"{type(e).__name__}: {e}"
+    return {
+        "posto": perfil["nome"],
+        "resultados": resultados,
+        "formulas": formulas,
+        "duracao_ms": (time.time() - start_time) * 1000,
+        "erro": erro,
+    }
+
+
+def _gravar_formulas(caminho: Optional[str], formulas: Dict[str, Any]) -> None:
+    """Grava no Meu Controle do caminho, usando a sessão ativa se for o mesmo arquivo."""
+    sessao = get_sessao_ativa()
+    if sessao is not None and (caminho is None or Path(caminho).resolve() == sessao.caminho.resolve()):
+        sessao.registrar_varios(formulas)
+        return
+    destino = MeuControleSession(caminho)
+    destino.registrar_varios(formulas)
+    destino.flush()
+
+
+def executar_perfis_postos(perfis: List[Dict[str, Any]], dia_fim: int,
+                           max_workers: Optional[int] = None,
+                           gravar: bool = True) -> Dict[str, Any]:
+    """
+    Processa os relatórios de vários postos em paralelo.
+
+    A leitura de cada posto roda em um processo separado; as fórmulas são
+    gravadas depois, no processo principal, uma vez por arquivo do Meu Controle
+    (postos que compartilham o arquivo são agrupados). Um posto com erro não
+    impede a gravação dos demais.
+
+    Retorna {"postos": {nome: {resultados, formulas, duracao_ms, erro}},
+             "duracao_total_ms", "duracao_somada_ms"}.
+    """
+    nomes = [perfil["nome"] for perfil in perfis]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"Nomes de posto repetidos: {nomes}")
+
+    start_time = time.time()
+    if not perfis:
+        retornos = []
+    elif len(perfis) == 1 or max_workers == 1:
+        retornos = [_processar_perfil(perfil, dia_fim) for perfil in perfis]
+    else:
+        max_workers = max_workers or min(len(perfis), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_processar_perfil, perfil, dia_fim) for perfil in perfis]
+            retornos = [future.result() for future in futures]
+
+    postos = {retorno.pop("posto"): retorno for retorno in retornos}
+
+    if gravar:
+        por_arquivo: Dict[Optional[str], Dict[str, Any]] = {}
+        origem_celula: Dict[Any, str] = {}
+        for perfil in perfis:
+            formulas = postos[perfil["nome"]]["formulas"]
+            if not formulas:
+                continue
+            caminho = perfil.get("caminho_meu_controle")
+            chave = str(Path(caminho).resolve()) if caminho else None
+            destino = por_arquivo.setdefault(chave, {})
+            for celula, formula in formulas.items():
+                anterior = origem_celula.get((chave, celula))
+                if anterior is not None and LOGGING_AVAILABLE:
+                    logger.warning(f"[Postos] Célula {celula} gravada por {anterior} e {perfil['nome']}; vale a de {perfil['nome']}.")
+                origem_celula[(chave, celula)] = perfil["nome"]
+                destino[celula] = formula
+
+        for caminho, formulas in por_arquivo.items():
+            _gravar_formulas(caminho, formulas)
+
+        for nome, posto in postos.items():
+            if posto["resultados"]:
+                registrar_acumulados_no_historico(posto["resultados"], dia_fim, nome)
+
+    duracao_total_ms = (time.time() - start_time) * 1000
+    duracao_somada_ms = sum(p["duracao_ms"] for p in postos.values())
+
+    for nome, posto in postos.items():
+        status = "ERRO" if posto["erro"] else "OK"
+        print(f"[Postos] {nome}: {status} em {posto['duracao_ms']:.0f} ms")
+    print(f"[Postos] {len(postos)} posto(s) em {duracao_total_ms:.0f} ms (soma sequencial: {duracao_somada_ms:.0f} ms).")
+
+    if LOGGING_AVAILABLE:
+        log_operacao("executar_perfis_postos", "SUCESSO", {
+            "postos": {nome: {"duracao_ms": p["duracao_ms"], "erro": p["erro"]} for nome, p in postos.items()},
+            "duration_ms": duracao_total_ms
+        })
+    if METRICS_AVAILABLE:
+        record_operation_metric("postos_paralelo", duracao_total_ms, {
+            "postos": len(postos),
+            "duracao_somada_ms": duracao_somada_ms
+        })
+
+    return {
+        "postos": postos,
+        "duracao_total_ms": duracao_total_ms,
+        "duracao_somada_ms": duracao_somada_ms,
+    }
+
+
+# ============================================================================
+# COLETA DA ETAPA 8
+# ============================================================================
+
+_coleta_ativa: Optional[Dict[str, Any]] = None
+
+
+def get_coleta_ativa() -> Optional[Dict[str, Any]]:
+    """Retorna a coleta aberta por coleta_relatorios_postos(), se houver."""
+    return _coleta_ativa
+
+
+def adiar_relatorio_tmp(categoria: str, caminho_tmp: Union[str, Path], dia_fim: int,
+                        chacal: bool = False) -> bool:
+    """
+    Com coleta ativa, move o tmp.xlsx da categoria para a pasta da coleta e
+    retorna True (a leitura fica para o fim da coleta); sem coleta, retorna False.
+    """
+    coleta = _coleta_ativa
+    if coleta is None:
+        return False
+    if coleta["dia_fim"] is None:
+        coleta["dia_fim"] = dia_fim
+    elif coleta["dia_fim"] != dia_fim:
+        raise ValueError(f"Relatórios da coleta com dia_fim diferentes: {coleta['dia_fim']} e {dia_fim}.")
+
+    posto = "chacal" if chacal else "oceanic"
+    destino = coleta["pasta"] / f"{posto}_{categoria}.xlsx"
+    shutil.move(str(caminho_tmp), destino)
+    coleta["arquivos"][posto][categoria] = str(destino)
+    print(f"[Postos] {categoria} ({posto}) guardado para leitura em paralelo.")
+    return True
+
+
+def _finalizar_coleta(coleta: Dict[str, Any], levantar: bool) -> Optional[Dict[str, Any]]:
+    """Lê e grava os relatórios coletados de todos os postos e remove a pasta da coleta."""
+    try:
+        perfis = [
+            perfil for perfil in perfis_padrao(coleta["arquivos"]["oceanic"], coleta["arquivos"]["chacal"],
+                                               coleta["caminho_meu_controle"])
+            if perfil["arquivos"]
+        ]
+        if not perfis:
+            return None
+        resultado = executar_perfis_postos(perfis, coleta["dia_fim"], max_workers=coleta["max_workers"])
+    finally:
+        shutil.rmtree(coleta["pasta"], ignore_errors=True)
+
+    erros = {nome: posto["erro"] for nome, posto in resultado["postos"].items() if posto["erro"]}
+    if erros:
+        mensagem = "; ".join(f"{nome}: {erro}" for nome, erro in erros.items())
+        if levantar:
+            raise RuntimeError(f"Relatórios com erro: {mensagem}")
+        if LOGGING_AVAILABLE:
+            logger.error(f"[Postos] Relatórios com erro: {mensagem}")
+    return resultado
+
+
+@contextmanager
+def coleta_relatorios_postos(caminho_meu_controle: Optional[str] = None,
+                             max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Adia a leitura dos relatórios exportados no bloco (ver adiar_relatorio_tmp).
+
+    A exportação no EMSys continua um relatório por vez; ao sair do bloco os
+    relatórios de todos os postos são lidos com executar_perfis_postos e as
+    fórmulas gravadas (na sessão ativa do Meu Controle, se houver). Em caso de
+    erro no bloco, os relatórios já coletados também são gravados, como na
+    sessão do Meu Controle. Um posto com erro de leitura levanta RuntimeError
+    depois de gravados os demais.
+    """
+    global _coleta_ativa
+
+    if _coleta_ativa is not None:
+        # Coletas aninhadas reaproveitam a coleta externa
+        yield _coleta_ativa
+        return
+
+    coleta = {
+        "pasta": Path(tempfile.mkdtemp(prefix="relatorios_postos_")),
+        "dia_fim": None,
+        "arquivos": {"oceanic": {}, "chacal": {}},
+        "caminho_meu_controle": caminho_meu_controle,
+        "max_workers": max_workers,
+    }
+    _coleta_ativa = coleta
+    try:
+        yield coleta
+    except BaseException:
+        _coleta_ativa = None
+        _finalizar_coleta(coleta, levantar=False)
+        raise
+    else:
+        _coleta_ativa = None
+        _finalizar_coleta(coleta, levantar=True)
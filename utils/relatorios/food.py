@@ -1,18 +1,15 @@
 import time
 import pyautogui
 import os
-from openpyxl import load_workbook
 from dotenv import load_dotenv
 from utils.excel_ops import LETRA_PLANILHA
-import calendar
-from datetime import datetime
+from utils.meu_controle import gravar_no_meu_controle
+from utils import relogio
 
 # Esses dois abaixo você precisa garantir que existem em outro módulo
 from utils.extratores import salvar_planilha_emsys, extrair_food_tmp
 from interfaces.alerta_visual import mostrar_alerta_visual, mostrar_alerta_progresso
 
-hoje = datetime.today()
-dias_do_mes = calendar.monthrange(hoje.year, hoje.month)[1]
 LETRA_PLANILHA = "H"
 
 def extrair_valores_e_somar(chacal=False):
@@ -92,27 +89,20 @@ def atualizar_meu_controle(dia_fim, chacal=False):
         mostrar_alerta_visual("Erro de Configuração", "CAMINHO_MEU_CONTROLE não definido", tipo="error")
         raise EnvironmentError("CAMINHO_MEU_CONTROLE não definido no .env.")
 
-    mostrar_alerta_visual("Carregando planilha", f"Arquivo: {os.path.basename(caminho_meu_controle)}", tipo="dev")
-    
-    # Abrir a planilha
-    wb_controle = load_workbook(caminho_meu_controle)
-    ws_controle = wb_controle.active
-
     # Criar a fórmula com base no total e dia_fim
-    formula = f"={valor_str}/{dia_fim}*{dias_do_mes}"
+    formula = f"={valor_str}/{dia_fim}*{relogio.dias_do_mes()}"
     mostrar_alerta_visual("Fórmula criada", f"Fórmula: {formula}", tipo="dev")
 
-    # Atualizar a célula G42
+    # Célula de Food: linha 42 no Oceanic, 20 no Chacaltaya
     if chacal:
         celula = f"{LETRA_PLANILHA}20"
     else:
         celula = f"{LETRA_PLANILHA}42"
     
     mostrar_alerta_visual("Atualizando célula", f"Célula: {celula}", tipo="dev")
-    ws_controle[celula] = formula
 
-    # Salvar alterações
+    # Salvar alterações (agendado quando há sessão ativa na etapa 8)
     mostrar_alerta_visual("Salvando alterações", "Persistindo modificações...", tipo="info")
-    wb_controle.save(caminho_meu_controle)
+    gravar_no_meu_controle({celula: formula}, caminho_meu_controle)
     
     mostrar_alerta_visual("Meu Controle atualizado", f"Fórmula inserida em {celula}", tipo="success")
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Relógio Injetável - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com o comportamento atual.
+Sem relógio definido, agora() é datetime.now() e hoje() é date.today().
+
+Este módulo adiciona:
+1. Um único ponto de leitura da data/hora, trocável (testes, reprocessamento, daemon)
+2. Valores derivados da data (ontem, dias do mês) calculados a cada chamada,
+   em vez de fixados na importação dos módulos
+3. relogio_fixo() para executar um trecho "como se fosse" outro dia
+"""
+
+import calendar
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator, Optional, Union
+
+
+# ============================================================================
+# RELÓGIO ATUAL
+# ============================================================================
+
+_relogio: Callable[[], datetime] = datetime.now
+_lock = threading.Lock()
+
+
+def definir_relogio(funcao: Optional[Callable[[], datetime]] = None) -> Callable[[], datetime]:
+    """
+    Troca a fonte de data/hora de todo o processo. Sem argumento, volta ao
+    relógio do sistema. Retorna o relógio anterior.
+    """
+    global _relogio
+    with _lock:
+        anterior = _relogio
+        _relogio = funcao or datetime.now
+    return anterior
+
+
+@contextmanager
+def relogio_fixo(momento: Union[datetime, date]) -> Iterator[datetime]:
+    """Executa o bloco com o relógio parado em `momento` (date vira meia-noite)."""
+    if not isinstance(momento, datetime):
+        momento = datetime(momento.year, momento.month, momento.day)
+    anterior = definir_relogio(lambda: momento)
+    try:
+        yield momento
+    finally:
+        definir_relogio(anterior)
+
+
+# ============================================================================
+# VALORES DERIVADOS
+# ============================================================================
+
+def agora() -> datetime:
+    return _relogio()
+
+
+def hoje() -> date:
+    return agora().date()
+
+
+def ontem() -> date:
+    return hoje() - timedelta(days=1)
+
+
+def dias_do_mes(data: Optional[Union[datetime, date]] = None) -> int:
+    """Quantidade de dias do mês de `data` (padrão: mês de hoje)."""
+    data = data or hoje()
+    return calendar.monthrange(data.year, data.month)[1]
+
+
+def data_ontem_formatada() -> str:
+    """Ontem no formato digitado no EMSys e usado no e-mail, ex.: "19/07/2025"."""
+    return ontem().strftime("%d/%m/%Y")
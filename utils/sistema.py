@@ -2,15 +2,16 @@ from utils.file_utils import aguardar_arquivo
 from utils.duplicata_ocr import aguardar_usuario
 import os
 import time
-from datetime import datetime, timedelta
 import pyautogui
 from utils.logger import logger
 from tkinter import messagebox
 from utils.excel_ops import extrair_valores_relatorio_combustivel_tmp, extrair_valores_relatorio_bebidas_nao_alcoolicas_tmp, relatorio_bomboniere_tmp, relatorio_cerveja_tmp, relatorio_isqueiro_tmp, relatorio_cigarro_tmp
 from utils.relatorios.food import atualizar_meu_controle
 from utils.extratores import salvar_planilha_emsys
-from utils.file_utils import corrigir_cache_excel_com
+from utils.file_utils import preencher_valores_planilha
+from utils.excel_stream import indexar_rotulos
 from utils.helpers import esperar_elemento
+from utils import relogio
 from utils.path_utils import get_captura_path, get_system_path, get_desktop_path
 from interfaces.alerta_visual import mostrar_alerta_visual, mostrar_alerta_progresso
 import pygetwindow as gw
@@ -93,7 +94,7 @@ def preencher_filtros_e_gerar():
     for _ in range(5):
         pyautogui.press("tab")
 
-    data_ontem = (datetime.today() - timedelta(days=1)).strftime("%d/%m/%Y")
+    data_ontem = relogio.data_ontem_formatada()
     pyautogui.write(data_ontem, interval=0.1)
     
     pyautogui.press("tab")
@@ -190,7 +191,7 @@ def aplicar_filtros_vendas_detalhado():
     pyautogui.click(497, 374)
     time.sleep(0.5)
     pyautogui.press("backspace", presses=8, interval=0.2)
-    data_ontem = (datetime.today() - timedelta(days=1)).strftime("%d/%m/%Y")
+    data_ontem = relogio.data_ontem_formatada()
     pyautogui.write(data_ontem, interval=0.1)
     mostrar_alerta_visual("Data configurada", f"Período: {data_ontem}", tipo="dev")
     
@@ -289,7 +290,7 @@ def acessar_relatorio_pix():
 
 
 def gerar_relatorio_pix():
-    data_ontem = (datetime.today() - timedelta(days=1)).strftime("%d/%m/%Y")
+    data_ontem = relogio.data_ontem_formatada()
     pyautogui.write(data_ontem, interval=0.2)
     pyautogui.write(data_ontem, interval=0.2)
     pyautogui.press("down")
@@ -304,45 +305,31 @@ def gerar_relatorio_pix():
     pyautogui.click(657,140, duration=0.5)
     
 
-def processar_relatorio_excel_cashback_pix():
-    from openpyxl import load_workbook
-    from openpyxl.cell import MergedCell
-    import win32com.client as win32
+# Rótulos do relatório de recebimentos do EMSys e coluna (P) com os valores
+RELATORIO_PIX_ROTULOS = {
+    "cashback": "CASHBACK MARKA",
+    "pagarme": "PAGAR.ME INSTITUICAO DE PAGAMENTO S.A",
+    "pix": "PIX - CIELO",
+}
+RELATORIO_PIX_COLUNA_VALOR = 16
 
-    corrigir_cache_excel_com()
 
+def processar_relatorio_excel_cashback_pix():
     desktop_tmp = os.path.join(os.path.expanduser("~"), "Desktop", "tmp.xlsx")
     aguardar_arquivo(desktop_tmp)
-    excel = win32.gencache.EnsureDispatch("Excel.Application") # type: ignore
-    excel.Visible = True
-    wb = excel.Workbooks.Open(desktop_tmp)
-    time.sleep(10)
-    wb.Save()
-    wb.Close(SaveChanges=True)
-    excel.Quit()
-    logger.info("🔄 Arquivo tmp.xlsx aberto e salvo via Excel COM.")
-
-    wb_tmp = load_workbook(desktop_tmp, data_only=True)
-    ws_tmp = wb_tmp.active
-    cashback_valor = None
-    pagarme_valor = None
-    pix_valor = None
-
-    if ws_tmp is not None:
-        for row in ws_tmp.iter_rows():
-            for cell in row:
-                if isinstance(cell, MergedCell):
-                    continue
-                if cell.value is not None:
-                    valor = str(cell.value).strip().upper()
-                    if valor == "CASHBACK MARKA":
-                        cashback_valor = row[15].value
-                    elif valor == "PAGAR.ME INSTITUICAO DE PAGAMENTO S.A":
-                        pagarme_valor = row[15].value
-                    elif valor == "PIX - CIELO":
-                        pix_valor = row[15].value
-    else:
-        logger.warning("ws_tmp é None. Não foi possível iterar pelas linhas.")
+    preencher_valores_planilha(desktop_tmp, visivel=True)
+    logger.info("🔄 Valores das fórmulas de tmp.xlsx preenchidos.")
+
+    # Índice rótulo -> valor da coluna P em uma única passada pelas colunas A:O
+    valores = indexar_rotulos(
+        desktop_tmp,
+        RELATORIO_PIX_ROTULOS.values(),
+        coluna_valor=RELATORIO_PIX_COLUNA_VALOR,
+        colunas_rotulo=range(1, RELATORIO_PIX_COLUNA_VALOR),
+    )
+    cashback_valor = valores[RELATORIO_PIX_ROTULOS["cashback"]]
+    pagarme_valor = valores[RELATORIO_PIX_ROTULOS["pagarme"]]
+    pix_valor = valores[RELATORIO_PIX_ROTULOS["pix"]]
 
     def safe_float(val):
         from decimal import Decimal
@@ -538,7 +525,7 @@ def posto_chacaltaya():
     from utils.dynamic_config import enhanced_etapa8_dates
 
     dia_inicio, dia_fim, ontem = enhanced_etapa8_dates()
-    hoje = datetime.now()  # Mantém variável hoje para compatibilidade
+    hoje = relogio.agora()  # Mantém variável hoje para compatibilidade
     
     pyautogui.click(83,44)    
     pyautogui.click(29,81, duration=0.2) 
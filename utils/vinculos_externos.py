@@ -0,0 +1,458 @@
+"""
+Atualização de Vínculos Externos sem Excel - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as leituras existentes.
+Após a atualização, load_workbook(..., data_only=True) enxerga os mesmos valores
+que teria após um RefreshAll + Save feito pelo Excel via COM.
+
+Este módulo adiciona:
+1. Leitura das partes xl/externalLinks do workbook (origem, abas e células vinculadas)
+2. Busca dos valores atuais nas planilhas de origem, com cache por origem (caminho + mtime)
+3. Recálculo das fórmulas afetadas com o avaliador de utils.formulas; fórmulas
+   não suportadas que dependem de um vínculo (mesmo por outras células) ficam
+   como pendentes, para o chamador recorrer ao Excel
+4. Gravação dos novos valores direto no XML (nada mais no arquivo é alterado)
+5. Gravação atômica, e somente quando algum valor mudou
+"""
+
+import io
+import os
+import re
+import time
+import zipfile
+import tempfile
+import threading
+import posixpath
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import unquote
+from xml.sax.saxutils import escape
+
+from openpyxl import load_workbook
+
+from utils.excel_stream import LeitorStreaming, NS_MAIN, NS_REL, NS_PKG_REL
+from utils.formulas import AvaliadorFormulas, FormulaNaoSuportada
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+# Import do sistema de cache (se disponível)
+try:
+    from utils.cache import invalidate_cache_on_save
+    CACHE_AVAILABLE = True
+except ImportError:
+    CACHE_AVAILABLE = False
+
+
+_TAG_EXT_REF = f"{{{NS_MAIN}}}externalReference"
+_TAG_EXT_BOOK = f"{{{NS_MAIN}}}externalBook"
+_TAG_SHEET_NAME = f"{{{NS_MAIN}}}sheetName"
+_TAG_SHEET_DATA = f"{{{NS_MAIN}}}sheetData"
+_TAG_CELL = f"{{{NS_MAIN}}}cell"
+
+_RE_CELULA_XML = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_RE_CELULA_VINCULO = re.compile(r"<cell\b([^>]*?)(?:/>|>(.*?)</cell>)", re.S)
+_RE_BLOCO_ABA_VINCULO = re.compile(r"<sheetData\b[^>]*?sheetId=\"(\d+)\"[^>]*?(?:/>|>(.*?)</sheetData>)", re.S)
+_RE_ATRIBUTO_R = re.compile(r"\br=\"([A-Z]+\d+)\"")
+_RE_ATRIBUTO_T = re.compile(r"\s+t=\"[^\"]*\"")
+_RE_FORMULA = re.compile(r"<f\b[^>]*?(?:/>|>.*?</f>)", re.S)
+
+
+# ============================================================================
+# LEITURA DAS PARTES DE VÍNCULO
+# ============================================================================
+
+def _destinos_rels(zf: zipfile.ZipFile, parte: str) -> Dict[str, Tuple[str, str]]:
+    """{rId: (alvo, TargetMode)} do arquivo .rels de uma parte."""
+    pasta, nome = posixpath.split(parte)
+    try:
+        rels = ET.fromstring(zf.read(posixpath.join(pasta, "_rels", nome + ".rels")))
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): (rel.get("Target", ""), rel.get("TargetMode", ""))
+        for rel in rels.iter(f"{{{NS_PKG_REL}}}Relationship")
+    }
+
+
+def _valor_em_cache(cell: ET.Element) -> Any:
+    """Valor guardado pelo Excel em um <cell> de externalLink (tipos n, str, b, e)."""
+    v = cell.find(f"{{{NS_MAIN}}}v")
+    if v is None or v.text is None:
+        return None
+    tipo = cell.get("t", "n")
+    if tipo == "b":
+        return v.text == "1"
+    if tipo != "n":
+        return v.text
+    try:
+        return float(v.text) if any(c in v.text for c in ".eE") else int(v.text)
+    except ValueError:
+        return v.text
+
+
+def listar_vinculos(zf: zipfile.ZipFile) -> List[Dict[str, Any]]:
+    """
+    Vínculos externos do workbook, na ordem usada nas fórmulas ([1], [2], ...).
+    Cada item: indice, parte, alvo (como gravado pelo Excel), abas e
+    celulas {aba: {coordenada: valor em cache}}.
+    """
+    try:
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    except KeyError:
+        return []
+
+    destinos = _destinos_rels(zf, "xl/workbook.xml")
+    vinculos = []
+    for indice, ref in enumerate(workbook.iter(_TAG_EXT_REF), start=1):
+        alvo_parte, _ = destinos.get(ref.get(f"{{{NS_REL}}}id"), ("", ""))
+        if not alvo_parte:
+            continue
+        parte = alvo_parte.lstrip("/") if alvo_parte.startswith("/") else posixpath.normpath(posixpath.join("xl", alvo_parte))
+
+        raiz = ET.fromstring(zf.read(parte))
+        livro = raiz.find(_TAG_EXT_BOOK)
+        if livro is None:
+            # DDE/OLE: não é uma planilha externa
+            continue
+
+        alvo, _ = _destinos_rels(zf, parte).get(livro.get(f"{{{NS_REL}}}id"), ("", ""))
+        abas = [s.get("val") for s in livro.iter(_TAG_SHEET_NAME)]
+
+        celulas: Dict[str, Dict[str, Any]] = {}
+        for dados in livro.iter(_TAG_SHEET_DATA):
+            aba = abas[int(dados.get("sheetId"))]
+            celulas[aba] = {
+                cell.get("r"): _valor_em_cache(cell)
+                for cell in dados.iter(_TAG_CELL)
+            }
+
+        vinculos.append({"indice": indice, "parte": parte, "alvo": alvo, "abas": abas, "celulas": celulas})
+
+    return vinculos
+
+
+def resolver_caminho_origem(alvo: str, pasta_base: Union[str, Path]) -> Optional[Path]:
+    """
+    Caminho local da planilha de origem de um vínculo. Aceita "file:///C:/...",
+    caminhos absolutos e relativos; se o caminho gravado não existir, procura
+    um arquivo de mesmo nome na pasta do workbook (planilhas movidas juntas).
+    """
+    alvo = unquote(alvo)
+    if alvo.lower().startswith("file:///"):
+        alvo = alvo[8:]
+    elif alvo.lower().startswith("file:"):
+        alvo = alvo[5:]
+
+    candidatos = [Path(alvo), Path(pasta_base) / alvo]
+    nome = re.split(r"[\\/]", alvo)[-1]
+    if nome:
+        candidatos.append(Path(pasta_base) / nome)
+
+    for candidato in candidatos:
+        if candidato.is_file():
+            return candidato
+    return None
+
+
+# ============================================================================
+# VALORES DAS ORIGENS (COM CACHE)
+# ============================================================================
+
+_cache_origens: Dict[Tuple[str, float], Dict[str, Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _valores_da_origem(caminho: Path, celulas_por_aba: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Valores atuais das células pedidas na planilha de origem. Abas inexistentes
+    ficam de fora do resultado. O cache por (caminho, mtime) evita reler a
+    mesma origem quando vários vínculos (ou workbooks) apontam para ela.
+    """
+    chave = (os.path.abspath(str(caminho)), os.path.getmtime(caminho))
+    with _cache_lock:
+        for antiga in [c for c in _cache_origens if c[0] == chave[0] and c != chave]:
+            del _cache_origens[antiga]
+        cache = _cache_origens.setdefault(chave, {})
+
+        faltantes = {
+            aba: [c for c in coords if c not in cache.get(aba, {})]
+            for aba, coords in celulas_por_aba.items()
+        }
+        faltantes = {aba: coords for aba, coords in faltantes.items() if coords}
+
+    if faltantes:
+        with LeitorStreaming(caminho) as leitor:
+            lidos = {}
+            for aba, coords in faltantes.items():
+                if aba not in leitor.nomes_abas:
+                    continue
+                lidos[aba] = leitor.ler_celulas(coords, aba)
+        with _cache_lock:
+            for aba, valores in lidos.items():
+                cache.setdefault(aba, {}).update(valores)
+
+    with _cache_lock:
+        return {
+            aba: {c: cache[aba][c] for c in coords}
+            for aba, coords in celulas_por_aba.items()
+            if aba in cache
+        }
+
+
+def limpar_cache_origens() -> None:
+    with _cache_lock:
+        _cache_origens.clear()
+
+
+# ============================================================================
+# RECÁLCULO
+# ============================================================================
+
+def recalcular_formulas(arquivo: Union[str, Path, bytes],
+                        valores_externos: Optional[Dict[int, Dict[str, Dict[str, Any]]]] = None,
+                        alteradas: Optional[Dict[str, Iterable[str]]] = None,
+                        vinculos: bool = False,
+                        ) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, str, str, str]]]:
+    """
+    Reavalia todas as fórmulas do workbook (caminho ou conteúdo do .xlsx).
+
+    Retorna ({aba: {coordenada: valor novo}} só das células cujo valor em
+    cache mudou, [(aba, coordenada, fórmula, motivo)] das pendentes).
+
+    Pendentes são as fórmulas que não puderam ser recalculadas (e ficaram com
+    o valor antigo) e as que dependem delas. Com alteradas ({aba: [coordenadas]})
+    e/ou vinculos=True, só contam as que dependem, direta ou indiretamente,
+    dessas células ou de um vínculo externo; as demais continuam com o valor
+    em cache correto.
+    """
+    def carregar(**kwargs):
+        return load_workbook(io.BytesIO(arquivo) if isinstance(arquivo, bytes) else arquivo, **kwargs)
+
+    wb_formulas = carregar()
+    wb_valores = carregar(data_only=True)
+    avaliador = AvaliadorFormulas(wb_formulas, wb_valores, recalcular=True,
+                                  valores_externos=valores_externos)
+
+    novos_por_aba: Dict[str, Dict[str, Any]] = {}
+    nao_recalculadas: Dict[Tuple[str, str], str] = {}
+    for ws in wb_formulas.worksheets:
+        for row in ws.iter_rows():
+            for cell in row:
+                if not (isinstance(cell.value, str) and cell.value.startswith("=")):
+                    continue
+                try:
+                    novo = avaliador.valor(ws.title, cell.coordinate)
+                except FormulaNaoSuportada as e:
+                    nao_recalculadas[(ws.title, cell.coordinate)] = str(e)
+                    continue
+                if (ws.title, cell.coordinate) in avaliador.nao_recalculadas:
+                    nao_recalculadas[(ws.title, cell.coordinate)] = "fórmula não suportada"
+                if novo is not None and not _valores_iguais(novo, wb_valores[ws.title][cell.coordinate].value):
+                    novos_por_aba.setdefault(ws.title, {})[cell.coordinate] = novo
+
+    # Valor antigo em uma fórmula não recalculada contamina as que a usam
+    afetadas = set(nao_recalculadas) | avaliador.dependentes(nao_recalculadas)
+    if alteradas is not None or vinculos:
+        origens = [(aba, coord) for aba, coords in (alteradas or {}).items() for coord in coords]
+        afetadas &= avaliador.dependentes(origens, vinculos_externos=vinculos)
+
+    pendentes = [
+        (aba, coord, wb_formulas[aba][coord].value,
+         nao_recalculadas.get((aba, coord), "depende de fórmula não recalculada"))
+        for aba, coord in sorted(afetadas)
+    ]
+    return novos_por_aba, pendentes
+
+
+# ============================================================================
+# REESCRITA DO XML
+# ============================================================================
+
+def _valores_iguais(a: Any, b: Any) -> bool:
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool) and not isinstance(b, bool):
+        return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+def celulas_do_xml(xml: str) -> Iterator[Tuple[str, str, str]]:
+    """(atributos, conteúdo, trecho completo) de cada <c> de um trecho do XML de uma aba."""
+    for m in _RE_CELULA_XML.finditer(xml):
+        yield m.group(1), m.group(2) or "", m.group(0)
+
+
+def sem_atributo_tipo(atributos: str) -> str:
+    """Atributos de um <c> sem o t="..." (para gravar um valor de outro tipo)."""
+    return _RE_ATRIBUTO_T.sub("", atributos)
+
+
+def _tipo_e_texto(valor: Any) -> Tuple[Optional[str], str]:
+    if isinstance(valor, bool):
+        return "b", "1" if valor else "0"
+    if isinstance(valor, (int, float)):
+        return None, repr(valor) if isinstance(valor, float) else str(valor)
+    return "str", escape(str(valor))
+
+
+def _reescrever_celulas(xml: str, padrao: "re.Pattern", tag: str,
+                        novos: Dict[str, Any], manter_formula: bool) -> str:
+    """Troca o <v> (e o atributo t) das células de `novos`, mantendo o resto do XML."""
+    def substituir(m: "re.Match") -> str:
+        atributos, conteudo = m.group(1), m.group(2) or ""
+        r = _RE_ATRIBUTO_R.search(atributos)
+        if r is None or r.group(1) not in novos:
+            return m.group(0)
+
+        tipo, texto = _tipo_e_texto(novos[r.group(1)])
+        atributos = _RE_ATRIBUTO_T.sub("", atributos)
+        if tipo:
+            atributos += f' t="{tipo}"'
+        formula = _RE_FORMULA.search(conteudo) if manter_formula else None
+        inicio = formula.group(0) if formula else ""
+        return f"<{tag}{atributos}>{inicio}<v>{texto}</v></{tag}>"
+
+    return padrao.sub(substituir, xml)
+
+
+def _reescrever_vinculo(xml: str, abas: List[str], novos: Dict[str, Dict[str, Any]]) -> str:
+    def substituir_bloco(m: "re.Match") -> str:
+        aba = abas[int(m.group(1))]
+        if aba not in novos or m.group(2) is None:
+            return m.group(0)
+        return m.group(0).replace(
+            m.group(2), _reescrever_celulas(m.group(2), _RE_CELULA_VINCULO, "cell", novos[aba], False)
+        )
+
+    return _RE_BLOCO_ABA_VINCULO.sub(substituir_bloco, xml)
+
+
+def gravar_valores_em_cache(caminho: Union[str, Path], novos_por_aba: Dict[str, Dict[str, Any]],
+                            partes_novas: Dict[str, bytes]) -> int:
+    """
+    Acrescenta a partes_novas o XML das abas com os valores em cache trocados
+    (partindo da versão já presente em partes_novas, se houver).
+    Retorna o número de células alteradas.
+    """
+    alteradas = 0
+    with LeitorStreaming(caminho) as leitor:
+        for aba, novos in novos_por_aba.items():
+            parte = leitor.parte_da_aba(aba)
+            xml = partes_novas.get(parte) or leitor.ler_parte(parte)
+            partes_novas[parte] = _reescrever_celulas(xml.decode("utf-8"), _RE_CELULA_XML, "c", novos, True).encode("utf-8")
+            alteradas += len(novos)
+    return alteradas
+
+
+def gravar_pacote(caminho: Path, partes_novas: Dict[str, bytes]) -> None:
+    """
+    Copia o pacote trocando só as partes alteradas; substitui o original com
+    os.replace e invalida as entradas do utils/cache.py referentes ao arquivo.
+    """
+    fd, temporario = tempfile.mkstemp(prefix=f".{caminho.stem}_", suffix=caminho.suffix, dir=caminho.parent)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(caminho) as origem, zipfile.ZipFile(temporario, "w", zipfile.ZIP_DEFLATED) as destino:
+            for info in origem.infolist():
+                dados = partes_novas.get(info.filename)
+                destino.writestr(info, dados if dados is not None else origem.read(info.filename))
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    if CACHE_AVAILABLE:
+        invalidate_cache_on_save(caminho)
+
+
+# ============================================================================
+# ATUALIZAÇÃO
+# ============================================================================
+
+def atualizar_vinculos_externos(caminho: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Equivalente headless de abrir o arquivo no Excel, RefreshAll e salvar,
+    para vínculos com outras planilhas.
+
+    Retorna estatísticas; "pendentes" lista o que não pôde ser resolvido aqui
+    (origens não encontradas, fórmulas com vínculo não suportadas e conexões
+    de dados/consultas, que exigem o Excel).
+    """
+    caminho = Path(caminho)
+    start_time = time.time()
+    stats: Dict[str, Any] = {
+        "vinculos": 0,
+        "celulas_vinculo_atualizadas": 0,
+        "formulas_atualizadas": 0,
+        "pendentes": [],
+        "gravado": False,
+    }
+
+    with zipfile.ZipFile(caminho) as zf:
+        vinculos = listar_vinculos(zf)
+        if "xl/connections.xml" in zf.namelist():
+            stats["pendentes"].append("conexões de dados (xl/connections.xml)")
+    stats["vinculos"] = len(vinculos)
+
+    # 1. Valores atuais das origens
+    valores_externos: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    partes_novas: Dict[str, bytes] = {}
+    for vinculo in vinculos:
+        origem = resolver_caminho_origem(vinculo["alvo"], caminho.parent)
+        if origem is None:
+            stats["pendentes"].append(f"origem não encontrada: {vinculo['alvo']}")
+            valores_externos[vinculo["indice"]] = vinculo["celulas"]
+            continue
+
+        atuais = _valores_da_origem(origem, {aba: list(c) for aba, c in vinculo["celulas"].items()})
+        for aba in vinculo["celulas"]:
+            if aba not in atuais:
+                stats["pendentes"].append(f"aba '{aba}' não encontrada em {origem.name}")
+        valores_externos[vinculo["indice"]] = {**vinculo["celulas"], **atuais}
+
+        alterados = {
+            aba: {c: v for c, v in valores.items() if not _valores_iguais(v, vinculo["celulas"][aba].get(c))}
+            for aba, valores in atuais.items()
+        }
+        alterados = {aba: celulas for aba, celulas in alterados.items() if celulas}
+        if alterados:
+            with zipfile.ZipFile(caminho) as zf:
+                xml = zf.read(vinculo["parte"]).decode("utf-8")
+            partes_novas[vinculo["parte"]] = _reescrever_vinculo(xml, vinculo["abas"], alterados).encode("utf-8")
+            stats["celulas_vinculo_atualizadas"] += sum(len(c) for c in alterados.values())
+
+    # 2. Recálculo das fórmulas com os valores novos
+    if partes_novas:
+        novos_por_aba, pendentes = recalcular_formulas(caminho, valores_externos, vinculos=True)
+        for aba, coord, _, motivo in pendentes:
+            stats["pendentes"].append(f"{aba}!{coord}: {motivo}")
+
+        stats["formulas_atualizadas"] = gravar_valores_em_cache(caminho, novos_por_aba, partes_novas)
+        gravar_pacote(caminho, partes_novas)
+        stats["gravado"] = True
+
+    duration_ms = (time.time() - start_time) * 1000
+    if LOGGING_AVAILABLE:
+        log_operacao("atualizar_vinculos_externos", "SUCESSO" if not stats["pendentes"] else "PARCIAL", {
+            "arquivo": str(caminho),
+            **stats,
+            "duration_ms": duration_ms
+        })
+    if METRICS_AVAILABLE:
+        record_operation_metric("vinculos_refresh", duration_ms, {
+            "vinculos": stats["vinculos"],
+            "formulas_atualizadas": stats["formulas_atualizadas"]
+        })
+
+    return stats
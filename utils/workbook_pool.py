@@ -0,0 +1,273 @@
+"""
+Pool de Workbooks por Processo - OceanicDesk
+
+IMPORTANTE: Este módulo mantém 100% da compatibilidade com as etapas existentes.
+Sem uma sessão ativa, abrir_workbook/salvar_workbook carregam e salvam na hora,
+como load_workbook/wb.save faziam (gravação via utils.excel_save).
+
+Este módulo adiciona:
+1. Pool de workbooks indexado por caminho + mtime, compartilhado pelas etapas 1 a 5
+2. Controle de alterações (dirty tracking) e gravação única ou por checkpoint
+   (etapa que falha tem as alterações em memória descartadas, não gravadas)
+3. Recarregamento automático se o arquivo for alterado fora do processo
+4. Contadores de carregamentos evitados, com integração a logging e métricas
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from utils.excel_save import carregar_workbook, salvar_atomico
+
+# Import do sistema de logging (se disponível)
+try:
+    from utils.logger import log_operacao, logger
+    LOGGING_AVAILABLE = True
+except ImportError:
+    LOGGING_AVAILABLE = False
+
+# Import do sistema de métricas (se disponível)
+try:
+    from utils.metrics import record_operation_metric
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+# ============================================================================
+# POOL DE WORKBOOKS
+# ============================================================================
+
+class WorkbookPool:
+    """
+    Mantém em memória os workbooks abertos durante uma sessão.
+
+    Cada entrada guarda o workbook, o mtime do arquivo no momento do
+    carregamento e se houve alteração ainda não gravada.
+    """
+
+    def __init__(self):
+        self._entradas: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self.stats = {
+            "carregamentos": 0,
+            "carregamentos_evitados": 0,
+            "salvamentos": 0,
+            "salvamentos_evitados": 0,
+            "recarregamentos_externos": 0,
+        }
+
+    def _chave(self, caminho: Union[str, Path]) -> str:
+        return os.path.normcase(os.path.abspath(str(caminho)))
+
+    def _mtime(self, caminho: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(caminho)
+        except OSError:
+            return None
+
+    def obter(self, caminho: Union[str, Path]):
+        """
+        Retorna o workbook do caminho, carregando do disco apenas se ainda não
+        estiver no pool ou se o arquivo tiver sido alterado por outro processo.
+        """
+        chave = self._chave(caminho)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            mtime_atual = self._mtime(chave)
+
+            if entrada is not None:
+                if entrada["mtime"] == mtime_atual or entrada["alterado"]:
+                    if entrada["mtime"] != mtime_atual and LOGGING_AVAILABLE:
+                        logger.warning(f"[Pool] {caminho} alterado no disco com alterações pendentes em memória; mantendo a versão em memória.")
+                    self.stats["carregamentos_evitados"] += 1
+                    return entrada["wb"]
+                self.stats["recarregamentos_externos"] += 1
+
+            start_time = time.time()
+            wb = carregar_workbook(chave)
+            duration_ms = (time.time() - start_time) * 1000
+
+            self._entradas[chave] = {"wb": wb, "mtime": mtime_atual, "alterado": False}
+            self.stats["carregamentos"] += 1
+
+        if METRICS_AVAILABLE:
+            record_operation_metric("workbook_pool_load", duration_ms, {"arquivo": str(caminho)})
+        return wb
+
+    def get_workbook(self, caminho: Union[str, Path]):
+        """Workbook do caminho se já estiver no pool (sem carregar)."""
+        with self._lock:
+            entrada = self._entradas.get(self._chave(caminho))
+            return entrada["wb"] if entrada else None
+
+    def marcar_alterado(self, caminho: Union[str, Path]) -> None:
+        """Registra que o workbook do caminho tem alterações não gravadas."""
+        with self._lock:
+            entrada = self._entradas.get(self._chave(caminho))
+            if entrada is None:
+                raise KeyError(f"Workbook não está no pool: {caminho}")
+            entrada["alterado"] = True
+
+    def salvar(self, caminho: Optional[Union[str, Path]] = None) -> int:
+        """
+        Grava os workbooks alterados (todos, ou só o do caminho informado).
+        Retorna quantos arquivos foram gravados.
+        """
+        with self._lock:
+            if caminho is None:
+                chaves = list(self._entradas)
+            else:
+                chaves = [self._chave(caminho)]
+
+            gravados = 0
+            for chave in chaves:
+                entrada = self._entradas.get(chave)
+                if entrada is None:
+                    continue
+                if not entrada["alterado"]:
+                    self.stats["salvamentos_evitados"] += 1
+                    continue
+
+                start_time = time.time()
+                salvar_atomico(entrada["wb"], chave)
+                duration_ms = (time.time() - start_time) * 1000
+
+                entrada["alterado"] = False
+                entrada["mtime"] = self._mtime(chave)
+                self.stats["salvamentos"] += 1
+                gravados += 1
+
+                if METRICS_AVAILABLE:
+                    record_operation_metric("workbook_pool_save", duration_ms, {"arquivo": chave})
+
+        return gravados
+
+    def descartar(self, caminho: Optional[Union[str, Path]] = None) -> int:
+        """Remove workbooks do pool sem gravar. Retorna quantos tinham alterações perdidas."""
+        with self._lock:
+            if caminho is None:
+                chaves = list(self._entradas)
+            else:
+                chaves = [self._chave(caminho)]
+
+            perdidos = 0
+            for chave in chaves:
+                entrada = self._entradas.pop(chave, None)
+                if entrada is not None and entrada["alterado"]:
+                    perdidos += 1
+        return perdidos
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do pool."""
+        with self._lock:
+            return {
+                **self.stats,
+                "workbooks_abertos": len(self._entradas),
+                "workbooks_alterados": sum(1 for e in self._entradas.values() if e["alterado"]),
+            }
+
+
+# ============================================================================
+# SESSÃO ATIVA DO PROCESSO
+# ============================================================================
+
+workbook_pool = WorkbookPool()
+_sessao_ativa = False
+_salvar_em_checkpoint = False
+
+
+def sessao_ativa() -> bool:
+    """Indica se há uma sessão de workbooks aberta por sessao_workbooks()."""
+    return _sessao_ativa
+
+
+@contextmanager
+def sessao_workbooks(salvar_em_checkpoint: bool = False) -> Iterator[WorkbookPool]:
+    """
+    Compartilha os workbooks abertos entre as etapas executadas dentro do bloco.
+
+    Por padrão os arquivos alterados são gravados uma única vez ao sair do bloco.
+    Se o bloco terminar com erro, as alterações pendentes são descartadas (como
+    um load_workbook sem wb.save); use etapa_workbooks() para gravar o que cada
+    etapa concluiu. Com salvar_em_checkpoint=True cada salvar_workbook() grava
+    na hora, mas o workbook continua sendo reaproveitado sem recarregar.
+    """
+    global _sessao_ativa, _salvar_em_checkpoint
+
+    if _sessao_ativa:
+        # Sessões aninhadas reaproveitam a sessão externa
+        yield workbook_pool
+        return
+
+    _sessao_ativa = True
+    _salvar_em_checkpoint = salvar_em_checkpoint
+    stats_inicio = dict(workbook_pool.stats)
+    concluida = False
+    try:
+        yield workbook_pool
+        concluida = True
+    finally:
+        _sessao_ativa = False
+        _salvar_em_checkpoint = False
+        try:
+            if concluida:
+                workbook_pool.salvar()
+        finally:
+            perdidos = workbook_pool.descartar()
+            if perdidos and LOGGING_AVAILABLE:
+                logger.warning(f"[Pool] Sessão interrompida: alterações de {perdidos} planilha(s) descartadas.")
+            stats = {k: v - stats_inicio[k] for k, v in workbook_pool.stats.items()}
+            print(f"[Pool] {stats['carregamentos']} carregamento(s), {stats['carregamentos_evitados']} evitado(s), {stats['salvamentos']} gravação(ões).")
+            if LOGGING_AVAILABLE:
+                log_operacao("sessao_workbooks", "SUCESSO" if concluida else "ERRO", stats)
+
+
+@contextmanager
+def etapa_workbooks(nome: str = "etapa") -> Iterator[None]:
+    """
+    Delimita uma etapa dentro da sessão ativa.
+
+    Se a etapa terminar sem erro, os workbooks alterados são gravados
+    (checkpoint). Se falhar, todos os workbooks do pool são descartados: a
+    próxima etapa recarrega os arquivos como estavam no último checkpoint, sem
+    as alterações em memória da etapa que falhou. Fora de uma sessão não faz nada.
+    """
+    if not _sessao_ativa:
+        yield
+        return
+
+    try:
+        yield
+    except BaseException:
+        perdidos = workbook_pool.descartar()
+        if LOGGING_AVAILABLE:
+            logger.warning(f"[Pool] {nome} falhou: alterações não gravadas descartadas ({perdidos} planilha(s) pendente(s)).")
+        raise
+    workbook_pool.salvar()
+
+
+def abrir_workbook(caminho: Union[str, Path]):
+    """
+    Abre um workbook para edição.
+    Com sessão ativa, devolve a instância compartilhada do pool.
+    """
+    if _sessao_ativa:
+        return workbook_pool.obter(caminho)
+    return carregar_workbook(caminho)
+
+
+def salvar_workbook(wb, caminho: Union[str, Path]) -> None:
+    """
+    Salva um workbook aberto com abrir_workbook().
+    Com sessão ativa, apenas marca como alterado (ou grava, no modo checkpoint).
+    """
+    if _sessao_ativa and workbook_pool.get_workbook(caminho) is wb:
+        workbook_pool.marcar_alterado(caminho)
+        if _salvar_em_checkpoint:
+            workbook_pool.salvar(caminho)
+        return
+    salvar_atomico(wb, caminho)